@@ -1,5 +1,6 @@
 from app.operations import OperationFactory
 from app.exceptions import OperationError, ValidationError
+from app.input_validators import validate_range
 
 class Calculation:
     def __init__(self, operation_name, a, b):
@@ -11,6 +12,7 @@ class Calculation:
     def validate_inputs(self):
         if not isinstance(self.a, (int, float)) or not isinstance(self.b, (int, float)):
             raise ValidationError("Input must be numeric.")
+        validate_range((self.a, self.b))
 
     def execute(self):
         try:
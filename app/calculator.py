@@ -1,121 +1,636 @@
+import os
+import sys
+import time
 from app.operations import OperationFactory
 from app.history import HistoryManager
-from app.calculator_memento import Caretaker, Memento
+from app.calculator_memento import Caretaker
+from app.calculator_config import CalculatorConfig
 from app.exceptions import OperationError
+from app.input_validators import validate_range
 from app.logger import LoggingObserver, AutoSaveObserver
+from app.operation_cache import CachedOperation, OperationCache
+from app.metrics import Metrics
+from app.tracing import create_tracer, NULL_TRACE
+from app.variables import VariableGraph
+
+HISTORY_PAGE_SIZE = 20
+
+_COUNT_WORDS = {1: "one", 2: "two", 3: "three"}
+
+# Command name -> (handler, usage, description). Handlers take (repl, args, user_input) and
+# return False to end the session; anything that isn't here is looked up in OperationFactory.
+COMMANDS = {}
+
+
+def command(name, usage, description):
+    def register(handler):
+        COMMANDS[name] = (handler, usage, description)
+        return handler
+    return register
+
+def _parse_range(text, convert):
+    # "LO..HI", "LO..", "..HI" or a single value meaning exactly that value
+    if ".." not in text:
+        value = convert(text)
+        return value, value
+    low, high = text.split("..", 1)
+    return (convert(low) if low else None), (convert(high) if high else None)
+
+
+def parse_find_filters(args):
+    """Turn ``find`` arguments into keyword arguments for ``HistoryManager.find``."""
+    filters = {}
+    for arg in args:
+        name, sep, value = arg.partition("=")
+        name = name.lower()
+        if not sep:
+            if "operation" in filters:
+                raise ValueError(f"Unexpected argument '{arg}'")
+            filters["operation"] = name
+            continue
+        if name not in ("a", "b", "result", "pos", "limit"):
+            raise ValueError(f"Unknown filter '{name}'")
+        try:
+            if name == "limit":
+                filters["limit"] = int(value)
+            elif name == "pos":
+                filters["positions"] = _parse_range(value, int)
+            else:
+                filters[name] = _parse_range(value, float)
+        except ValueError:
+            raise ValueError(f"Invalid value in '{arg}'")
+    return filters
+
 
 class CalculatorREPL:
-    def __init__(self):
+    def __init__(self, show_banner=True, tracer=None, recorder=None):
         self.history_manager = HistoryManager()
         self.caretaker = Caretaker()
         self.logger = LoggingObserver()
         self.auto_saver = AutoSaveObserver(self.history_manager)
         self.observers = [self.logger, self.auto_saver]
-        print("Welcome to the Modular Command-Line Calculator!")
-        print("Type 'help' to see available commands.\n")
+        self.emit = print  # swapped for a buffer in script mode
+        self._deferred_events = None  # observer updates held back until the end of a script chunk
+        self._expressions = None
+        self.cache = None
+        self.cache_file = os.path.join(CalculatorConfig.HISTORY_DIR, "calculator_cache.json")
+        if CalculatorConfig.CACHE_ENABLED:
+            self.cache = OperationCache(CalculatorConfig.CACHE_SIZE, CalculatorConfig.CACHE_POLICY)
+            if CalculatorConfig.CACHE_PERSIST:
+                self.cache.load(self.cache_file)
+        self.metrics = Metrics() if CalculatorConfig.METRICS_ENABLED else None
+        self.metrics_file = os.path.join(CalculatorConfig.LOG_DIR, "calculator_metrics.prom")
+        self.tracer = tracer if tracer is not None else create_tracer()
+        self._trace = NULL_TRACE  # the sampled command currently running, if any
+        self.recorder = recorder  # optional WorkloadRecorder capturing every command line
+        self.variables = VariableGraph()
+        self.ans = None  # the last result, usable as an operand named "ans"
+        if show_banner:
+            print("Welcome to the Modular Command-Line Calculator!")
+            print("Type 'help' to see available commands.\n")
 
     def run(self):
         while True:
-            user_input = input(">>> ").strip()
-            if not user_input:
-                continue
+            user_input = input(">>> ")
+            if not self.execute_command(user_input):
+                break
 
-            command_parts = user_input.split()
-            command = command_parts[0].lower()
+    def run_script(self, stream, out=None, chunk_size=None):
+        """Execute commands read from ``stream`` (a file or stdin) without prompting.
 
-            try:
-                if command == "exit":
-                    print("Goodbye!")
+        Output is buffered and written to ``out`` once per chunk of ``chunk_size`` lines,
+        and observer updates (logging, autosave) are delivered in one batch per chunk, or
+        sooner if more entries are waiting than the history ring buffer holds (autosave
+        must journal them before they are evicted). Returns the number of lines processed.
+        """
+        out = out if out is not None else sys.stdout
+        chunk_size = chunk_size or CalculatorConfig.SCRIPT_CHUNK_SIZE
+        buffer = []
+        self.emit = buffer.append
+        self._deferred_events = []
+        count = 0
+        try:
+            for count, line in enumerate(stream, start=1):
+                keep_going = self.execute_command(line)
+                if not keep_going:
                     break
+                if count % chunk_size == 0:
+                    self._flush_chunk(out, buffer)
+        finally:
+            self._flush_chunk(out, buffer)
+            self.logger.flush()
+            self.flush_traces()
+            self.flush_recording()
+            self.save_cache()
+            self.emit = print
+            self._deferred_events = None
+        return count
 
-                elif command == "help":
-                    self.print_help()
-
-                elif command in [
-                    "add", "subtract", "multiply", "division",
-                    "modulus", "power", "root", "int_divide", "abs_diff", "precent"
-                ]:
-                    if len(command_parts) != 3:
-                        print("Error: Please provide exactly two numeric operands. Example: add 5 2")
-                        continue
-                    try:
-                        a = float(command_parts[1])
-                        b = float(command_parts[2])
-                        operation = OperationFactory.get_operation(command)
-                        result = operation.execute(a, b)
-                    except ValueError:
-                        print("Error: Operands must be numbers.")
-                        continue
-
-                    print(f"Result: {result}")
-                    self.history_manager.add_entry(command, a, b, result)
-                    memento = Memento(self.history_manager.history)
-                    self.caretaker.save_state(memento)
-
-                    for observer in self.observers:
-                        observer.update(command, a, b, result)
-
-
-                elif command == "history":
-                    entries = self.history_manager.get_all()
-                    if not entries:
-                        print("History is empty.")
-                    else:
-                        for i, entry in enumerate(entries, start=1):
-                            print(f"{i}. {entry['operation']}({entry['a']}, {entry['b']}) = {entry['result']}")
-
-                elif command == "undo":
-                    state = self.caretaker.undo()
-                    if state is not None:
-                        self.history_manager.history = state  # Restore full history
-                        if state:
-                            last_entry = state[-1]
-                            print(f"Undo -> {last_entry['operation']}({last_entry['a']}, {last_entry['b']}) = {last_entry['result']}")
-                        else:
-                            print("History is now empty after undo.")
-                    else:
-                        print("Nothing to undo.")
+    def _flush_chunk(self, out, buffer):
+        self._notify_deferred()
+        if buffer:
+            out.write("\n".join(buffer))
+            out.write("\n")
+            buffer.clear()
+        out.flush()
+
+    @property
+    def expressions(self):
+        # The expression parser is only imported and built for the first eval
+        if self._expressions is None:
+            from app.expression import ExpressionCompiler
+            self._expressions = ExpressionCompiler(CalculatorConfig.EXPRESSION_CACHE_SIZE)
+        return self._expressions
+
+    def _execute_operation(self, command, *operands):
+        trace = self._trace
+        with trace.span("get_operation"):
+            operation = OperationFactory.get_operation(command)
+            # The cache belongs to this REPL and is keyed on two operands
+            if self.cache is not None and getattr(operation, "arity", 2) == 2:
+                operation = CachedOperation(command.lower(), operation, self.cache)
+        with trace.span("execute"):
+            return operation.execute(*operands)
 
-                elif command == "redo":
-                    state = self.caretaker.redo()
-                    if state is None:
-                        print("Nothing to redo.")
+    def _record(self, command, a, b, result):
+        trace = self._trace
+        with trace.span("add_entry"):
+            self.history_manager.add_entry(command, a, b, result)
+        with trace.span("memento"):
+            self.caretaker.save_history(self.history_manager.history, appended=1,
+                                        offset=self.history_manager.offset)
+        self._notify(command, a, b, result)
+
+    def _notify(self, command, a, b, result):
+        if self._deferred_events is not None:
+            self._deferred_events.append((command, a, b, result))
+            if len(self._deferred_events) >= self.history_manager.history.capacity:
+                self._notify_deferred()
+            return
+        metrics, trace = self.metrics, self._trace
+        for observer in self.observers:
+            if metrics is None and trace is NULL_TRACE:
+                observer.update(command, a, b, result)
+                continue
+            start = time.perf_counter()
+            try:
+                with trace.span(f"observer:{type(observer).__name__}"):
+                    observer.update(command, a, b, result)
+            finally:
+                if metrics is not None:
+                    metrics.observe_observer(type(observer).__name__, time.perf_counter() - start)
+
+    def _notify_deferred(self):
+        events = self._deferred_events
+        if not events:
+            return
+        self._deferred_events = []
+        previous = self._trace
+        trace = self.tracer.start("notify_batch", f"{len(events)} events") if self.tracer else NULL_TRACE
+        self._trace = trace
+        try:
+            self._notify_batch(events)
+        except Exception as e:
+            self.emit(f"Error: {e}")
+        finally:
+            self._trace = previous
+            if self.tracer is not None:
+                self.tracer.finish(trace)
+
+    def _notify_batch(self, events):
+        metrics, trace = self.metrics, self._trace
+        for observer in self.observers:
+            start = time.perf_counter()
+            try:
+                with trace.span(f"observer:{type(observer).__name__}"):
+                    update_batch = getattr(observer, "update_batch", None)
+                    if update_batch is not None:
+                        update_batch(events)
                     else:
-                        self.history_manager.history = state
-                        if not state:
-                            print("Redo restored empty history.")
-                        else:
-                            last_entry = state[-1]
-                            print(f"Redo -> {last_entry['operation']}({last_entry['a']}, {last_entry['b']}) = {last_entry['result']}")
-                elif command == "save":
-                    try:
-                        self.history_manager.save_to_csv()
-                        print("History saved successfully.")
-                    except Exception as e:
-                        print(f"Error saving history: {e}")
-
-                elif command == "load":
-                    try:
-                        self.history_manager.load_from_csv()
-                        print("History loaded successfully.")
-                    except Exception as e:
-                        print(f"Error loading history: {e}")
-
-                else:
-                    print(f"Unknown command: {command}. Type 'help' for a list of commands.")
-
-            except ZeroDivisionError:
-                print("Error: Division by zero is not allowed.")
+                        for event in events:
+                            observer.update(*event)
+            finally:
+                if metrics is not None:
+                    metrics.observe_observer(type(observer).__name__, time.perf_counter() - start)
+
+    def _metric_label(self, command):
+        # Anything unknown is counted as "unknown" so stray input cannot grow the metrics without bound
+        if command in COMMANDS or OperationFactory.has_operation(command):
+            return command
+        return "unknown"
+
+    def _count_error(self, command, error):
+        if command not in COMMANDS and OperationFactory.has_operation(command):
+            self.history_manager.record_error(command)
+        elif command == "eval" and getattr(error, "operation", None) is not None:
+            self.history_manager.record_error(error.operation)  # the operation in the expression that failed
+        if self.metrics is not None:
+            self.metrics.count_error(self._metric_label(command), error)
+
+    def execute_command(self, user_input):
+        """Run one command line. Returns False once the session should end."""
+        user_input = user_input.strip()
+        if not user_input:
+            return True
+        if self.recorder is not None:
+            self.recorder.record(user_input)
+
+        command_parts = user_input.split()
+        command = command_parts[0].lower()
+        metrics, tracer = self.metrics, self.tracer
+        if metrics is None and tracer is None:
+            return self._run_command(command, command_parts, user_input)
+        label = self._metric_label(command)
+        trace = tracer.start(label, user_input) if tracer is not None else NULL_TRACE
+        self._trace = trace
+        start = time.perf_counter()
+        try:
+            return self._run_command(command, command_parts, user_input)
+        finally:
+            if metrics is not None:
+                metrics.observe_command(label, time.perf_counter() - start)
+            if trace is not NULL_TRACE:
+                self._trace = NULL_TRACE
+                tracer.finish(trace)
+
+    def _run_command(self, command, command_parts, user_input):
+        emit = self.emit
+        try:
+            entry = COMMANDS.get(command)
+            if entry is not None:
+                return entry[0](self, command_parts[1:], user_input) is not False
+            if OperationFactory.has_operation(command):
+                self._run_operation(command, command_parts[1:])
+            elif len(command_parts) == 1 and (command == "ans" or command in self.variables):
+                value = self._variable_value(command)
+                self.ans = value
+                emit(f"{command} = {value}")
+            else:
+                emit(f"Unknown command: {command}. Type 'help' for a list of commands.")
+
+        except ZeroDivisionError as e:
+            self._count_error(command, e)
+            emit("Error: Division by zero is not allowed.")
+        except OperationError as e:
+            self._count_error(command, e)
+            emit(f"Operation Error: {e}")
+        except Exception as e:
+            self._count_error(command, e)
+            emit(f"Error: {e}")
+        return True
+
+    def _run_operation(self, command, args):
+        operation = OperationFactory.get_operation(command)
+        arity = getattr(operation, "arity", 2)
+        operand_type = getattr(operation, "operand_type", float)
+        if len(args) != arity:
+            count = _COUNT_WORDS.get(arity, arity)
+            example = getattr(operation, "example", "add 5 2")
+            self.emit(f"Error: Please provide exactly {count} numeric operands. Example: {example}")
+            return
+        try:
+            with self._trace.span("parse"):
+                operands = [self._operand(arg, operand_type) for arg in args]
+                validate_range(operands)
+        except ValueError as e:
+            self._count_error(command, e)
+            kind = "whole numbers" if operand_type is int else "numbers"
+            self.emit(f"Error: Operands must be {kind}.")
+            return
+        try:
+            result = self._execute_operation(command, *operands)
+        except ValueError as e:
+            # e.g. pow() finding no modular inverse; not a problem with how the operands were typed
+            raise OperationError(str(e)) from e
+
+        self.emit(f"Result: {result}")
+        self.ans = result
+        # History entries hold two operands; any further ones (powmod's modulus) aren't recorded
+        self._record(command, operands[0], operands[1], result)
+
+    def _variable_value(self, name):
+        if name == "ans":
+            if self.ans is None:
+                raise ValueError("No previous result for 'ans'")
+            return self.ans
+        return self.variables.value(name)
+
+    def _operand(self, arg, operand_type):
+        # A number, or the current value of a variable (or ans)
+        try:
+            return operand_type(arg)
+        except ValueError:
+            name = arg.lower()
+            if name != "ans" and name not in self.variables:
+                raise
+        value = self._variable_value(name)
+        if operand_type is int:
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError(f"'{arg}' is not a whole number")
+            return int(value)
+        return value
+
+    def _let_operand(self, text):
+        # Numbers become constants and variables become graph edges; ans is the last result
+        try:
+            return validate_range((float(text),))[0]
+        except ValueError:
+            name = text.lower()
+        if name == "ans":
+            return self._variable_value(name)
+        return self.variables.cell(name)
+
+    @command("eval", "eval EXPRESSION", "evaluate an infix expression, e.g. eval (3 + 4) ^ 2 % 5 or eval root(27, 3) * 2")
+    def _eval_command(self, args, user_input):
+        expression = user_input.split(None, 1)[1] if args else ""
+        if not expression:
+            self.emit("Error: Please provide an expression. Example: eval (3 + 4) ^ 2 % 5")
+            return
+        with self._trace.span("parse"):
+            compiled = self.expressions.compile(expression)
+        with self._trace.span("execute"):
+            operation, a, b, result = compiled.evaluate()
+        self.emit(f"Result: {result}")
+        self.ans = result
+        # The outermost operation and its (already evaluated) operands become one history entry
+        if operation is not None:
+            self._record(operation, a, b, result)
+
+    @command("let", "let NAME = OPERATION A B", "define a variable; A and B may be numbers, variables or ans")
+    def _let_command(self, args, user_input):
+        text = user_input.split(None, 1)[1] if args else ""
+        name, sep, definition = text.partition("=")
+        name, parts = name.strip(), definition.split()
+        if not sep or not name or len(parts) not in (1, 3):
+            self.emit("Error: Usage: let NAME = OPERATION A B, or let NAME = VALUE. Example: let x = add 5 2")
+            return
+        lowered = name.lower()
+        if not name.isidentifier() or lowered == "ans" or lowered in COMMANDS or OperationFactory.has_operation(lowered):
+            self.emit(f"Error: '{name}' can't be used as a variable name.")
+            return
+        operation = None
+        if len(parts) == 3:
+            operation = parts.pop(0).lower()
+            if not OperationFactory.has_operation(operation):
+                self.emit(f"Error: Unknown operation: {operation}")
+                return
+        cell = self.variables.define(lowered, operation, [self._let_operand(part) for part in parts])
+        value = self.variables.value(lowered)
+        self.ans = value
+        self.emit(f"{lowered} = {value}")
+        if operation is not None:
+            self._record(operation, *cell.operand_values(), value)
+
+    @command("vars", "vars", "show every variable and its current value")
+    def _vars_command(self, args, user_input):
+        if not len(self.variables):
+            self.emit("No variables defined.")
+            return
+        for name in self.variables.names():
+            try:
+                self.emit(f"{name} = {self.variables.value(name)}")
             except OperationError as e:
-                print(f"Operation Error: {e}")
-            except Exception as e:
-                print(f"Error: {e}")
+                self.emit(f"{name} = Operation Error: {e}")
+
+    @command("history", "history [START [STOP]]", "show this session's history, or page through the saved history file")
+    def _history_command(self, args, user_input):
+        if args:
+            self.print_saved_history(args)
+            return
+        entries = self.history_manager.get_all()
+        if not entries:
+            self.emit("History is empty.")
+        else:
+            for i, entry in enumerate(entries, start=1):
+                self.emit(f"{i}. {entry['operation']}({entry['a']}, {entry['b']}) = {entry['result']}")
+
+    @command("find", "find [OPERATION] [a=LO..HI] [b=..] [result=..] [pos=..] [limit=N]",
+             "search this session's history; ranges are inclusive and either end may be left open")
+    def _find_command(self, args, user_input):
+        try:
+            filters = parse_find_filters(args)
+        except ValueError as e:
+            self.emit(f"Error: {e}. Example: find power result=100..1000 limit=10")
+            return
+        matches = self.history_manager.find(**filters)
+        if not matches:
+            self.emit("No matching history entries.")
+            return
+        for i, entry in matches:
+            self.emit(f"{i}. {entry['operation']}({entry['a']}, {entry['b']}) = {entry['result']}")
+
+    @command("analyze", "analyze [OPERATION]",
+             "count, sum, mean, min, max and variance of results, and error rates, per operation")
+    def _analyze_command(self, args, user_input):
+        if len(args) > 1:
+            self.emit("Error: Usage: analyze [OPERATION]")
+            return
+        rows = self.history_manager.analyze(args[0] if args else None)
+        if not rows:
+            self.emit(f"No history entries for '{args[0]}'." if args else "History is empty.")
+            return
+        self.emit(f"{'operation':<12} {'count':>8} {'sum':>12} {'mean':>12} {'min':>12} {'max':>12} "
+                  f"{'variance':>12} {'errors':>7} {'error %':>8}")
+        for row in rows:
+            values = [row[key] for key in ("sum", "mean", "min", "max", "variance")]
+            values = " ".join("-".rjust(12) if value is None else f"{value:>12.6g}" for value in values)
+            self.emit(f"{row['operation']:<12} {row['count']:>8} {values} {row['errors']:>7} "
+                      f"{row['error_rate'] * 100:>8.2f}")
+
+    @command("undo", "undo", "undo the last operation")
+    def _undo_command(self, args, user_input):
+        with self._trace.span("memento"):
+            state = self.caretaker.undo()
+        if state is not None:
+            self.history_manager.restore(state, self.caretaker.get_current_offset())  # Restore full history
+            if state:
+                last_entry = state[-1]
+                self.emit(f"Undo -> {last_entry['operation']}({last_entry['a']}, {last_entry['b']}) = {last_entry['result']}")
+            else:
+                self.emit("History is now empty after undo.")
+        else:
+            self.emit("Nothing to undo.")
+
+    @command("redo", "redo", "redo the last undone operation")
+    def _redo_command(self, args, user_input):
+        with self._trace.span("memento"):
+            state = self.caretaker.redo()
+        if state is None:
+            self.emit("Nothing to redo.")
+        else:
+            self.history_manager.restore(state, self.caretaker.get_current_offset())
+            if not state:
+                self.emit("Redo restored empty history.")
+            else:
+                last_entry = state[-1]
+                self.emit(f"Redo -> {last_entry['operation']}({last_entry['a']}, {last_entry['b']}) = {last_entry['result']}")
+
+    @command("save", "save", "save history to the history file")
+    def _save_command(self, args, user_input):
+        try:
+            self.history_manager.save_to_csv()
+            self.emit("History saved successfully.")
+        except Exception as e:
+            self._count_error("save", e)
+            self.emit(f"Error saving history: {e}")
+
+    @command("load", "load", "load history from the history file")
+    def _load_command(self, args, user_input):
+        try:
+            report = self.history_manager.load_from_csv()
+            # Snapshot the loaded history so undo/redo stay in step with it
+            self.caretaker.save_history(self.history_manager.history, offset=self.history_manager.offset)
+            self.emit("History loaded successfully.")
+            self.print_bad_rows(report)
+        except Exception as e:
+            self._count_error("load", e)
+            self.emit(f"Error loading history: {e}")
+
+    @command("import", "import PATH [merge]",
+             "append a history CSV to this history (merge skips entries already present)")
+    def _import_command(self, args, user_input):
+        if not args or len(args) > 2 or (len(args) == 2 and args[1].lower() != "merge"):
+            self.emit("Error: Usage: import PATH [merge]")
+            return
+        report = self.history_manager.import_history(args[0], merge=len(args) == 2)
+        self.caretaker.save_history(self.history_manager.history, offset=self.history_manager.offset)
+        self.emit(f"Imported {report.imported} entries from {args[0]}.")
+        if report.duplicates:
+            self.emit(f"Skipped {report.duplicates} duplicate entries.")
+        self.print_bad_rows(report)
+
+    @command("export", "export PATH", "write this session's history to a CSV file")
+    def _export_command(self, args, user_input):
+        if len(args) != 1:
+            self.emit("Error: Usage: export PATH")
+            return
+        count = self.history_manager.export_history(args[0])
+        self.emit(f"Exported {count} entries to {args[0]}.")
+
+    @command("cache", "cache [clear]", "show result cache statistics, or empty the cache")
+    def _cache_command(self, args, user_input):
+        self.print_cache_stats(args)
+
+    @command("stats", "stats [reset | export [PATH]]", "show command latencies, or write them as Prometheus text")
+    def _stats_command(self, args, user_input):
+        self.print_stats(args)
+
+    @command("help", "help", "show this list")
+    def _help_command(self, args, user_input):
+        self.print_help()
+
+    @command("exit", "exit", "leave the calculator")
+    def _exit_command(self, args, user_input):
+        self.logger.flush()
+        self.flush_traces()
+        self.flush_recording()
+        self.save_cache()
+        self.emit("Goodbye!")
+        return False
+
+    def print_saved_history(self, bounds):
+        # history START [STOP]: 1-based, inclusive positions in the saved history file
+        if len(bounds) > 2:
+            self.emit("Error: Usage: history [START [STOP]]. Example: history 1000 1100")
+            return
+        try:
+            start = int(bounds[0])
+            stop = int(bounds[1]) if len(bounds) == 2 else start + HISTORY_PAGE_SIZE - 1
+        except ValueError:
+            self.emit("Error: History positions must be whole numbers. Example: history 1000 1100")
+            return
+        if start < 1 or stop < start:
+            self.emit("Error: History positions must satisfy 1 <= START <= STOP.")
+            return
+        entries = self.history_manager.get_saved_range(start - 1, stop)
+        if not entries:
+            self.emit(f"No saved history entries from {start} (saved entries: {self.history_manager.saved_count()}).")
+            return
+        for i, entry in enumerate(entries, start=start):
+            self.emit(f"{i}. {entry['operation']}({entry['a']}, {entry['b']}) = {entry['result']}")
+
+    def print_bad_rows(self, report, shown=10):
+        if not report.skipped:
+            return
+        self.emit(f"Skipped {report.skipped} malformed rows in {report.path}:")
+        for line, message in report.errors[:shown]:
+            self.emit(f"  line {line}: {message}")
+        if report.skipped > shown:
+            self.emit(f"  ... and {report.skipped - shown} more")
+
+    def flush_traces(self):
+        if self.tracer is not None:
+            self.tracer.flush()
+
+    def flush_recording(self):
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def save_cache(self):
+        if self.cache is not None and CalculatorConfig.CACHE_PERSIST:
+            self.cache.save(self.cache_file)
+
+    def print_cache_stats(self, args):
+        if self.cache is None:
+            self.emit("Cache is disabled. Set CALCULATOR_CACHE_ENABLED=true to enable it.")
+            return
+        if args and args[0].lower() == "clear":
+            self.cache.clear()
+            self.emit("Cache cleared.")
+            return
+        stats = self.cache.stats()
+        self.emit(f"Cache ({stats['policy']}): {stats['entries']}/{stats['capacity']} entries")
+        self.emit(f"Hits: {stats['hits']}, Misses: {stats['misses']}, Evictions: {stats['evictions']}, "
+                  f"Hit rate: {stats['hit_rate']:.1%}")
+
+    def print_stats(self, args):
+        if self.metrics is None:
+            self.emit("Metrics are disabled. Set CALCULATOR_METRICS_ENABLED=true to enable them.")
+            return
+        action = args[0].lower() if args else None
+        if action == "reset":
+            self.metrics.reset()
+            self.emit("Metrics reset.")
+        elif action == "export":
+            path = args[1] if len(args) > 1 else self.metrics_file
+            self.metrics.export(path)
+            self.emit(f"Metrics exported to {path}")
+        elif action is None:
+            for line in self.metrics.summary_lines():
+                self.emit(line)
+        else:
+            self.emit("Error: Usage: stats [reset | export [PATH]]")
 
     def print_help(self):
-        print("\nAvailable Commands:")
-        print("add, subtract, multiply, division, modulus, power, root, int_divide, abs_diff, precent")
-        print("undo, redo, save, load, history, help, exit\n")
+        self.emit("\nAvailable Commands:")
+        self.emit("OPERATION a b, where OPERATION is one of:")
+        self.emit("  " + ", ".join(OperationFactory.names()))
+        for _, usage, description in COMMANDS.values():
+            self.emit(f"{usage:<30} {description}")
+        self.emit("")
+
+
+def main(argv=None): # pragma: no cover
+    import argparse
+    parser = argparse.ArgumentParser(description="Modular command-line calculator")
+    parser.add_argument(
+        "--script", metavar="FILE",
+        help="run commands from FILE ('-' for stdin) without prompting, with buffered output"
+    )
+    parser.add_argument(
+        "--record", metavar="FILE",
+        help="record every command line with its timing to FILE (default: CALCULATOR_RECORD_FILE)"
+    )
+    args = parser.parse_args(argv)
+    from app.workload import WorkloadRecorder, create_recorder
+    recorder = WorkloadRecorder(args.record) if args.record else create_recorder()
+    if args.script is None:
+        CalculatorREPL(recorder=recorder).run()
+    elif args.script == "-":
+        CalculatorREPL(show_banner=False, recorder=recorder).run_script(sys.stdin)
+    else:
+        with open(args.script, encoding=CalculatorConfig.DEFAULT_ENCODING) as stream:
+            CalculatorREPL(show_banner=False, recorder=recorder).run_script(stream)
 
 if __name__ == "__main__": # pragma: no cover
-    repl = CalculatorREPL()
-    repl.run() # pragma: no cover
+    main()
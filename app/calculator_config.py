@@ -1,8 +1,60 @@
 import os
-from dotenv import load_dotenv
 from app.exceptions import ConfigError
 
-load_dotenv()
+# Values containing any of these (quoting, comments, ${VAR} expansion, escapes, spaces) need python-dotenv
+_NOT_PLAIN = frozenset("'\"#$\\ \t")
+
+
+def _find_dotenv():
+    # The search load_dotenv() does when called from this module: .env here or in any parent directory
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _read_simple_dotenv(path):
+    # None when any line needs python-dotenv's full parser
+    values = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            text = line.strip()
+            if not text or text.startswith("#"):
+                continue
+            if text.startswith("export "):
+                text = text[len("export "):]
+            key, equals, value = text.partition("=")
+            key, value = key.strip(), value.strip()
+            if not equals or not key.isidentifier() or not _NOT_PLAIN.isdisjoint(value):
+                return None
+            values[key] = value
+    return values
+
+
+def load_env_file():
+    """Load .env into the environment without overriding variables that are already set.
+
+    python-dotenv takes longer to import than the rest of the app, so plain KEY=VALUE
+    files are read directly and only anything fancier goes through it.
+    """
+    path = _find_dotenv()
+    if path is None:
+        return
+    values = _read_simple_dotenv(path)
+    if values is None:
+        from dotenv import load_dotenv
+        load_dotenv(path)
+        return
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
+
+load_env_file()
 
 
 class CalculatorConfig:
@@ -14,6 +66,30 @@ class CalculatorConfig:
     PRECISION = int(os.getenv("CALCULATOR_PRECISION", 2))
     MAX_INPUT_VALUE = float(os.getenv("CALCULATOR_MAX_INPUT_VALUE", 1e6))
     DEFAULT_ENCODING = os.getenv("CALCULATOR_DEFAULT_ENCODING", "utf-8")
+    LOG_BUFFERED = os.getenv("CALCULATOR_LOG_BUFFERED", "false").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.getenv("CALCULATOR_LOG_QUEUE_SIZE", 10000))
+    LOG_BATCH_SIZE = int(os.getenv("CALCULATOR_LOG_BATCH_SIZE", 500))
+    LOG_FLUSH_INTERVAL = float(os.getenv("CALCULATOR_LOG_FLUSH_INTERVAL", 1.0))
+    SCRIPT_CHUNK_SIZE = int(os.getenv("CALCULATOR_SCRIPT_CHUNK_SIZE", 10000))
+    HISTORY_BACKEND = os.getenv("CALCULATOR_HISTORY_BACKEND", "csv").lower()
+    CACHE_ENABLED = os.getenv("CALCULATOR_CACHE_ENABLED", "false").lower() == "true"
+    CACHE_SIZE = int(os.getenv("CALCULATOR_CACHE_SIZE", 1024))
+    CACHE_POLICY = os.getenv("CALCULATOR_CACHE_POLICY", "lru").lower()
+    CACHE_PERSIST = os.getenv("CALCULATOR_CACHE_PERSIST", "false").lower() == "true"
+    EXPRESSION_CACHE_SIZE = int(os.getenv("CALCULATOR_EXPRESSION_CACHE_SIZE", 256))
+    PARALLEL_WORKERS = int(os.getenv("CALCULATOR_PARALLEL_WORKERS", 0))  # 0 means one per CPU
+    PARALLEL_CHUNK_SIZE = int(os.getenv("CALCULATOR_PARALLEL_CHUNK_SIZE", 10000))
+    SERVER_PORT = int(os.getenv("CALCULATOR_SERVER_PORT", 7878))
+    SERVER_MAX_BATCH_SIZE = int(os.getenv("CALCULATOR_SERVER_MAX_BATCH_SIZE", 256))
+    SERVER_BATCH_WINDOW = float(os.getenv("CALCULATOR_SERVER_BATCH_WINDOW", 0.002))
+    METRICS_ENABLED = os.getenv("CALCULATOR_METRICS_ENABLED", "true").lower() == "true"
+    TRACE_SAMPLE_RATE = float(os.getenv("CALCULATOR_TRACE_SAMPLE_RATE", 0.0))
+    HISTORY_CHUNK_SIZE = int(os.getenv("CALCULATOR_HISTORY_CHUNK_SIZE", 10000))
+    WORKER_TIMEOUT = float(os.getenv("CALCULATOR_WORKER_TIMEOUT", 5.0))
+    WORKER_MEMORY_MB = int(os.getenv("CALCULATOR_WORKER_MEMORY_MB", 512))
+    UNDO_MEMORY_DEPTH = int(os.getenv("CALCULATOR_UNDO_MEMORY_DEPTH", 256))
+    UNDO_DISK_DEPTH = int(os.getenv("CALCULATOR_UNDO_DISK_DEPTH", 10000))
+    RECORD_FILE = os.getenv("CALCULATOR_RECORD_FILE", "")  # empty means no workload recording
 
     @classmethod
     def validate(cls):
@@ -23,6 +99,42 @@ class CalculatorConfig:
             raise ConfigError("MAX_HISTORY_SIZE must be at least 1")
         if cls.MAX_INPUT_VALUE <= 0:
             raise ConfigError("MAX_INPUT_VALUE must be greater than zero")
+        if cls.LOG_QUEUE_SIZE < 1:
+            raise ConfigError("LOG_QUEUE_SIZE must be at least 1")
+        if cls.LOG_BATCH_SIZE < 1:
+            raise ConfigError("LOG_BATCH_SIZE must be at least 1")
+        if cls.LOG_FLUSH_INTERVAL <= 0:
+            raise ConfigError("LOG_FLUSH_INTERVAL must be greater than zero")
+        if cls.SCRIPT_CHUNK_SIZE < 1:
+            raise ConfigError("SCRIPT_CHUNK_SIZE must be at least 1")
+        if cls.HISTORY_BACKEND not in ("csv", "sqlite", "binary"):
+            raise ConfigError("HISTORY_BACKEND must be one of: csv, sqlite, binary")
+        if cls.CACHE_SIZE < 1:
+            raise ConfigError("CACHE_SIZE must be at least 1")
+        if cls.CACHE_POLICY not in ("lru", "fifo"):
+            raise ConfigError("CACHE_POLICY must be one of: lru, fifo")
+        if cls.EXPRESSION_CACHE_SIZE < 1:
+            raise ConfigError("EXPRESSION_CACHE_SIZE must be at least 1")
+        if cls.PARALLEL_WORKERS < 0:
+            raise ConfigError("PARALLEL_WORKERS must be non-negative")
+        if cls.PARALLEL_CHUNK_SIZE < 1:
+            raise ConfigError("PARALLEL_CHUNK_SIZE must be at least 1")
+        if cls.SERVER_MAX_BATCH_SIZE < 1:
+            raise ConfigError("SERVER_MAX_BATCH_SIZE must be at least 1")
+        if cls.SERVER_BATCH_WINDOW < 0:
+            raise ConfigError("SERVER_BATCH_WINDOW must be non-negative")
+        if not 0 <= cls.TRACE_SAMPLE_RATE <= 1:
+            raise ConfigError("TRACE_SAMPLE_RATE must be between 0 and 1")
+        if cls.HISTORY_CHUNK_SIZE < 1:
+            raise ConfigError("HISTORY_CHUNK_SIZE must be at least 1")
+        if cls.WORKER_TIMEOUT <= 0:
+            raise ConfigError("WORKER_TIMEOUT must be greater than zero")
+        if cls.WORKER_MEMORY_MB < 1:
+            raise ConfigError("WORKER_MEMORY_MB must be at least 1")
+        if cls.UNDO_MEMORY_DEPTH < 1:
+            raise ConfigError("UNDO_MEMORY_DEPTH must be at least 1")
+        if cls.UNDO_DISK_DEPTH < 0:
+            raise ConfigError("UNDO_DISK_DEPTH must be non-negative")
 def load_config():
 
     CalculatorConfig.LOG_DIR = os.getenv("CALCULATOR_LOG_DIR", "./logs")
@@ -32,6 +144,30 @@ def load_config():
     CalculatorConfig.PRECISION = int(os.getenv("CALCULATOR_PRECISION", 2))
     CalculatorConfig.MAX_INPUT_VALUE = float(os.getenv("CALCULATOR_MAX_INPUT_VALUE", 1e6))
     CalculatorConfig.DEFAULT_ENCODING = os.getenv("CALCULATOR_DEFAULT_ENCODING", "utf-8")
+    CalculatorConfig.LOG_BUFFERED = os.getenv("CALCULATOR_LOG_BUFFERED", "false").lower() == "true"
+    CalculatorConfig.LOG_QUEUE_SIZE = int(os.getenv("CALCULATOR_LOG_QUEUE_SIZE", 10000))
+    CalculatorConfig.LOG_BATCH_SIZE = int(os.getenv("CALCULATOR_LOG_BATCH_SIZE", 500))
+    CalculatorConfig.LOG_FLUSH_INTERVAL = float(os.getenv("CALCULATOR_LOG_FLUSH_INTERVAL", 1.0))
+    CalculatorConfig.SCRIPT_CHUNK_SIZE = int(os.getenv("CALCULATOR_SCRIPT_CHUNK_SIZE", 10000))
+    CalculatorConfig.HISTORY_BACKEND = os.getenv("CALCULATOR_HISTORY_BACKEND", "csv").lower()
+    CalculatorConfig.CACHE_ENABLED = os.getenv("CALCULATOR_CACHE_ENABLED", "false").lower() == "true"
+    CalculatorConfig.CACHE_SIZE = int(os.getenv("CALCULATOR_CACHE_SIZE", 1024))
+    CalculatorConfig.CACHE_POLICY = os.getenv("CALCULATOR_CACHE_POLICY", "lru").lower()
+    CalculatorConfig.CACHE_PERSIST = os.getenv("CALCULATOR_CACHE_PERSIST", "false").lower() == "true"
+    CalculatorConfig.EXPRESSION_CACHE_SIZE = int(os.getenv("CALCULATOR_EXPRESSION_CACHE_SIZE", 256))
+    CalculatorConfig.PARALLEL_WORKERS = int(os.getenv("CALCULATOR_PARALLEL_WORKERS", 0))
+    CalculatorConfig.PARALLEL_CHUNK_SIZE = int(os.getenv("CALCULATOR_PARALLEL_CHUNK_SIZE", 10000))
+    CalculatorConfig.SERVER_PORT = int(os.getenv("CALCULATOR_SERVER_PORT", 7878))
+    CalculatorConfig.SERVER_MAX_BATCH_SIZE = int(os.getenv("CALCULATOR_SERVER_MAX_BATCH_SIZE", 256))
+    CalculatorConfig.SERVER_BATCH_WINDOW = float(os.getenv("CALCULATOR_SERVER_BATCH_WINDOW", 0.002))
+    CalculatorConfig.METRICS_ENABLED = os.getenv("CALCULATOR_METRICS_ENABLED", "true").lower() == "true"
+    CalculatorConfig.TRACE_SAMPLE_RATE = float(os.getenv("CALCULATOR_TRACE_SAMPLE_RATE", 0.0))
+    CalculatorConfig.HISTORY_CHUNK_SIZE = int(os.getenv("CALCULATOR_HISTORY_CHUNK_SIZE", 10000))
+    CalculatorConfig.WORKER_TIMEOUT = float(os.getenv("CALCULATOR_WORKER_TIMEOUT", 5.0))
+    CalculatorConfig.WORKER_MEMORY_MB = int(os.getenv("CALCULATOR_WORKER_MEMORY_MB", 512))
+    CalculatorConfig.UNDO_MEMORY_DEPTH = int(os.getenv("CALCULATOR_UNDO_MEMORY_DEPTH", 256))
+    CalculatorConfig.UNDO_DISK_DEPTH = int(os.getenv("CALCULATOR_UNDO_DISK_DEPTH", 10000))
+    CalculatorConfig.RECORD_FILE = os.getenv("CALCULATOR_RECORD_FILE", "")
 
     CalculatorConfig.validate()
     return CalculatorConfig
@@ -1,22 +1,339 @@
 # app/calculator_memento.py
 
+import os
+from collections import deque
+from app.calculator_config import CalculatorConfig
+
+# Records smaller than this (most deltas) are stored uncompressed; zlib's setup costs more than it saves
+_COMPRESS_MIN = 512
+
+
 class Memento:
-    def __init__(self, state):
-        # Save a deep copy of the current full history
-        self._state = [entry.copy() for entry in state]
+    def __init__(self, state, offset=0):
+        # Copy each entry once; later snapshots extend this log instead of copying it again
+        self._log = [entry.copy() for entry in state]
+        self._start = 0
+        self._stop = len(self._log)
+        # Entries of the full history that precede this state (evicted from a bounded history)
+        self.offset = offset
+
+    @classmethod
+    def _view(cls, log, start, stop, offset=0):
+        memento = cls.__new__(cls)
+        memento._log = log
+        memento._start = start
+        memento._stop = stop
+        memento.offset = offset
+        return memento
+
+    def extend(self, entries, dropped=0):
+        """Return a snapshot of this state followed by ``entries``, minus ``dropped`` leading entries.
+
+        The new memento shares this one's log, so only the new entries are copied.
+        """
+        log, start, stop = self._log, self._start, self._stop
+        if len(log) != stop:
+            # A snapshot on an undone branch already grew this log past our window, so fork it
+            log, start, stop = log[start:stop], 0, stop - start
+        log.extend(entry.copy() for entry in entries)
+        return Memento._view(log, start + dropped, len(log), self.offset + dropped)
+
+    def __len__(self):
+        return self._stop - self._start
 
     def get_state(self):
-        return [entry.copy() for entry in self._state]
+        # Entries in the log are never mutated, so a shallow slice is enough
+        return self._log[self._start:self._stop]
+
+
+def _delta(base, memento):
+    # memento's entries as lead + base_state[start:stop] + tail, when both are windows on one log
+    if memento._log is not base._log:
+        return None
+    first, last = max(memento._start, base._start), min(memento._stop, base._stop)
+    if first > last:
+        return None
+    log = memento._log
+    return log[memento._start:first], first - base._start, last - base._start, log[last:memento._stop]
+
+
+class SpillFile:
+    """Scratch file of pickled records, created under HISTORY_DIR on first write.
+
+    Records of ``_COMPRESS_MIN`` bytes or more are zlib-compressed.
+
+    Freed space is reclaimed by compacting the file once it is mostly dead records.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._file = None
+        self._records = {}  # record id -> (offset, size)
+        self._next_id = 0
+        self._end = 0
+        self._live_bytes = 0
+        self._at_end = True  # seeking flushes the write buffer, so writes skip it when possible
+
+    def __len__(self):
+        return len(self._records)
+
+    def size(self):
+        return self._end
+
+    def write(self, value):
+        # pickle, zlib and tempfile are only imported once something spills
+        import pickle
+        import zlib
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        data = b"z" + zlib.compress(data, 1) if len(data) >= _COMPRESS_MIN else b"p" + data
+        if self._file is None:
+            import tempfile
+            directory = self.directory or CalculatorConfig.HISTORY_DIR
+            os.makedirs(directory, exist_ok=True)
+            self._file = tempfile.TemporaryFile(dir=directory, prefix="undo-", suffix=".spill")
+        if not self._at_end:
+            self._file.seek(self._end)
+            self._at_end = True
+        self._file.write(data)
+        record = self._next_id
+        self._next_id += 1
+        self._records[record] = (self._end, len(data))
+        self._end += len(data)
+        self._live_bytes += len(data)
+        return record
+
+    def read(self, record):
+        import pickle
+        import zlib
+        offset, size = self._records[record]
+        self._at_end = False
+        self._file.seek(offset)
+        data = self._file.read(size)
+        return pickle.loads(zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:])
+
+    def free(self, record):
+        _, size = self._records.pop(record)
+        self._live_bytes -= size
+        if not self._records:
+            self._file.seek(0)
+            self._file.truncate()
+            self._end = 0
+            self._at_end = True
+        elif self._end > 2 * self._live_bytes + (1 << 20):
+            self._compact()
+
+    def _compact(self):
+        # Live records only ever move toward the start, so none overwrites one not yet moved
+        self._at_end = False
+        position = 0
+        for record, (offset, size) in sorted(self._records.items(), key=lambda item: item[1][0]):
+            if offset != position:
+                self._file.seek(offset)
+                data = self._file.read(size)
+                self._file.seek(position)
+                self._file.write(data)
+                self._records[record] = (position, size)
+            position += size
+        self._file.truncate(position)
+        self._end = position
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._records.clear()
+        self._end = self._live_bytes = 0
+
+
+class TieredStack:
+    """Stack of mementos that keeps the newest ``memory_depth`` in memory and spills older ones.
+
+    Spilled mementos are written as deltas against the one below them when they share a log,
+    with a full snapshot whenever the deltas since the last one add up to more entries than
+    the state itself, so reading one back costs at most about two states' worth of entries.
+    Only ``disk_depth`` spilled mementos are kept; older ones are dropped.
+    """
+
+    def __init__(self, spill, memory_depth, disk_depth):
+        self.spill = spill
+        self.memory_depth = memory_depth
+        self.disk_depth = disk_depth
+        self._memory = deque()
+        self._records = []  # (record id, is_full) of spilled mementos, oldest first
+        self._hidden = 0  # oldest records past disk_depth, kept only as bases of deltas above them
+        self._last_spilled = None  # the newest spilled memento, which the next one is diffed against
+        self._chain = 0  # entries written as deltas since the last full snapshot
+        self._deltas = 0  # deltas written since the last full snapshot
+        # Bounds the deltas read back per load and the records kept past disk_depth
+        self._max_deltas = max(disk_depth // 2, 1)
+
+    def __len__(self):
+        return len(self._memory) + len(self._records) - self._hidden
+
+    def __getitem__(self, index):
+        if index == -1 and self._memory:
+            return self._memory[-1]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("stack index out of range")
+        spilled = len(self._records) - self._hidden
+        if index >= spilled:
+            return self._memory[index - spilled]
+        return self._load(self._hidden + index)[0]
+
+    def spilled(self):
+        return len(self._records) - self._hidden
+
+    def append(self, memento):
+        self._memory.append(memento)
+        if len(self._memory) > self.memory_depth:
+            self._spill(self._memory.popleft())
+
+    def pop(self):
+        memento = self._memory.pop()
+        if not self._memory and self.spilled():
+            # Popped past the in-memory tier: bring back up to half of it from disk in one read
+            count = min(max(self.memory_depth // 2, 1), self.spilled())
+            first = len(self._records) - count
+            self._memory.extend(self._load(first, len(self._records) - 1))
+            for record, _ in self._records[first:]:
+                self.spill.free(record)
+            del self._records[first:]
+            self._last_spilled = None
+            self._release_hidden()
+        return memento
+
+    def clear(self):
+        self._memory.clear()
+        for record, _ in self._records:
+            self.spill.free(record)
+        self._records.clear()
+        self._hidden = 0
+        self._last_spilled = None
+        self._chain = self._deltas = 0
+
+    def _resident(self):
+        # Mementos holding a reference to a shared log
+        resident = list(self._memory)
+        if self._last_spilled is not None:
+            resident.append(self._last_spilled)
+        return resident
+
+    def _spill(self, memento):
+        if not self.disk_depth:
+            return
+        base = self._last_spilled
+        delta = _delta(base, memento) if base is not None else None
+        cost = len(delta[0]) + len(delta[3]) if delta is not None else 0
+        if delta is not None and self._chain + cost <= len(memento) and self._deltas < self._max_deltas:
+            self._records.append((self.spill.write((memento.offset, *delta)), False))
+            self._chain += cost
+            self._deltas += 1
+        else:
+            self._records.append((self.spill.write((memento.offset, memento.get_state())), True))
+            self._chain = self._deltas = 0
+        self._last_spilled = memento
+        if len(self._records) - self._hidden > self.disk_depth:
+            self._hidden += 1
+            self._release_hidden()
+
+    def _load(self, first, last=None):
+        """Rebuild the spilled mementos ``first``..``last`` (default: just ``first``).
+
+        Deltas that only drop leading entries and append new ones are replayed onto one
+        shared log, so the rebuilt mementos share storage like the originals did.
+        """
+        last = first if last is None else last
+        full = first
+        while not self._records[full][1]:
+            full -= 1
+        log, start = None, 0
+        mementos = []
+        for index in range(full, last + 1):
+            record, is_full = self._records[index]
+            if is_full:
+                offset, log = self.spill.read(record)
+                start = 0
+            else:
+                offset, lead, keep_start, keep_stop, tail = self.spill.read(record)
+                if not lead and keep_stop == len(log) - start:
+                    start += keep_start
+                    log.extend(tail)
+                else:
+                    log = lead + log[start + keep_start:start + keep_stop] + tail
+                    start = 0
+            if index >= first:
+                mementos.append(Memento._view(log, start, len(log), offset))
+        return mementos
+
+    def _release_hidden(self):
+        # Hidden records can go once the oldest visible one is a full snapshot (or none is left)
+        hidden = self._hidden
+        if not hidden or (hidden < len(self._records) and not self._records[hidden][1]):
+            return
+        for record, _ in self._records[:hidden]:
+            self.spill.free(record)
+        del self._records[:hidden]
+        self._hidden = 0
 
 
 class Caretaker:
-    def __init__(self):
-        self.undo_stack = []
-        self.redo_stack = []
+    """Undo/redo stacks of mementos.
+
+    Each stack keeps its newest ``memory_depth`` mementos in memory and up to ``disk_depth``
+    older ones compressed in a scratch file under HISTORY_DIR, which are read back when
+    undo or redo reaches them.
+    """
+
+    def __init__(self, memory_depth=None, disk_depth=None):
+        memory_depth = CalculatorConfig.UNDO_MEMORY_DEPTH if memory_depth is None else memory_depth
+        disk_depth = CalculatorConfig.UNDO_DISK_DEPTH if disk_depth is None else disk_depth
+        self.spill = SpillFile()
+        self.undo_stack = TieredStack(self.spill, memory_depth, disk_depth)
+        self.redo_stack = TieredStack(self.spill, memory_depth, disk_depth)
+
+    def _trim_logs(self):
+        # A shared log keeps every entry appended since it was created. Once the mementos
+        # still in memory only look at its newer half, move them onto a copy of that part.
+        resident = {id(m): m for m in self.undo_stack._resident() + self.redo_stack._resident()}
+        groups = {}
+        for memento in resident.values():
+            groups.setdefault(id(memento._log), []).append(memento)
+        for mementos in groups.values():
+            log = mementos[0]._log
+            start = min(memento._start for memento in mementos)
+            if start and start >= len(log) // 2:
+                trimmed = log[start:]
+                for memento in mementos:
+                    memento._log = trimmed
+                    memento._start -= start
+                    memento._stop -= start
 
     def save_state(self, memento):
         self.undo_stack.append(memento)
         self.redo_stack.clear()
+        if len(memento._log) > 2 * (len(memento) + self.undo_stack.memory_depth):
+            self._trim_logs()
+
+    def save_history(self, history, appended=0, offset=0):
+        """Snapshot ``history``, which ``offset`` older entries evicted from it precede.
+
+        When it is the current snapshot plus ``appended`` new entries (with up to that many
+        of the oldest evicted by a bounded history), the new memento shares the current
+        one's storage; otherwise the whole history is copied.
+        """
+        current = self.undo_stack[-1] if self.undo_stack else None
+        dropped = len(current) + appended - len(history) if current is not None else -1
+        if appended and 0 <= dropped <= appended:
+            memento = current.extend(history[len(history) - appended:], dropped)
+        else:
+            memento = Memento(history)
+        memento.offset = offset
+        self.save_state(memento)
 
     def undo(self):
         if len(self.undo_stack) <= 1:
@@ -32,6 +349,10 @@ class Caretaker:
         self.undo_stack.append(memento)
         return memento.get_state()
 
+    def get_current_offset(self):
+        """The ``offset`` of the state undo or redo just restored (0 with no snapshots)."""
+        return self.undo_stack[-1].offset if self.undo_stack else 0
+
     def get_current_state(self):
         if not self.undo_stack:
             return None
@@ -0,0 +1,159 @@
+# app/cost_guard.py
+
+import math
+import numbers
+import sys
+from collections import namedtuple
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Predicted cost of one calculation. digits: decimal digits of the result's magnitude (its
+# base-10 exponent for floats). work: rough count of digit multiplications. floating: the
+# result is a float, so it must fit the float range but is always cheap to compute.
+Cost = namedtuple("Cost", ["digits", "work", "floating"])
+
+CHEAP = Cost(1.0, 1.0, True)
+
+# Largest base-10 exponent a float can hold
+FLOAT_MAX_DIGITS = math.log10(sys.float_info.max)
+# Above this many work units (~10 ms) a calculation runs in a worker process
+INLINE_WORK_LIMIT = 1e8
+# Integer results with more digits than this are refused outright
+MAX_RESULT_DIGITS = 1e8
+
+
+def _log10(value):
+    # log10 of |value| for nonzero ints of any size (which may not fit a float) and floats
+    if isinstance(value, numbers.Integral):
+        value = abs(int(value))
+        bits = value.bit_length()
+        if bits > 1000:
+            return bits * math.log10(2)
+        return math.log10(value)
+    return math.log10(abs(float(value)))
+
+
+def _is_trivial(value):
+    # Complex, NaN/inf and 0/1/-1 bases never need a cost estimate
+    if isinstance(value, complex):
+        return True
+    if isinstance(value, float) and not math.isfinite(value):
+        return True
+    return value == 0 or abs(value) == 1
+
+
+def _multiply_cost(digits):
+    # Python multiplies big ints with Karatsuba, ~n^1.585 digit operations
+    return digits ** 1.585
+
+
+def power_cost(a, b):
+    if _is_trivial(a) or isinstance(b, complex) or (isinstance(b, float) and not math.isfinite(b)):
+        return CHEAP
+    integral = isinstance(a, numbers.Integral) and isinstance(b, numbers.Integral) and b >= 0
+    try:
+        digits = float(b) * _log10(a)
+    except OverflowError:  # an int exponent too large for a float
+        digits = math.inf if b > 0 else -math.inf
+    if digits <= 1:
+        return Cost(1.0, 1.0, not integral)
+    if not integral:
+        return Cost(digits, 1.0, True)
+    return Cost(digits, _multiply_cost(digits), False)
+
+
+def root_cost(a, b):
+    # a ** (1 / b) is a float power: never expensive, but out of range when |b| is small
+    if _is_trivial(a) or _is_trivial(b):
+        return CHEAP
+    return Cost(max(_log10(a) / float(b), 1.0), 1.0, True)
+
+
+def powmod_cost(a, b, m):
+    # Square-and-multiply: ~log2(b) multiplications of numbers the size of m
+    if m == 0:
+        return Cost(1.0, 1.0, False)
+    digits = max(_log10(m), 1.0)
+    return Cost(digits, max(abs(int(b)).bit_length(), 1) * _multiply_cost(digits), False)
+
+
+def _worker(conn, function, operands, memory_limit):
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, memory_limit)
+    try:
+        conn.send((True, function(*operands)))
+    except BaseException as e:
+        conn.send((False, e))
+    finally:
+        conn.close()
+
+
+def _memory_limit(memory_mb):
+    # RLIMIT_AS caps the address space, which the forked worker shares with this process, so
+    # the cap is added on top of the current size rather than replacing it.
+    if resource is None or not memory_mb:
+        return None
+    try:
+        with open("/proc/self/status") as f:
+            current = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmSize:"))
+    except (OSError, StopIteration, ValueError):
+        current = 0
+    limit = current + memory_mb * 1024 * 1024
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    return limit, hard
+
+
+def run_in_worker(function, operands, timeout=None, memory_mb=None):
+    """Run ``function(*operands)`` in a separate process with a time and memory limit.
+
+    The worker is killed once ``timeout`` seconds pass, so a runaway calculation costs
+    the caller at most that long. Exceptions raised by ``function`` are re-raised here.
+    """
+    timeout = CalculatorConfig.WORKER_TIMEOUT if timeout is None else timeout
+    memory_mb = CalculatorConfig.WORKER_MEMORY_MB if memory_mb is None else memory_mb
+    import multiprocessing
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_worker, args=(sender, function, operands, _memory_limit(memory_mb)), daemon=True
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise OperationError(f"Calculation took longer than {timeout:g}s and was stopped")
+        try:
+            ok, value = receiver.recv()
+        except EOFError:
+            raise OperationError(f"Calculation worker exited unexpectedly (code {process.exitcode})")
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if ok:
+        return value
+    if isinstance(value, MemoryError):
+        raise OperationError(f"Calculation needed more than {memory_mb} MB and was stopped")
+    raise value
+
+
+def execute_guarded(name, cost, function, *operands):
+    """Run a calculation inline, in a worker process, or not at all, depending on its cost."""
+    if cost.floating:
+        if cost.digits > FLOAT_MAX_DIGITS:
+            raise OverflowError(f"Result too large: {name} would be about 10^{cost.digits:.0f}")
+        return function(*operands)
+    if cost.digits > MAX_RESULT_DIGITS:
+        raise OperationError(
+            f"Result too large: {name} would have about {cost.digits:.3g} digits (limit {MAX_RESULT_DIGITS:.0e})"
+        )
+    if cost.work <= INLINE_WORK_LIMIT:
+        return function(*operands)
+    return run_in_worker(function, operands)
@@ -0,0 +1,234 @@
+# app/expression.py
+
+import re
+from collections import OrderedDict
+from app.operations import OperationFactory
+from app.exceptions import ValidationError
+from app.input_validators import validate_range
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(//|\*\*|[-+*/%^(),]))")
+
+# Infix operators and the OperationFactory operation each one maps to
+BINARY_OPERATORS = {
+    "+": "add",
+    "-": "subtract",
+    "*": "multiply",
+    "/": "division",
+    "//": "int_divide",
+    "%": "modulus",
+    "^": "power",
+    "**": "power",
+}
+
+
+def _apply(operation, execute, a, b):
+    # Every operation in an expression gets the operand check a typed-in command gets
+    try:
+        validate_range((a, b))
+        return execute(a, b)
+    except Exception as e:
+        e.operation = operation  # lets the REPL count the failure against the operation
+        raise
+
+
+class Number:
+    def __init__(self, value):
+        self.value = value
+
+    def fold(self):
+        return self
+
+    def compile(self):
+        value = self.value
+        return lambda: value
+
+
+class Negate:
+    def __init__(self, operand):
+        self.operand = operand
+
+    def fold(self):
+        operand = self.operand.fold()
+        if isinstance(operand, Number):
+            return Number(-operand.value)
+        return Negate(operand)
+
+    def compile(self):
+        operand = self.operand.compile()
+        return lambda: -operand()
+
+
+class BinaryOp:
+    def __init__(self, operation, left, right):
+        self.operation = operation
+        self.left = left
+        self.right = right
+
+    def fold(self):
+        left, right = self.left.fold(), self.right.fold()
+        if isinstance(left, Number) and isinstance(right, Number):
+            execute = OperationFactory.get_operation(self.operation).execute
+            return Number(_apply(self.operation, execute, left.value, right.value))
+        return BinaryOp(self.operation, left, right)
+
+    def compile(self):
+        operation = self.operation
+        execute = OperationFactory.get_operation(operation).execute
+        left, right = self.left.compile(), self.right.compile()
+        return lambda: _apply(operation, execute, left(), right())
+
+
+class Parser:
+    """Recursive-descent parser for infix arithmetic over the OperationFactory operations.
+
+    Precedence, loosest first: ``+ -``, ``* / // %``, unary ``-``, ``^``/``**``
+    (right-associative). Any two-operand operation can also be called by name,
+    e.g. ``root(27, 3)`` or ``abs_diff(2, 9)``.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = self._tokenize(source)
+        self.pos = 0
+
+    def _tokenize(self, source):
+        tokens = []
+        pos = 0
+        source = source.rstrip()
+        while pos < len(source):
+            match = _TOKEN.match(source, pos)
+            if not match:
+                raise ValidationError(f"Invalid expression: unexpected '{source[pos:].strip()[0]}' at position {pos + 1}")
+            number, name, symbol = match.groups()
+            if number is not None:
+                tokens.append(("number", validate_range((float(number),))[0]))
+            elif name is not None:
+                tokens.append(("name", name.lower()))
+            else:
+                tokens.append(("symbol", symbol))
+            pos = match.end()
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self, symbol=None):
+        kind, value = self._peek()
+        if kind is None:
+            raise ValidationError("Invalid expression: unexpected end of input")
+        if symbol is not None and value != symbol:
+            raise ValidationError(f"Invalid expression: expected '{symbol}' but found '{value}'")
+        self.pos += 1
+        return kind, value
+
+    def parse(self):
+        if not self.tokens:
+            raise ValidationError("Invalid expression: nothing to evaluate")
+        node = self._sum()
+        if self.pos != len(self.tokens):
+            raise ValidationError(f"Invalid expression: unexpected '{self.tokens[self.pos][1]}'")
+        return node
+
+    def _sum(self):
+        node = self._product()
+        while self._peek()[1] in ("+", "-"):
+            _, symbol = self._take()
+            node = BinaryOp(BINARY_OPERATORS[symbol], node, self._product())
+        return node
+
+    def _product(self):
+        node = self._unary()
+        while self._peek()[1] in ("*", "/", "//", "%"):
+            _, symbol = self._take()
+            node = BinaryOp(BINARY_OPERATORS[symbol], node, self._unary())
+        return node
+
+    def _unary(self):
+        symbol = self._peek()[1]
+        if symbol == "-":
+            self._take()
+            return Negate(self._unary())
+        if symbol == "+":
+            self._take()
+            return self._unary()
+        return self._power()
+
+    def _power(self):
+        node = self._primary()
+        if self._peek()[1] in ("^", "**"):
+            _, symbol = self._take()
+            node = BinaryOp(BINARY_OPERATORS[symbol], node, self._unary())
+        return node
+
+    def _primary(self):
+        kind, value = self._take()
+        if kind == "number":
+            return Number(value)
+        if kind == "name":
+            OperationFactory.get_operation(value)  # unknown names fail here
+            self._take("(")
+            left = self._sum()
+            self._take(",")
+            right = self._sum()
+            self._take(")")
+            return BinaryOp(value, left, right)
+        if value == "(":
+            node = self._sum()
+            self._take(")")
+            return node
+        raise ValidationError(f"Invalid expression: unexpected '{value}'")
+
+
+class CompiledExpression:
+    """A parsed, constant-folded expression ready to evaluate repeatedly.
+
+    Everything below the outermost operation is folded, so evaluating runs that one
+    operation. ``evaluate`` returns ``(operation, a, b, result)`` for the outermost
+    operation, which is what gets recorded in history; ``operation`` is None when the
+    whole expression is a single number.
+    """
+
+    def __init__(self, source, tree):
+        self.source = source
+        if isinstance(tree, BinaryOp):
+            tree = BinaryOp(tree.operation, tree.left.fold(), tree.right.fold())
+            self.operation = tree.operation
+            self._left = tree.left.compile()
+            self._right = tree.right.compile()
+            self._execute = OperationFactory.get_operation(tree.operation).execute
+        else:
+            self.operation = None
+            self._value = tree.fold().compile()
+        self.tree = tree
+
+    def evaluate(self):
+        if self.operation is None:
+            return None, None, None, self._value()
+        a, b = self._left(), self._right()
+        return self.operation, a, b, _apply(self.operation, self._execute, a, b)
+
+
+class ExpressionCompiler:
+    """Compiles expressions, keeping the most recent ``capacity`` by source text."""
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._compiled = OrderedDict()
+
+    def __len__(self):
+        return len(self._compiled)
+
+    def compile(self, source):
+        source = source.strip()
+        compiled = self._compiled.get(source)
+        if compiled is not None:
+            self._compiled.move_to_end(source)
+            return compiled
+        compiled = CompiledExpression(source, Parser(source).parse())
+        self._compiled[source] = compiled
+        if len(self._compiled) > self.capacity:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def evaluate(self, source):
+        return self.compile(source).evaluate()
@@ -1,40 +1,247 @@
 import os
-import pandas as pd
 from app.calculator_config import CalculatorConfig
 from app.exceptions import HistoryError
+from app.history_backends import create_backend
+from app.history_stream import ImportReport, read_chunks, validate_chunks, write_entries
+from app.history_store import HistoryStore
 
 class HistoryManager:
     def __init__(self):
-        self.history = [] # internal list to hold records
-        self.history_file = os.path.join(
-            CalculatorConfig.HISTORY_DIR, "calculator_history.csv"
-        )
+        # Columnar ring buffer bounded by MAX_HISTORY_SIZE
+        self._history = HistoryStore(CalculatorConfig.MAX_HISTORY_SIZE)
+        # Sequence number of the first entry not yet persisted by the backend. None means
+        # the files on disk are not known to match memory and the next write must be a full rewrite.
+        self._journaled = None
+        # Saved entries older than the in-memory history (evicted from it, or not loaded into
+        # it). A full rewrite keeps these and replaces only what follows them.
+        self.offset = 0
+        # Search indexes, built on the first find() and then kept up to date by add_entry
+        self._index = None
+        # Result aggregates, built on the first analyze() and then kept up to date the same way
+        self._stats = None
+        # Operations completed and failed this session, for error rates; undo doesn't change them
+        self._completed = {}
+        self._errors = {}
         os.makedirs(CalculatorConfig.HISTORY_DIR, exist_ok=True)
+        self.backend = create_backend(CalculatorConfig.HISTORY_BACKEND, CalculatorConfig.HISTORY_DIR)
+        self.history_file = self.backend.path
+        self.journal_file = getattr(self.backend, "journal_file", None)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, entries):
+        self.restore(entries)
+
+    def restore(self, entries, offset=0):
+        """Replace the history (undo/redo) with ``entries``, preceded by ``offset`` older saved entries."""
+        # The journal no longer describes the history, so the next write is a full rewrite
+        if not isinstance(entries, HistoryStore):
+            offset += max(len(entries) - CalculatorConfig.MAX_HISTORY_SIZE, 0)
+            entries = HistoryStore(CalculatorConfig.MAX_HISTORY_SIZE, entries)
+        self._history = entries
+        self.offset = offset
+        self._journaled = None
+        self._index = None
+        self._stats = None
 
     def add_entry(self, operation_name, a, b, result):
-        self.history.append({
-            "operation": operation_name,
-            "a": a,
-            "b": b,
-            "result": result
-        })
+        self._completed[operation_name] = self._completed.get(operation_name, 0) + 1
+        self._append(operation_name, a, b, result)
 
+    def record_error(self, operation_name):
+        """Count a failed attempt at an operation, for ``analyze``'s error rates."""
+        self._errors[operation_name] = self._errors.get(operation_name, 0) + 1
+
+    def _append(self, operation_name, a, b, result):
+        history = self._history
+        seq = history.next_seq
+        stats = self._stats
+        if stats is not None:
+            if stats.next_seq != seq:
+                stats = self._stats = None
+            elif len(history) == history.capacity:
+                evicted = history[0]
+                stats.remove(evicted["operation"], evicted["result"])
+        self.offset += history.append(operation_name, a, b, result)
+        if stats is not None:
+            stats.add(operation_name, result)
+        index = self._index
+        if index is not None and index.next_seq == seq:
+            index.add(seq, operation_name, a, b, result)
+
+    def append_to_journal(self):
+        """Persist only the entries added since the last write.
+
+        Falls back to a full ``save_to_csv`` (which compacts the journal) when the in-memory
+        history was replaced, or unwritten entries were already evicted from the ring buffer
+        (those are lost; the saved entries before them are kept).
+        """
+        if self._journaled is None or self._journaled < self._history.first_seq:
+            self.save_to_csv()
+            return
+        new_entries = self._history.since(self._journaled)
+        if not new_entries:
+            return
+        try:
+            self.backend.append(new_entries)
+        except Exception as e:
+            raise HistoryError(f"Failed to append to history journal: {str(e)}")
+        self._journaled = self._history.next_seq
+
+    # save_to_csv/load_from_csv predate pluggable backends; they write and read through
+    # whichever backend CALCULATOR_HISTORY_BACKEND selects (CSV by default).
     def save_to_csv(self):
         try:
-            df = pd.DataFrame(self.history)
-            df.to_csv(self.history_file, index=False, encoding=CalculatorConfig.DEFAULT_ENCODING)
+            self.backend.save(self._history, keep=self.offset)
         except Exception as e:
             raise HistoryError(f"Failed to save history: {str(e)}") # pragma: no cover
+        self._journaled = self._history.next_seq
 
     def load_from_csv(self):
-        if not os.path.exists(self.history_file):
-            return  # No history file yet, so nothing to load
+        """Replace the history with the newest saved entries.
+
+        Returns an ``ImportReport``; malformed rows are skipped and listed there.
+        """
+        report = ImportReport(self.history_file)
+        if not self.backend.exists():
+            return report  # No history file yet, so nothing to load
 
         try:
-            df = pd.read_csv(self.history_file, encoding=CalculatorConfig.DEFAULT_ENCODING)
-            self.history = df.to_dict(orient="records")
+            # Only the newest MAX_HISTORY_SIZE entries fit in memory, so only those are kept
+            records = self.backend.read_tail(CalculatorConfig.MAX_HISTORY_SIZE, report)
+            self.offset = self.backend.count() - len(records)
         except Exception as e:
             raise HistoryError(f"Failed to load history: {str(e)}") # pragma: no cover
+        self._history = HistoryStore(CalculatorConfig.MAX_HISTORY_SIZE, records)
+        self._index = None
+        self._stats = None  # rebuilt in one vectorized pass by the next analyze()
+        # Everything on disk is either in memory or older than the ring buffer keeps
+        self._journaled = self._history.next_seq
+        report.imported = len(records)
+        return report
+
+    def import_history(self, path, merge=False):
+        """Append the entries of an external history CSV, streaming it chunk by chunk.
+
+        Each chunk of valid rows is appended to the history file and to the in-memory
+        history (which keeps the newest MAX_HISTORY_SIZE). Malformed rows are skipped and
+        listed in the returned ``ImportReport``. With ``merge``, rows equal to an entry
+        already in the in-memory history are skipped as duplicates.
+        """
+        if not os.path.isfile(path):
+            raise HistoryError(f"History file not found: {path}")
+        report = ImportReport(path)
+        try:
+            self.append_to_journal()  # persist current entries before the imported ones
+            existing = {tuple(entry.values()) for entry in self._history} if merge else None
+            chunks = validate_chunks(read_chunks(path, CalculatorConfig.HISTORY_CHUNK_SIZE), report)
+            for entries in chunks:
+                if existing is not None:
+                    fresh = [entry for entry in entries if tuple(entry.values()) not in existing]
+                    report.duplicates += len(entries) - len(fresh)
+                    entries = fresh
+                    if not entries:
+                        continue
+                self.backend.append(entries)
+                # Older entries of a chunk larger than the ring buffer would be evicted at once
+                self.offset += max(len(entries) - CalculatorConfig.MAX_HISTORY_SIZE, 0)
+                for entry in entries[-CalculatorConfig.MAX_HISTORY_SIZE:]:
+                    self._append(entry["operation"], entry["a"], entry["b"], entry["result"])
+                self._journaled = self._history.next_seq
+                report.imported += len(entries)
+        except HistoryError:
+            raise
+        except Exception as e:
+            raise HistoryError(f"Failed to import history: {str(e)}")
+        return report
+
+    def export_history(self, path):
+        """Write the in-memory history to a CSV at ``path`` in chunks; returns the entry count."""
+        try:
+            return write_entries(path, self._history)
+        except Exception as e:
+            raise HistoryError(f"Failed to export history: {str(e)}")
+
+    def saved_count(self):
+        try:
+            return self.backend.count() if self.backend.exists() else 0
+        except Exception as e:
+            raise HistoryError(f"Failed to read history: {str(e)}")
+
+    def get_saved_range(self, start, stop):
+        """Saved entries ``start`` (inclusive) to ``stop`` (exclusive), 0-based, read from the backend."""
+        if not self.backend.exists():
+            return []
+        try:
+            return self.backend.read_range(start, stop)
+        except Exception as e:
+            raise HistoryError(f"Failed to read history: {str(e)}")
 
     def get_all(self):
-        return self.history
+        return self._history
+
+    def find(self, operation=None, a=None, b=None, result=None, positions=None, limit=None):
+        """In-memory entries matching every given filter, as ``(position, entry)`` pairs.
+
+        ``a``, ``b`` and ``result`` are inclusive ``(low, high)`` value ranges and
+        ``positions`` an inclusive ``(start, stop)`` range of 1-based positions; any bound
+        may be None. Results come back in history order, at most ``limit`` of them.
+        """
+        index = self._index
+        if index is None or index.store is not self._history:
+            from app.history_index import HistoryIndex  # numpy; only needed once history is searched
+            index = self._index = HistoryIndex(self._history)
+        if positions is not None:
+            start, stop = positions
+            positions = (None if start is None else max(start - 1, 0), stop)
+        seqs = index.query(
+            operation=None if operation is None else operation.lower(),
+            a=a, b=b, result=result, positions=positions,
+        )
+        if limit is not None:
+            seqs = seqs[:limit]
+        first_seq = self._history.first_seq
+        return [(seq - first_seq + 1, self._history[seq - first_seq]) for seq in seqs]
+
+    def analyze(self, operation=None):
+        """Summaries of the in-memory history, as one dict per operation plus an "all" total.
+
+        Each has the entry ``count``, ``sum``/``mean``/``min``/``max``/``variance`` of the
+        numeric results (``min``/``max`` are None without any), and the session's ``errors``
+        and ``error_rate`` (failed attempts over all attempts). With ``operation``, only
+        that operation's summary is returned, and nothing if it has no entries or errors.
+        """
+        from app.history_stats import HistoryStats, RunningStats  # numpy; only needed once history is analyzed
+        stats = self._stats
+        if stats is None or stats.store is not self._history:
+            stats = self._stats = HistoryStats(self._history)
+        operations = stats.summary()
+        names = sorted(set(operations) | set(self._errors))
+        if operation is not None:
+            names = [name for name in names if name == operation.lower()]
+        rows = [self._summary_row(name, operations.get(name) or RunningStats(), self._errors.get(name, 0),
+                                  self._completed.get(name, 0)) for name in names]
+        if operation is None and rows:
+            total = RunningStats()
+            for running in operations.values():
+                total.merge(running)
+            rows.append(self._summary_row("all", total, sum(self._errors.values()), sum(self._completed.values())))
+        return rows
+
+    @staticmethod
+    def _summary_row(name, running, errors, completed):
+        attempts = errors + completed
+        return {
+            "operation": name,
+            "count": running.count,
+            "sum": running.sum,
+            "mean": running.mean if running.n else None,
+            "min": running.min if running.n else None,
+            "max": running.max if running.n else None,
+            "variance": running.variance,
+            "errors": errors,
+            "error_rate": errors / attempts if attempts else 0.0,
+        }
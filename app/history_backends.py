@@ -0,0 +1,321 @@
+# app/history_backends.py
+
+import abc
+import collections
+import itertools
+import numbers
+import os
+import struct
+from app.exceptions import HistoryError
+from app.history_stream import COLUMNS, iter_entries, write_entries
+
+
+class HistoryBackend(abc.ABC):
+    """Where HistoryManager persists entries.
+
+    ``save`` rewrites the file after its first ``keep`` entries (older history that no
+    longer fits in memory), ``append`` adds entries to the end. Reads go
+    through ``count``/``read_range``/``read_tail`` so backends with random access can
+    serve them without materializing the whole file. Backends that can meet malformed
+    rows skip them and record them in the ``report`` (an ``ImportReport``) if given.
+    """
+
+    filename = None
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, self.filename)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @abc.abstractmethod
+    def save(self, entries, keep=0):
+        """Replace everything saved after the first ``keep`` entries with ``entries``."""
+
+    @abc.abstractmethod
+    def append(self, entries):
+        """Add ``entries`` after the ones already saved."""
+
+    @abc.abstractmethod
+    def read_all(self):
+        """Every saved entry, oldest first."""
+
+    def count(self):
+        return len(self.read_all())
+
+    def read_range(self, start, stop):
+        return self.read_all()[start:stop]
+
+    def read_tail(self, n, report=None):
+        records = self.read_all()
+        return records[max(len(records) - n, 0):]
+
+
+class CSVHistoryBackend(HistoryBackend):
+    """CSV snapshot plus an append-only journal that is compacted on ``save``.
+
+    Both files are written and read as chunked streams (see ``app.history_stream``), so
+    memory use is bounded by the chunk size and, for ``read_tail``, by ``n``.
+    """
+
+    filename = "calculator_history.csv"
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.journal_file = os.path.join(directory, "calculator_history.journal")
+
+    def exists(self):
+        return os.path.exists(self.path) or self._has_journal()
+
+    def _has_journal(self):
+        return os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > 0
+
+    def save(self, entries, keep=0):
+        if keep:
+            # Stream the kept entries out of the old files into the new snapshot
+            entries = itertools.chain(itertools.islice(self.iter_entries(), keep), entries)
+        write_entries(self.path, entries)
+        # The CSV now holds everything, so the journal is compacted away
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    def append(self, entries):
+        write_entries(self.journal_file, entries, header=False, append=True)
+
+    def iter_entries(self, report=None):
+        if os.path.exists(self.path):
+            yield from iter_entries(self.path, report=report)
+        if self._has_journal():
+            # Replay entries appended since the last compaction
+            yield from iter_entries(self.journal_file, report=report)
+
+    def read_all(self):
+        return list(self.iter_entries())
+
+    def count(self):
+        return sum(1 for _ in self.iter_entries())
+
+    def read_range(self, start, stop):
+        return list(itertools.islice(self.iter_entries(), max(start, 0), max(stop, 0)))
+
+    def read_tail(self, n, report=None):
+        return list(collections.deque(self.iter_entries(report), maxlen=n))
+
+
+def _sql_value(value):
+    # SQLite stores ints and floats natively; complex values as their repr, e.g. "(1+2j)"
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, numbers.Complex):
+        return str(complex(value))
+    raise HistoryError(f"Cannot store {type(value).__name__} value in history: {value!r}")
+
+
+def _sql_entry(row):
+    entry = dict(zip(COLUMNS, row))
+    for column in ("a", "b", "result"):
+        if isinstance(entry[column], str):
+            entry[column] = complex(entry[column])
+    return entry
+
+
+class SQLiteHistoryBackend(HistoryBackend):
+    filename = "calculator_history.sqlite3"
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, operation TEXT NOT NULL, a, b, result)"
+        )
+        return conn
+
+    def _insert(self, conn, entries):
+        conn.executemany(
+            "INSERT INTO history (operation, a, b, result) VALUES (?, ?, ?, ?)",
+            (
+                (entry["operation"], _sql_value(entry["a"]), _sql_value(entry["b"]), _sql_value(entry["result"]))
+                for entry in entries
+            ),
+        )
+
+    def save(self, entries, keep=0):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM history WHERE id NOT IN (SELECT id FROM history ORDER BY id LIMIT ?)",
+                             (keep,))
+                self._insert(conn, entries)
+        finally:
+            conn.close()
+
+    def append(self, entries):
+        conn = self._connect()
+        try:
+            with conn:
+                self._insert(conn, entries)
+        finally:
+            conn.close()
+
+    def _select(self, sql, params=()):
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [_sql_entry(row) for row in rows]
+
+    def read_all(self):
+        return self._select("SELECT operation, a, b, result FROM history ORDER BY id")
+
+    def count(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        finally:
+            conn.close()
+
+    def read_range(self, start, stop):
+        if stop <= start:
+            return []
+        return self._select(
+            "SELECT operation, a, b, result FROM history ORDER BY id LIMIT ? OFFSET ?",
+            (stop - start, start),
+        )
+
+    def read_tail(self, n, report=None):
+        rows = self._select(
+            "SELECT operation, a, b, result FROM history ORDER BY id DESC LIMIT ?", (n,)
+        )
+        rows.reverse()
+        return rows
+
+
+# Fixed-width binary records: a, b, result as float64, then their imaginary parts (complex
+# roots and the expressions built on them), a flags byte recording which values were ints
+# and which complex, and the operation name NUL-padded to 23 bytes -> 72 bytes per entry.
+_MAGIC = b"CALCHIST"
+_VERSION = 2
+_HEADER = struct.Struct("<8sII")  # magic, format version, record size
+_RECORD = struct.Struct("<ddddddB23s")
+_INT, _COMPLEX = 1, 8  # flag bits for a; shifted left by 1 for b and by 2 for result
+
+
+def _pack_value(value):
+    # (real, imaginary, flags)
+    if isinstance(value, float):
+        return value, 0.0, 0
+    if isinstance(value, numbers.Integral) and -2 ** 53 <= value <= 2 ** 53:
+        return float(value), 0.0, _INT
+    if isinstance(value, numbers.Real):
+        return float(value), 0.0, 0
+    if isinstance(value, numbers.Complex):
+        return value.real, value.imag, _COMPLEX
+    raise HistoryError(f"Cannot store {type(value).__name__} value in history: {value!r}")
+
+
+def _pack(entry):
+    name = entry["operation"].encode("utf-8")
+    if len(name) > 23:
+        raise HistoryError(f"Operation name too long for binary history: '{entry['operation']}'")
+    a, a_imag, a_flags = _pack_value(entry["a"])
+    b, b_imag, b_flags = _pack_value(entry["b"])
+    result, result_imag, result_flags = _pack_value(entry["result"])
+    flags = a_flags | b_flags << 1 | result_flags << 2
+    return _RECORD.pack(a, b, result, a_imag, b_imag, result_imag, flags, name)
+
+
+def _unpack_value(real, imag, flags):
+    if flags & _INT:
+        return int(real)
+    if flags & _COMPLEX:
+        return complex(real, imag)
+    return real
+
+
+def _unpack(a, b, result, a_imag, b_imag, result_imag, flags, name):
+    return {
+        "operation": name.rstrip(b"\0").decode("utf-8"),
+        "a": _unpack_value(a, a_imag, flags),
+        "b": _unpack_value(b, b_imag, flags >> 1),
+        "result": _unpack_value(result, result_imag, flags >> 2),
+    }
+
+
+class BinaryHistoryBackend(HistoryBackend):
+    """Fixed-width records read through ``mmap``, so ranges are served without a full read."""
+
+    filename = "calculator_history.bin"
+
+    def _header(self):
+        return _HEADER.pack(_MAGIC, _VERSION, _RECORD.size)
+
+    def save(self, entries, keep=0):
+        data = b"".join(_pack(entry) for entry in entries)
+        keep = min(keep, self.count())
+        if keep:
+            # Fixed-width records: cut the file after the kept ones and write the rest in place
+            self.read_range(0, 1)  # refuses files in another format
+            with open(self.path, "r+b") as f:
+                f.truncate(_HEADER.size + keep * _RECORD.size)
+                f.seek(0, os.SEEK_END)
+                f.write(data)
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._header())
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def append(self, entries):
+        data = b"".join(_pack(entry) for entry in entries)
+        if not os.path.exists(self.path):
+            data = self._header() + data
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def count(self):
+        if not os.path.exists(self.path):
+            return 0
+        # A torn record from an interrupted append is ignored
+        return max(os.path.getsize(self.path) - _HEADER.size, 0) // _RECORD.size
+
+    def read_range(self, start, stop):
+        start, stop = max(start, 0), min(stop, self.count())
+        if stop <= start:
+            return []
+        import mmap
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, record_size = _HEADER.unpack_from(mm, 0)
+            if magic != _MAGIC:
+                raise HistoryError(f"Not a calculator binary history file: {self.path}")
+            if version != _VERSION or record_size != _RECORD.size:
+                raise HistoryError(f"Unsupported binary history format version {version}: {self.path}")
+            chunk = mm[_HEADER.size + start * _RECORD.size:_HEADER.size + stop * _RECORD.size]
+        return [_unpack(*fields) for fields in _RECORD.iter_unpack(chunk)]
+
+    def read_all(self):
+        return self.read_range(0, self.count())
+
+    def read_tail(self, n, report=None):
+        total = self.count()
+        return self.read_range(max(total - n, 0), total)
+
+
+BACKENDS = {
+    "csv": CSVHistoryBackend,
+    "sqlite": SQLiteHistoryBackend,
+    "binary": BinaryHistoryBackend,
+}
+
+
+def create_backend(name, directory):
+    backend_class = BACKENDS.get(name.lower())
+    if backend_class is None:
+        raise HistoryError(f"Unknown history backend: '{name}'")
+    return backend_class(directory)
@@ -0,0 +1,200 @@
+# app/history_index.py
+
+import math
+import numbers
+from array import array
+from bisect import bisect_left
+import numpy as np
+
+# Recent keys wait in an unsorted buffer and are merged into the sorted arrays at least this
+# many at a time (more for large arrays, so each merge's O(n) copy is spread over more adds)
+_MERGE_THRESHOLD = 1024
+
+
+def _sort_key(value):
+    # Complex results, NaN and ints too large for a float have no place in a sorted index
+    if type(value) is float:
+        return value if value == value else None
+    if isinstance(value, numbers.Real):
+        try:
+            value = float(value)
+        except OverflowError:
+            return None
+        if not math.isnan(value):
+            return value
+    return None
+
+
+class SortedKeys:
+    """Numeric keys in sorted NumPy arrays, each next to the sequence number of its entry.
+
+    Appends go to a small unsorted buffer that is merged in bulk, so adding a key costs
+    amortized O(1) instead of shifting the whole array.
+    """
+
+    def __init__(self, keys=None, seqs=None):
+        if keys is None:
+            self.keys = np.empty(0, dtype=np.float64)
+            self.seqs = np.empty(0, dtype=np.int64)
+        else:
+            order = np.argsort(keys, kind="stable")
+            self.keys = np.asarray(keys, dtype=np.float64)[order]
+            self.seqs = np.asarray(seqs, dtype=np.int64)[order]
+        self._pending_keys = []
+        self._pending_seqs = []
+
+    def __len__(self):
+        return len(self.keys) + len(self._pending_keys)
+
+    def add(self, key, seq):
+        self._pending_keys.append(key)
+        self._pending_seqs.append(seq)
+        if len(self._pending_keys) >= max(_MERGE_THRESHOLD, len(self.keys) >> 6):
+            self._merge()
+
+    def _merge(self):
+        if not self._pending_keys:
+            return
+        keys = np.array(self._pending_keys, dtype=np.float64)
+        seqs = np.array(self._pending_seqs, dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        keys, seqs = keys[order], seqs[order]
+        positions = np.searchsorted(self.keys, keys, side="right")
+        self.keys = np.insert(self.keys, positions, keys)
+        self.seqs = np.insert(self.seqs, positions, seqs)
+        self._pending_keys = []
+        self._pending_seqs = []
+
+    def range(self, low, high):
+        """Sequence numbers of keys in ``[low, high]``; either bound may be None (open)."""
+        start = 0 if low is None else np.searchsorted(self.keys, low, side="left")
+        stop = len(self.keys) if high is None else np.searchsorted(self.keys, high, side="right")
+        seqs = self.seqs[start:stop]
+        if not self._pending_keys:
+            return seqs
+        pending = [
+            seq for key, seq in zip(self._pending_keys, self._pending_seqs)
+            if (low is None or key >= low) and (high is None or key <= high)
+        ]
+        return np.concatenate((seqs, np.array(pending, dtype=np.int64))) if pending else seqs
+
+    def drop_before(self, first_seq):
+        self._merge()
+        live = self.seqs >= first_seq
+        self.keys = self.keys[live]
+        self.seqs = self.seqs[live]
+
+
+class HistoryIndex:
+    """Search indexes over one ``HistoryStore``, addressed by entry sequence number.
+
+    Keeps a posting list of sequence numbers per operation and sorted ``a``/``b``/``result``
+    keys for bisect range lookups. Entries evicted from the ring buffer are skipped at query
+    time and compacted away once they outnumber the live ones, so eviction costs nothing.
+    """
+
+    FIELDS = ("a", "b", "result")
+
+    def __init__(self, store):
+        self.store = store
+        self._build()
+
+    def _build(self):
+        # One vectorized pass over the store's columns
+        store = self.store
+        codes, names, columns, extras = store.columns()
+        seqs = np.arange(store.first_seq, store.next_seq, dtype=np.int64)
+        regular = np.ones(len(seqs), dtype=bool)
+        regular[[seq - store.first_seq for seq in extras]] = False
+        self.operations = {}
+        for code, name in enumerate(names):
+            matches = seqs[regular & (codes == code)]
+            if len(matches):
+                self.operations[name] = array("q", matches.tobytes())
+        self.sorted = {}
+        for field, column in zip(self.FIELDS, columns):
+            valid = regular & ~np.isnan(column)
+            self.sorted[field] = SortedKeys(column[valid], seqs[valid])
+        self.next_seq = store.first_seq
+        self._compacted_to = store.first_seq
+        for seq, entry in sorted(extras.items()):
+            self._add_posting(entry["operation"], seq)
+            for field in self.FIELDS:
+                key = _sort_key(entry[field])
+                if key is not None:
+                    self.sorted[field].add(key, seq)
+        for postings in self.operations.values():
+            if len(postings) > 1 and postings[-1] < postings[-2]:
+                postings[:] = array("q", sorted(postings))
+        self.next_seq = store.next_seq
+
+    def _add_posting(self, operation, seq):
+        postings = self.operations.get(operation)
+        if postings is None:
+            postings = self.operations[operation] = array("q")
+        postings.append(seq)
+
+    def add(self, seq, operation, a, b, result):
+        """Index an entry the store just appended."""
+        self._add_posting(operation, seq)
+        for field, value in zip(self.FIELDS, (a, b, result)):
+            key = _sort_key(value)
+            if key is not None:
+                self.sorted[field].add(key, seq)
+        self.next_seq = seq + 1
+
+    def sync(self):
+        """Catch up with entries appended to the store since the index last saw it."""
+        store = self.store
+        if self.next_seq < store.first_seq:
+            self._build()  # more new entries than the store can even hold
+        for seq, entry in enumerate(store.since(self.next_seq), start=self.next_seq):
+            self.add(seq, entry["operation"], entry["a"], entry["b"], entry["result"])
+        if store.first_seq - self._compacted_to > len(store):
+            self._compact()
+
+    def _compact(self):
+        first_seq = self.store.first_seq
+        for operation, postings in list(self.operations.items()):
+            live = postings[bisect_left(postings, first_seq):]
+            if live:
+                self.operations[operation] = live
+            else:
+                del self.operations[operation]
+        for keys in self.sorted.values():
+            keys.drop_before(first_seq)
+        self._compacted_to = first_seq
+
+    def query(self, operation=None, a=None, b=None, result=None, positions=None):
+        """Sequence numbers (ascending) of stored entries matching every given filter.
+
+        ``a``, ``b`` and ``result`` are inclusive ``(low, high)`` ranges and ``positions`` is
+        a ``(start, stop)`` range of 0-based offsets into the store; None bounds are open.
+        """
+        self.sync()
+        first_seq, next_seq = self.store.first_seq, self.store.next_seq
+        low_seq, high_seq = first_seq, next_seq
+        if positions is not None:
+            start, stop = positions
+            if start is not None:
+                low_seq = max(low_seq, first_seq + start)
+            if stop is not None:
+                high_seq = min(high_seq, first_seq + stop)
+        if high_seq <= low_seq:
+            return []
+        candidates = []
+        if operation is not None:
+            postings = self.operations.get(operation, array("q"))
+            window = postings[bisect_left(postings, low_seq):bisect_left(postings, high_seq)]
+            candidates.append(np.frombuffer(window, dtype=np.int64) if window else np.empty(0, np.int64))
+        for field, bounds in zip(self.FIELDS, (a, b, result)):
+            if bounds is not None:
+                candidates.append(self.sorted[field].range(*bounds))
+        if not candidates:
+            return list(range(low_seq, high_seq))
+        # Count how many filters each sequence number in the window satisfies
+        hits = np.zeros(high_seq - low_seq, dtype=np.int8)
+        for candidate in candidates:
+            candidate = candidate[(candidate >= low_seq) & (candidate < high_seq)]
+            hits[candidate - low_seq] += 1
+        return (np.flatnonzero(hits == len(candidates)) + low_seq).tolist()
@@ -0,0 +1,169 @@
+# app/history_stats.py
+
+import math
+import numbers
+import numpy as np
+
+
+def _numeric(value):
+    # Results that count toward sum/mean/min/max/variance: real and finite
+    if type(value) is float:
+        return value if math.isfinite(value) else None
+    if isinstance(value, numbers.Real):
+        try:
+            value = float(value)
+        except OverflowError:
+            return None
+        if math.isfinite(value):
+            return value
+    return None
+
+
+class RunningStats:
+    """Count, mean, sum of squared deviations, min and max of a stream of values (Welford).
+
+    ``count`` is every entry, ``n`` only those with a numeric result. Removing the current
+    minimum or maximum leaves them ``stale`` until they are recomputed from the data.
+    """
+
+    __slots__ = ("count", "n", "mean", "m2", "min", "max", "stale")
+
+    def __init__(self, count=0, n=0, mean=0.0, m2=0.0, minimum=math.inf, maximum=-math.inf):
+        self.count = count
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.stale = False
+
+    def add(self, value):
+        self.count += 1
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def remove(self, value):
+        self.count -= 1
+        if value is None:
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean, self.m2, self.min, self.max = 0.0, 0.0, math.inf, -math.inf
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.n
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        if value <= self.min or value >= self.max:
+            self.stale = True
+
+    def merge(self, other):
+        """Combine with another ``RunningStats`` (Chan et al.'s parallel update)."""
+        self.count += other.count
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.stale = self.stale or other.stale
+
+    @property
+    def sum(self):
+        return self.mean * self.n
+
+    @property
+    def variance(self):
+        # Sample variance; undefined below two values, reported as 0
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+
+class HistoryStats:
+    """Per-operation ``RunningStats`` over the results of one ``HistoryStore``.
+
+    Built with one vectorized pass over the store's columns, then updated in O(1) per
+    appended or evicted entry. A full rebuild replaces the running values once a stale
+    minimum or maximum is needed, or once more entries were removed than the store holds
+    (so rounding from repeated removals can't build up).
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._build()
+
+    def _build(self):
+        store = self.store
+        codes, names, columns, extras = store.columns()
+        results = columns[2]
+        regular = np.ones(len(codes), dtype=bool)
+        regular[[seq - store.first_seq for seq in extras]] = False
+        counts = np.bincount(codes[regular], minlength=len(names))
+        numeric = regular & np.isfinite(results)
+        if not numeric.all():
+            codes, results = codes[numeric], results[numeric]
+        # Sort the numeric results by operation code and reduce each run of equal codes
+        order = np.argsort(codes, kind="stable")
+        codes, results = codes[order], results[order]
+        bounds = np.searchsorted(codes, np.arange(len(names) + 1))
+        sizes = np.diff(bounds)
+        present = sizes > 0
+        starts = bounds[:-1][present]
+        means = np.zeros(len(names))
+        m2s = np.zeros(len(names))
+        minimums = np.full(len(names), math.inf)
+        maximums = np.full(len(names), -math.inf)
+        if len(starts):
+            # Sums of huge results overflow to inf (and inf - inf to nan), as the running
+            # updates do; that is what gets reported, so numpy needn't warn about it
+            with np.errstate(over="ignore", invalid="ignore"):
+                means[present] = np.add.reduceat(results, starts) / sizes[present]
+                deviations = results - np.repeat(means[present], sizes[present])
+                m2s[present] = np.add.reduceat(deviations * deviations, starts)
+                minimums[present] = np.minimum.reduceat(results, starts)
+                maximums[present] = np.maximum.reduceat(results, starts)
+        self.operations = {}
+        for code, name in enumerate(names):
+            if counts[code]:
+                self.operations[name] = RunningStats(
+                    int(counts[code]), int(sizes[code]), float(means[code]), float(m2s[code]),
+                    float(minimums[code]), float(maximums[code]),
+                )
+        for entry in extras.values():
+            self._stats(entry["operation"]).add(_numeric(entry["result"]))
+        self.next_seq = store.next_seq
+        self._removed = 0
+
+    def _stats(self, operation):
+        stats = self.operations.get(operation)
+        if stats is None:
+            stats = self.operations[operation] = RunningStats()
+        return stats
+
+    def add(self, operation, result):
+        """Count an entry the store just appended."""
+        self._stats(operation).add(_numeric(result))
+        self.next_seq += 1
+
+    def remove(self, operation, result):
+        """Uncount an entry the store evicted."""
+        stats = self.operations[operation]
+        stats.remove(_numeric(result))
+        if not stats.count:
+            del self.operations[operation]
+        self._removed += 1
+
+    def summary(self):
+        """``{operation: RunningStats}`` for every operation in the store, rebuilt first if needed."""
+        if self._removed > len(self.store) or any(stats.stale for stats in self.operations.values()):
+            self._build()
+        return self.operations
@@ -0,0 +1,160 @@
+# app/history_store.py
+
+import numbers
+from array import array
+
+_MAX_EXACT_INT = 2 ** 53
+
+# Per-row flags in the kind column
+_A_INT = 1
+_B_INT = 2
+_RESULT_INT = 4
+_EXTRA = 8  # row didn't fit the numeric columns and lives in the side table
+
+
+def _encode(value):
+    if isinstance(value, float):
+        return value, 0
+    if isinstance(value, numbers.Integral) and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+        return float(value), 1
+    return None, None
+
+
+class HistoryStore:
+    """Columnar ring buffer of history entries.
+
+    Each entry is an operation code (uint8) plus float64 columns for ``a``, ``b`` and
+    ``result``, so an entry costs ~26 bytes instead of a dict. Once ``capacity`` entries
+    are stored, each append overwrites the oldest one. Indexing returns a fresh dict per
+    entry, built on access.
+    """
+
+    def __init__(self, capacity, entries=()):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._ops = array("B")
+        self._a = array("d")
+        self._b = array("d")
+        self._result = array("d")
+        self._kinds = array("B")
+        self._op_names = []
+        self._op_codes = {}
+        self._extras = {}  # sequence number -> entry that can't be stored in the columns
+        self._head = 0  # physical slot of the oldest entry
+        self.first_seq = 0  # sequence number of the oldest entry still stored
+        if isinstance(entries, (list, tuple, HistoryStore)) and len(entries) > capacity:
+            entries = entries[len(entries) - capacity:]
+        for entry in entries:
+            self.append(entry["operation"], entry["a"], entry["b"], entry["result"])
+
+    @property
+    def next_seq(self):
+        return self.first_seq + len(self._ops)
+
+    def _op_code(self, operation):
+        code = self._op_codes.get(operation)
+        if code is None:
+            if len(self._op_names) > 255:
+                return None
+            code = len(self._op_names)
+            self._op_names.append(operation)
+            self._op_codes[operation] = code
+        return code
+
+    def append(self, operation, a, b, result):
+        """Add an entry and return how many old entries were evicted (0 or 1)."""
+        code = self._op_code(operation)
+        a_value, a_int = _encode(a)
+        b_value, b_int = _encode(b)
+        result_value, result_int = _encode(result)
+        if code is None or a_int is None or b_int is None or result_int is None:
+            # Complex results, huge ints, unexpected types: keep the entry verbatim
+            self._extras[self.next_seq] = {"operation": operation, "a": a, "b": b, "result": result}
+            code, kind, a_value, b_value, result_value = 0, _EXTRA, 0.0, 0.0, 0.0
+        else:
+            kind = a_int * _A_INT | b_int * _B_INT | result_int * _RESULT_INT
+
+        if len(self._ops) < self.capacity:
+            self._ops.append(code)
+            self._a.append(a_value)
+            self._b.append(b_value)
+            self._result.append(result_value)
+            self._kinds.append(kind)
+            return 0
+
+        slot = self._head
+        if self._kinds[slot] & _EXTRA:
+            del self._extras[self.first_seq]
+        self._ops[slot] = code
+        self._a[slot] = a_value
+        self._b[slot] = b_value
+        self._result[slot] = result_value
+        self._kinds[slot] = kind
+        self._head = (slot + 1) % self.capacity
+        self.first_seq += 1
+        return 1
+
+    def _slot(self, index):
+        return (self._head + index) % self.capacity
+
+    def _entry(self, slot, seq):
+        kind = self._kinds[slot]
+        if kind & _EXTRA:
+            return dict(self._extras[seq])
+        a, b, result = self._a[slot], self._b[slot], self._result[slot]
+        return {
+            "operation": self._op_names[self._ops[slot]],
+            "a": int(a) if kind & _A_INT else a,
+            "b": int(b) if kind & _B_INT else b,
+            "result": int(result) if kind & _RESULT_INT else result,
+        }
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        size = len(self._ops)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._entry(self._slot(index), self.first_seq + index)
+
+    def __iter__(self):
+        for index in range(len(self._ops)):
+            yield self._entry(self._slot(index), self.first_seq + index)
+
+    def columns(self):
+        """Column copies in history order, for vectorized consumers.
+
+        Returns ``(op_codes, op_names, (a, b, result), extras)`` where the codes and values
+        are NumPy arrays and ``extras`` maps sequence numbers to entries stored verbatim
+        (their column values are placeholders).
+        """
+        import numpy as np
+
+        # np.roll copies, so the arrays never pin the columns' buffers
+        codes = np.roll(np.array(self._ops, dtype=np.uint8), -self._head)
+        values = tuple(
+            np.roll(np.array(column, dtype=np.float64), -self._head)
+            for column in (self._a, self._b, self._result)
+        )
+        return codes, list(self._op_names), values, dict(self._extras)
+
+    def since(self, seq):
+        """Entries with sequence number >= ``seq`` (clamped to what is still stored)."""
+        return self[max(seq - self.first_seq, 0):]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, HistoryStore)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def copy(self):
+        return HistoryStore(self.capacity, self)
+
+    def __repr__(self):
+        return f"HistoryStore({list(self)!r}, capacity={self.capacity})"
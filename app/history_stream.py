@@ -0,0 +1,133 @@
+# app/history_stream.py
+
+import itertools
+import os
+from app.calculator_config import CalculatorConfig
+
+COLUMNS = ["operation", "a", "b", "result"]
+
+# Bad rows beyond this many are counted but their messages are dropped
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    """Outcome of streaming a history file: rows accepted, rows rejected and why."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.imported = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.errors = []  # (line number, message), the first MAX_REPORTED_ERRORS only
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def __repr__(self):
+        return f"ImportReport(imported={self.imported}, skipped={self.skipped}, duplicates={self.duplicates})"
+
+
+def _parse_number(text):
+    # Whole numbers written without a decimal point were ints when saved
+    if text.lstrip("+-").isdigit():
+        return int(text)
+    return float(text)
+
+
+def _parse_value(text):
+    # Results may be complex (roots of negative numbers), written as e.g. "(1+2j)", and so
+    # may the operands of eval expressions built on them
+    try:
+        return _parse_number(text)
+    except ValueError:
+        return complex(text)
+
+
+def parse_row(row):
+    """Build an entry from one CSV row, or raise ValueError describing what is wrong."""
+    if len(row) != len(COLUMNS):
+        raise ValueError(f"expected {len(COLUMNS)} fields, got {len(row)}")
+    operation, a, b, result = (field.strip() for field in row)
+    if not operation:
+        raise ValueError("missing operation")
+    try:
+        a_value, b_value = _parse_value(a), _parse_value(b)
+    except ValueError:
+        raise ValueError(f"operands must be numbers, got {a!r}, {b!r}") from None
+    try:
+        result_value = _parse_value(result)
+    except ValueError:
+        raise ValueError(f"result must be a number, got {result!r}") from None
+    return {"operation": operation, "a": a_value, "b": b_value, "result": result_value}
+
+
+def read_chunks(path, chunk_size, encoding=None):
+    """Yield lists of up to ``chunk_size`` ``(line number, row)`` pairs from a CSV file.
+
+    A leading ``operation,a,b,result`` header is skipped, so files with or without one
+    (snapshots and journals) stream the same way.
+    """
+    import csv  # csv pulls in re; a session that never touches its history file skips both
+    with open(path, newline="", encoding=encoding or CalculatorConfig.DEFAULT_ENCODING) as f:
+        reader = csv.reader(f)
+        numbered = ((reader.line_num, row) for row in reader)
+        first = next(numbered, None)
+        if first is None:
+            return
+        if first[1] != COLUMNS:
+            numbered = itertools.chain([first], numbered)
+        while True:
+            chunk = list(itertools.islice(numbered, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def validate_chunks(chunks, report=None):
+    """Turn chunks of raw rows into chunks of entries, reporting bad rows instead of failing."""
+    for chunk in chunks:
+        entries = []
+        for line, row in chunk:
+            if not row:
+                continue  # blank line
+            try:
+                entries.append(parse_row(row))
+            except ValueError as e:
+                if report is not None:
+                    report.add_error(line, str(e))
+        if entries:
+            yield entries
+
+
+def iter_entries(path, chunk_size=None, report=None):
+    """Stream the valid entries of a history CSV, one chunk in memory at a time."""
+    chunk_size = chunk_size or CalculatorConfig.HISTORY_CHUNK_SIZE
+    for entries in validate_chunks(read_chunks(path, chunk_size), report):
+        yield from entries
+
+
+def write_entries(path, entries, chunk_size=None, header=True, append=False):
+    """Write entries to a CSV in chunks; returns how many were written.
+
+    A full write goes to a temporary file that replaces ``path`` only once complete.
+    """
+    import csv
+    chunk_size = chunk_size or CalculatorConfig.HISTORY_CHUNK_SIZE
+    target = path if append else path + ".tmp"
+    count = 0
+    with open(target, "a" if append else "w", newline="", encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(COLUMNS)
+        rows = ((entry["operation"], entry["a"], entry["b"], entry["result"]) for entry in entries)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(chunk)
+            count += len(chunk)
+    if not append:
+        os.replace(target, path)
+    return count
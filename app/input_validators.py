@@ -1,5 +1,29 @@
+from collections import namedtuple
+from operator import itemgetter
+from app.calculator_config import CalculatorConfig
 from app.exceptions import ValidationError
 
+# Per-row error codes from validate_batch. A row with several problems gets the highest one.
+VALID = 0
+OUT_OF_RANGE = 1
+NON_FINITE = 2
+NON_NUMERIC = 3
+WRONG_ARITY = 4
+
+ERROR_NAMES = {
+    OUT_OF_RANGE: "out of range",
+    NON_FINITE: "non-finite",
+    NON_NUMERIC: "non-numeric",
+    WRONG_ARITY: "wrong arity",
+}
+
+# operands: one float64 array per operand position (NaN in bad rows); errors: uint8 code per row
+ValidatedBatch = namedtuple("ValidatedBatch", ["operands", "errors"])
+
+# Rows parsed per numpy conversion; a bad value costs one item-by-item pass over its block.
+# numpy itself is imported by the batch functions, so single-operand validation doesn't load it.
+_PARSE_BLOCK = 4096
+
 def validate_operands(operands):
     if len(operands) != 2:
         raise ValidationError("Please provide exactly two numeric operands. Example: add 5 2")
@@ -7,4 +31,94 @@ def validate_operands(operands):
         a, b = float(operands[0]), float(operands[1])
     except ValueError:
         raise ValidationError("Operands must be numeric.")
-    return a, b
+    return validate_range((a, b))
+
+def validate_range(operands):
+    limit = CalculatorConfig.MAX_INPUT_VALUE
+    for value in operands:
+        if isinstance(value, complex):  # e.g. a root of a negative number carried into eval
+            validate_range((value.real, value.imag))
+        elif not -limit <= value <= limit:  # NaN fails this too
+            raise ValidationError(f"Operands must be between -{limit:g} and {limit:g}.")
+    return operands
+
+def _parse_column(column, values, errors):
+    import numpy as np
+    for start in range(0, len(column), _PARSE_BLOCK):
+        block = column[start:start + _PARSE_BLOCK]
+        # numpy turns None into NaN instead of failing, so blocks with gaps take the slow path
+        if None not in block:
+            try:
+                values[start:start + len(block)] = np.array(block, dtype=np.float64)
+                continue
+            except (ValueError, TypeError):
+                pass
+        for i, text in enumerate(block, start):
+            if text is None:
+                errors[i] = WRONG_ARITY
+                continue
+            try:
+                values[i] = float(text)
+            except (ValueError, TypeError):
+                errors[i] = NON_NUMERIC
+
+def parse_column(column):
+    """Parse a sequence of number strings into a float64 array, block by block.
+
+    Returns ``(values, errors)``: entries that aren't numbers are NaN with NON_NUMERIC
+    (WRONG_ARITY for None) and everything else is VALID. No range check is applied.
+    """
+    import numpy as np
+    values = np.full(len(column), np.nan)
+    errors = np.zeros(len(column), dtype=np.uint8)
+    _parse_column(column, values, errors)
+    return values, errors
+
+def _mark_bad_rows(operands, errors):
+    import numpy as np
+    bad = errors != VALID
+    if bad.any():
+        for values in operands:
+            values[bad] = np.nan
+
+def validate_batch(columns):
+    """Parse columns of operand strings into float64 arrays, flagging bad rows instead of raising.
+
+    ``columns`` holds one sequence of strings per operand position, with None where a row
+    is missing that operand. Returns a ``ValidatedBatch``.
+    """
+    import numpy as np
+    rows = len(columns[0]) if columns else 0
+    if any(len(column) != rows for column in columns):
+        raise ValidationError("Operand columns must have the same length.")
+    limit = CalculatorConfig.MAX_INPUT_VALUE
+    errors = np.zeros(rows, dtype=np.uint8)
+    operands = []
+    for column in columns:
+        values = np.full(rows, np.nan)
+        column_errors = np.zeros(rows, dtype=np.uint8)
+        _parse_column(column, values, column_errors)
+        finite = np.isfinite(values)
+        column_errors[(column_errors == VALID) & ~finite] = NON_FINITE
+        column_errors[finite & (np.abs(values) > limit)] = OUT_OF_RANGE
+        np.maximum(errors, column_errors, out=errors)
+        operands.append(values)
+    _mark_bad_rows(operands, errors)
+    return ValidatedBatch(tuple(operands), errors)
+
+def validate_rows(rows, arity=2):
+    """``validate_batch`` for rows of operand strings, such as the split lines of an operand file.
+
+    Rows without exactly ``arity`` operands get WRONG_ARITY.
+    """
+    import numpy as np
+    lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+    irregular = lengths != arity
+    if irregular.any():
+        rows = [row if len(row) == arity else (list(row) + [None] * arity)[:arity] for row in rows]
+    batch = validate_batch([list(map(itemgetter(i), rows)) for i in range(arity)])
+    if irregular.any():
+        batch.errors[irregular] = WRONG_ARITY
+        _mark_bad_rows(batch.operands, batch.errors)
+    return batch
+
@@ -1,28 +1,157 @@
 import os
+import atexit
 import datetime
+import queue
+import threading
+import time
 from app.calculator_config import CalculatorConfig
 from app.exceptions import LoggingError
 
+
+def format_log_entry(timestamp, operation_name, a, b, result):
+    return f"[{timestamp}] {operation_name.upper()} | {a}, {b} => {result}\n"
+
+
+class BufferedLogWriter:
+    """Appends log entries to a file from a background thread.
+
+    Entries are queued (bounded by ``max_queue``; a full queue blocks the caller) and
+    written in batches once ``batch_size`` entries are pending or ``flush_interval``
+    seconds have passed. ``close`` runs at interpreter exit so nothing queued is lost.
+    """
+
+    def __init__(self, path, max_queue, batch_size, flush_interval):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="calculator-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, entry):
+        # entry is (unix time, operation, a, b, result); formatting happens on the writer thread
+        self._raise_pending()
+        if self._closed:
+            raise LoggingError("Failed to write log: log writer is closed")
+        self._queue.put(entry)
+
+    def flush(self):
+        """Block until everything submitted so far is on disk."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_pending()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _raise_pending(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise LoggingError(f"Failed to write log: {str(error)}")
+
+    def _format(self, entry):
+        return format_log_entry(datetime.datetime.fromtimestamp(entry[0]).isoformat(), *entry[1:])
+
+    def _write(self, pending):
+        try:
+            lines = [self._format(entry) for entry in pending]
+            with open(self.path, "a", encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+                f.writelines(lines)
+        except Exception as e:
+            self._error = e
+
+    def _run(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = False  # flush interval elapsed
+            if isinstance(item, tuple):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            if pending:
+                self._write(pending)
+                pending = []
+            deadline = time.monotonic() + self.flush_interval
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+
 class LoggingObserver:
-    def __init__(self):
+    def __init__(self, buffered=None):
         os.makedirs(CalculatorConfig.LOG_DIR, exist_ok=True)
         self.log_file = os.path.join(CalculatorConfig.LOG_DIR, "calculator.log")
+        if buffered is None:
+            buffered = CalculatorConfig.LOG_BUFFERED
+        self.writer = None
+        if buffered:
+            self.writer = BufferedLogWriter(
+                self.log_file,
+                CalculatorConfig.LOG_QUEUE_SIZE,
+                CalculatorConfig.LOG_BATCH_SIZE,
+                CalculatorConfig.LOG_FLUSH_INTERVAL,
+            )
 
     def update(self, operation_name, a, b, result):
+        if self.writer is not None:
+            self.writer.submit((time.time(), operation_name, a, b, result))
+            return
         timestamp = datetime.datetime.now().isoformat()
-        log_entry = f"[{timestamp}] {operation_name.upper()} | {a}, {b} => {result}\n"
+        log_entry = format_log_entry(timestamp, operation_name, a, b, result)
         try:
             with open(self.log_file, "a", encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
                 f.write(log_entry)
         except Exception as e:
             raise LoggingError(f"Failed to write log: {str(e)}") # pragma: no cover
 
+    def update_batch(self, events):
+        # events: (operation_name, a, b, result) tuples, written with one open/close
+        if self.writer is not None:
+            now = time.time()
+            for event in events:
+                self.writer.submit((now, *event))
+            return
+        timestamp = datetime.datetime.now().isoformat()
+        try:
+            with open(self.log_file, "a", encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+                f.writelines(format_log_entry(timestamp, *event) for event in events)
+        except Exception as e:
+            raise LoggingError(f"Failed to write log: {str(e)}")
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
 class AutoSaveObserver:
     def __init__(self, history_manager):
         self.history_manager = history_manager
 
     def update(self, *args, **kwargs):
         try:
-            self.history_manager.save_to_csv()
+            self.history_manager.append_to_journal()
         except Exception as e:
             raise LoggingError(f"Auto-save failed: {str(e)}") # pragma: no cover
+
+    def update_batch(self, events):
+        # The journal only writes entries it hasn't seen, so one call covers the whole batch
+        self.update()
@@ -0,0 +1,137 @@
+# app/metrics.py
+
+import bisect
+import os
+
+# Latency bucket upper bounds in seconds: 1us to ~190s in sqrt(2) steps
+BUCKETS = tuple(1e-6 * 2 ** (i / 2) for i in range(55))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is a bisect and two additions."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is the +Inf overflow bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Estimate the ``q`` quantile (0-1) by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS[index - 1] if index > 0 else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Per-command counts, error counts by exception type, and latency histograms."""
+
+    def __init__(self):
+        self.commands = {}
+        self.observers = {}
+        self.errors = {}
+
+    def observe_command(self, command, seconds):
+        histogram = self.commands.get(command)
+        if histogram is None:
+            histogram = self.commands[command] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def observe_observer(self, observer, seconds):
+        histogram = self.observers.get(observer)
+        if histogram is None:
+            histogram = self.observers[observer] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def count_error(self, command, error):
+        key = (command, type(error).__name__)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def reset(self):
+        self.commands.clear()
+        self.observers.clear()
+        self.errors.clear()
+
+    def summary_lines(self):
+        if not self.commands and not self.observers:
+            return ["No metrics recorded yet."]
+        errors_by_command = {}
+        for (command, _), count in self.errors.items():
+            errors_by_command[command] = errors_by_command.get(command, 0) + count
+        lines = [f"{'command':<28} {'count':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        rows = [(name, h, errors_by_command.get(name, 0)) for name, h in sorted(self.commands.items())]
+        rows += [(f"observer:{name}", h, 0) for name, h in sorted(self.observers.items())]
+        for name, histogram, errors in rows:
+            lines.append(
+                f"{name:<28} {histogram.count:>8} {errors:>7} "
+                f"{histogram.percentile(0.50) * 1e3:>9.3f} {histogram.percentile(0.95) * 1e3:>9.3f} "
+                f"{histogram.percentile(0.99) * 1e3:>9.3f} {histogram.max * 1e3:>9.3f}"
+            )
+        for (command, error_type), count in sorted(self.errors.items()):
+            lines.append(f"error {command} {error_type}: {count}")
+        return lines
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP calculator_commands_total Commands executed, by command.",
+            "# TYPE calculator_commands_total counter",
+        ]
+        for command, histogram in sorted(self.commands.items()):
+            lines.append(f'calculator_commands_total{{command="{_label(command)}"}} {histogram.count}')
+        lines += [
+            "# HELP calculator_command_errors_total Failed commands, by command and exception type.",
+            "# TYPE calculator_command_errors_total counter",
+        ]
+        for (command, error_type), count in sorted(self.errors.items()):
+            lines.append(
+                f'calculator_command_errors_total{{command="{_label(command)}",error="{_label(error_type)}"}} {count}'
+            )
+        lines += self._histogram_lines(
+            "calculator_command_duration_seconds", "Command latency.", "command", self.commands
+        )
+        lines += self._histogram_lines(
+            "calculator_observer_duration_seconds", "Observer callback latency.", "observer", self.observers
+        )
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, metric, help_text, label, histograms):
+        lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for name, histogram in sorted(histograms.items()):
+            name = _label(name)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.sum}')
+            lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+        return lines
+
+    def export(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
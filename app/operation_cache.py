@@ -0,0 +1,131 @@
+# app/operation_cache.py
+
+import os
+from collections import OrderedDict
+from app.calculator_config import CalculatorConfig
+from app.exceptions import CalculatorError
+
+
+def _key_part(value):
+    # == treats 1 and 1.0 as equal, 0.0 and -0.0 as equal, and NaN as unequal to itself, none of
+    # which is right for a result cache. Floats are keyed by their exact hex spelling instead.
+    if isinstance(value, float):
+        return value.hex()
+    return value
+
+
+def _encode_result(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return value.hex()
+    if isinstance(value, complex):
+        return [value.real.hex(), value.imag.hex()]
+    return None
+
+
+def _decode_result(value):
+    if isinstance(value, str):
+        return float.fromhex(value)
+    if isinstance(value, list):
+        return complex(float.fromhex(value[0]), float.fromhex(value[1]))
+    return value
+
+
+class OperationCache:
+    """Bounded memo of operation results keyed on (operation, a, b).
+
+    ``policy`` is ``"lru"`` (hits refresh an entry) or ``"fifo"`` (entries leave in
+    insertion order). Failed operations are never cached.
+    """
+
+    POLICIES = ("lru", "fifo")
+
+    def __init__(self, capacity, policy="lru"):
+        if capacity < 1:
+            raise CalculatorError("Cache capacity must be at least 1")
+        if policy not in self.POLICIES:
+            raise CalculatorError(f"Unknown cache policy: '{policy}'")
+        self.capacity = capacity
+        self.policy = policy
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def execute(self, name, operation, a, b):
+        key = (name, _key_part(a), _key_part(b))
+        entries = self._entries
+        try:
+            result = entries[key]
+        except KeyError:
+            self.misses += 1
+            result = operation.execute(a, b)
+            entries[key] = result
+            if len(entries) > self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+            return result
+        self.hits += 1
+        if self.policy == "lru":
+            entries.move_to_end(key)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path):
+        import json
+        rows = []
+        for (name, a, b), result in self._entries.items():
+            encoded = _encode_result(result)
+            if encoded is not None and isinstance(a, (int, str)) and isinstance(b, (int, str)):
+                rows.append([name, a, b, encoded])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+            json.dump({"version": 1, "entries": rows}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Warm the cache from ``path``; a missing or unreadable file leaves it empty."""
+        import json
+        try:
+            with open(path, encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+                rows = json.load(f)["entries"]
+            for name, a, b, result in rows[-self.capacity:]:
+                self._entries[(name, a, b)] = _decode_result(result)
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries.clear()
+
+
+class CachedOperation:
+    """Stands in for an operation class, routing ``execute`` through an OperationCache."""
+
+    def __init__(self, name, operation, cache):
+        self.name = name
+        self.operation = operation
+        self.cache = cache
+
+    def execute(self, a, b):
+        return self.cache.execute(self.name, self.operation, a, b)
+
+    def __getattr__(self, attr):
+        return getattr(self.operation, attr)
@@ -1,19 +1,77 @@
+import math
+import operator
+from app.cost_guard import execute_guarded, power_cost, powmod_cost, root_cost
 from app.exceptions import OperationError
+from app.operation_cache import CachedOperation
+
+
+def entry_points(group):
+    # importlib.metadata scans every installed distribution, so it's only imported for plugin lookups
+    from importlib.metadata import entry_points as find_entry_points
+    return find_entry_points(group=group)
+
+
+class _LazyNumpy:
+    """Stands in for numpy until a batch kernel first touches it, then replaces itself.
+
+    numpy takes about as long to import as the rest of the calculator, and one-shot
+    commands never run a kernel.
+    """
+
+    def __getattr__(self, name):
+        import numpy
+        globals()["np"] = numpy
+        return getattr(numpy, name)
+
+
+np = _LazyNumpy()
+
+
+def _unrepresentable(result, errors):
+    # Rows whose scalar execute raises (overflow) or returns a complex number come out of
+    # numpy as inf or NaN; flag them and make them NaN like the other error rows
+    errors = errors | ~np.isfinite(result)
+    result[errors] = np.nan
+    return result, errors
+
+
+def _zero_divisor(b):
+    # Rows with a zero divisor are flagged in the error mask and computed against 1 instead,
+    # so the kernel never raises or warns; their result is set to NaN afterwards.
+    zero = b == 0
+    return zero, np.where(zero, 1.0, b)
+
+
 class Add:
     @staticmethod
     def execute(a, b):
         return a + b
 
+    @staticmethod
+    def execute_batch(a, b):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return np.add(a, b), np.zeros(a.shape, dtype=bool)
+
 class Subtract:
     @staticmethod
     def execute(a, b):
         return a - b
 
+    @staticmethod
+    def execute_batch(a, b):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return np.subtract(a, b), np.zeros(a.shape, dtype=bool)
+
 class Multiply:
     @staticmethod
     def execute(a, b):
         return a * b
 
+    @staticmethod
+    def execute_batch(a, b):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return np.multiply(a, b), np.zeros(a.shape, dtype=bool)
+
 class Division:
     @staticmethod
     def execute(a, b):
@@ -21,22 +79,57 @@ class Division:
             raise ZeroDivisionError("Cannot divide by zero.")
         return a / b
 
+    @staticmethod
+    def execute_batch(a, b):
+        zero, divisor = _zero_divisor(b)
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.divide(a, divisor)
+        result[zero] = np.nan
+        return result, zero
+
 class Modulus:
     @staticmethod
     def execute(a, b):
         return a % b
 
+    @staticmethod
+    def execute_batch(a, b):
+        zero, divisor = _zero_divisor(b)
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.mod(a, divisor)
+        result[zero] = np.nan
+        return result, zero
+
+def _root(a, b):
+    return a ** (1/b)
+
+
 class Power:
     @staticmethod
     def execute(a, b):
-        return a ** b
+        return execute_guarded("power", power_cost(a, b), operator.pow, a, b)
+
+    @staticmethod
+    def execute_batch(a, b):
+        # 0 ** negative raises ZeroDivisionError in the scalar path
+        errors = (a == 0) & (b < 0)
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.power(a, np.where(errors, 1.0, b))
+        return _unrepresentable(result, errors)
 
 class Root:
     @staticmethod
     def execute(a, b):
         if b == 0:
             raise ZeroDivisionError("Cannot take root with exponent 0.")
-        return a ** (1/b)
+        return execute_guarded("root", root_cost(a, b), _root, a, b)
+
+    @staticmethod
+    def execute_batch(a, b):
+        zero, divisor = _zero_divisor(b)
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            result = np.power(a, 1.0 / divisor)
+        return _unrepresentable(result, zero)
 
 class IntDivide:
     @staticmethod
@@ -45,16 +138,50 @@ class IntDivide:
             raise ZeroDivisionError("Cannot perform interger division by 0.")
         return a // b
 
+    @staticmethod
+    def execute_batch(a, b):
+        zero, divisor = _zero_divisor(b)
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.floor_divide(a, divisor)
+        result[zero] = np.nan
+        return result, zero
+
 class AbsDiff:
     @staticmethod
     def execute(a, b):
         return abs(a - b)
 
+    @staticmethod
+    def execute_batch(a, b):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return np.abs(np.subtract(a, b)), np.zeros(a.shape, dtype=bool)
+
 class Percent:
     @staticmethod
     def execute(a, b):
         return (a / b) * 100
 
+    @staticmethod
+    def execute_batch(a, b):
+        zero, divisor = _zero_divisor(b)
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.divide(a, divisor) * 100
+        result[zero] = np.nan
+        return result, zero
+
+class PowMod:
+    """(a ** b) % m by square-and-multiply, so the full power is never built."""
+
+    arity = 3
+    operand_type = int
+    example = "powmod 4 13 497"
+
+    @staticmethod
+    def execute(a, b, m):
+        if m == 0:
+            raise ZeroDivisionError("Cannot take modulus 0.")
+        return execute_guarded("powmod", powmod_cost(a, b, m), pow, a, b, m)
+
 class OperationFactory:
     operations = {
 
@@ -67,12 +194,100 @@ class OperationFactory:
         "root": Root,
         "int_divide": IntDivide,
         "abs_diff": AbsDiff,
-        "percent": Percent
+        "percent": Percent,
+        "powmod": PowMod
     }
 
+    # Third-party operations registered under this entry point group. They are discovered on
+    # the first lookup of a name that isn't built in and imported on first use, after which
+    # they live in ``operations`` like the built-ins.
+    plugin_group = "advanced_calculator.operations"
+    plugins = None
+
+    # Optional OperationCache; when set, get_operation returns cached wrappers
+    cache = None
+
+    @classmethod
+    def _plugin_entry_points(cls):
+        if cls.plugins is None:
+            cls.plugins = {
+                entry_point.name.lower(): entry_point
+                for entry_point in entry_points(group=cls.plugin_group)
+                if entry_point.name.lower() not in cls.operations
+            }
+        return cls.plugins
+
+    @classmethod
+    def _load_plugin(cls, key):
+        entry_point = cls._plugin_entry_points().get(key)
+        if entry_point is None:
+            return None
+        try:
+            op = entry_point.load()
+        except Exception as e:
+            raise OperationError(f"Failed to load operation plugin '{key}': {e}")
+        cls.operations[key] = op
+        del cls.plugins[key]
+        return op
+
+    @classmethod
+    def names(cls):
+        """Every operation name, including plugins that haven't been imported yet."""
+        return list(cls.operations) + list(cls._plugin_entry_points())
+
+    @classmethod
+    def has_operation(cls, name):
+        key = name.lower()
+        return key in cls.operations or key in cls._plugin_entry_points()
+
     @classmethod
     def get_operation(cls, name):
-        op = cls.operations.get(name.lower())
+        key = name.lower()
+        op = cls.operations.get(key) or cls._load_plugin(key)
         if not op:
             raise OperationError(f"Unsupported operation: '{name}'")
+        # The cache is keyed on two operands, so other arities bypass it
+        if cls.cache is not None and getattr(op, "arity", 2) == 2:
+            return CachedOperation(key, op, cls.cache)
         return op
+
+    @classmethod
+    def execute_batch(cls, name, a_values, b_values):
+        """Run one operation over whole operand arrays.
+
+        Returns ``(results, errors)``: a float64 result array and a boolean mask of the rows
+        the kernel can't reproduce, where the scalar ``execute`` would have raised (division
+        by zero, overflow) or returned a complex number. Their result is NaN.
+        """
+        op = cls.get_operation(name)
+        if not hasattr(op, "execute_batch"):
+            raise OperationError(f"Operation '{name}' has no vectorized kernel")
+        a = np.asarray(a_values, dtype=np.float64)
+        b = np.asarray(b_values, dtype=np.float64)
+        if a.shape != b.shape:
+            raise OperationError(f"Operand arrays must have the same shape, got {a.shape} and {b.shape}")
+        return op.execute_batch(a, b)
+
+
+def execute_group(operation, a_values, b_values):
+    """Run one operation over lists of operands; returns a result or an exception per row.
+
+    Rows go through ``OperationFactory.execute_batch``. Rows the vectorized kernel can't
+    reproduce exactly (errors, NaN/inf, complex roots) are recomputed with the scalar
+    operation, so each row ends up with what the REPL would have produced.
+    """
+    try:
+        results, errors = OperationFactory.execute_batch(operation, a_values, b_values)
+        results, errors = results.tolist(), errors.tolist()
+    except Exception:
+        # No vectorized kernel for this operation; every row takes the scalar path
+        results, errors = [math.nan] * len(a_values), [True] * len(a_values)
+    outcomes = []
+    for a, b, result, error in zip(a_values, b_values, results, errors):
+        if error or not math.isfinite(result):
+            try:
+                result = OperationFactory.get_operation(operation).execute(a, b)
+            except Exception as e:
+                result = e
+        outcomes.append(result)
+    return outcomes
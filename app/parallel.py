@@ -0,0 +1,61 @@
+# app/parallel.py
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from app.calculation import Calculation
+from app.calculator_config import CalculatorConfig
+from app.exceptions import CalculatorError
+
+# One per work item: result is None and error holds the exception when the item failed
+WorkResult = namedtuple("WorkResult", ["result", "error"])
+
+
+def run_chunk(items):
+    """Execute ``(operation, a, b)`` items in order, capturing each item's failure."""
+    results = []
+    for operation, a, b in items:
+        try:
+            results.append(WorkResult(Calculation(operation, a, b).execute(), None))
+        except Exception as e:
+            results.append(WorkResult(None, e))
+    return results
+
+
+class ParallelExecutor:
+    """Runs large batches of calculations across a pool of worker processes.
+
+    Work is split into chunks of ``chunk_size`` items; batches that fit in one chunk run
+    inline, since starting workers would cost more than the work. Results come back in
+    input order. The pool is created on first use and reused until ``close``.
+    """
+
+    def __init__(self, max_workers=None, chunk_size=None):
+        self.max_workers = max_workers or CalculatorConfig.PARALLEL_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size or CalculatorConfig.PARALLEL_CHUNK_SIZE
+        if self.max_workers < 1 or self.chunk_size < 1:
+            raise CalculatorError("max_workers and chunk_size must be at least 1")
+        self._pool = None
+
+    def run(self, work_items):
+        items = list(work_items)
+        if len(items) <= self.chunk_size or self.max_workers == 1:
+            return run_chunk(items)
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        results = []
+        for chunk_results in self._pool.map(run_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,200 @@
+# app/server.py
+
+import argparse
+import asyncio
+from app.calculator import CalculatorREPL, COMMANDS
+from app.calculator_config import CalculatorConfig
+from app.exceptions import ValidationError
+from app.input_validators import validate_operands
+from app.operations import OperationFactory, execute_group
+from app.tracing import create_tracer
+
+
+class MicroBatcher:
+    """Coalesces arithmetic requests from concurrent clients into vectorized batches.
+
+    A batch is flushed once ``max_batch_size`` requests are waiting or ``window`` seconds
+    after its first request arrived, and each operation group runs through
+    ``execute_group``, so clients see the same results and errors as the REPL.
+    """
+
+    def __init__(self, max_batch_size, window):
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self._pending = []
+        self._timer = None
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, operation, a, b):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((operation, a, b, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.requests += len(pending)
+        groups = {}
+        for request in pending:
+            groups.setdefault(request[0], []).append(request)
+        for operation, requests in groups.items():
+            self._run_group(operation, requests)
+
+    def _run_group(self, operation, requests):
+        outcomes = execute_group(operation, [request[1] for request in requests], [request[2] for request in requests])
+        for (_, _, _, future), outcome in zip(requests, outcomes):
+            if future.cancelled():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+class ServerSession(CalculatorREPL):
+    """Per-connection calculator state: its own history, undo/redo stack and expression cache.
+
+    Sessions log operations but don't autosave, so concurrent clients never rewrite
+    each other's history file; ``save``/``load`` remain explicit commands.
+    """
+
+    def __init__(self, batcher, tracer=None):
+        super().__init__(show_banner=False, tracer=tracer)
+        self.observers = [self.logger]
+        self.batcher = batcher
+        self._batched_outcome = None
+
+    def _execute_operation(self, command, *operands):
+        outcome, self._batched_outcome = self._batched_outcome, None
+        if outcome is None:
+            return super()._execute_operation(command, *operands)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome[0]
+
+    async def handle(self, line):
+        """Run one command line and return ``(output_lines, keep_going)``."""
+        parts = line.split()
+        command = parts[0].lower() if parts else ""
+        if (len(parts) == 3 and command not in COMMANDS and OperationFactory.has_operation(command)
+                and getattr(OperationFactory.get_operation(command), "arity", 2) == 2):
+            try:
+                # Reject what the REPL would reject before the batch kernels ever see it
+                a, b = validate_operands(parts[1:])
+                self._batched_outcome = (await self.batcher.submit(command, a, b),)
+            except asyncio.CancelledError:
+                raise
+            except (ValueError, ValidationError):
+                pass  # execute_command reports bad operands itself
+            except Exception as e:
+                self._batched_outcome = e
+        output = []
+        self.emit = output.append
+        try:
+            if self._batched_outcome is None and command not in COMMANDS and OperationFactory.has_operation(command):
+                # Unbatched operations (powmod, bad operands) can be slow; run them off the event
+                # loop so one expensive request doesn't stall every other connection
+                keep_going = await asyncio.to_thread(self.execute_command, line)
+            else:
+                keep_going = self.execute_command(line)
+        finally:
+            self.emit = print
+            self._batched_outcome = None
+        lines = [text for message in output for text in str(message).splitlines() if text]
+        return lines, keep_going
+
+
+class CalculatorServer:
+    """Line-protocol calculator service over TCP or a Unix socket.
+
+    Clients send the same commands as the REPL, one per line. Each response is the
+    command's output lines followed by an empty line. ``exit`` ends the connection.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, path=None, max_batch_size=None, batch_window=None):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batcher = MicroBatcher(
+            max_batch_size or CalculatorConfig.SERVER_MAX_BATCH_SIZE,
+            CalculatorConfig.SERVER_BATCH_WINDOW if batch_window is None else batch_window,
+        )
+        self._server = None
+        self.sessions = set()
+        self.tracer = create_tracer()  # shared, so every session appends to one trace writer
+
+    async def start(self):
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        return self
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.batcher.flush()
+        if self.tracer is not None:
+            self.tracer.flush()
+
+    async def _handle_client(self, reader, writer):
+        session = ServerSession(self.batcher, self.tracer)
+        self.sessions.add(session)
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                lines, keep_going = await session.handle(raw.decode(CalculatorConfig.DEFAULT_ENCODING))
+                lines.append("")
+                writer.write(("\n".join(lines) + "\n").encode(CalculatorConfig.DEFAULT_ENCODING))
+                await writer.drain()
+                if not keep_going:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            session.logger.close()  # stops a buffered log writer's thread
+            writer.close()
+
+
+async def serve(host, port, path): # pragma: no cover
+    server = await CalculatorServer(host=host, port=port, path=path).start()
+    print(f"Calculator server listening on {path or server.address}")
+    await server.serve_forever()
+
+
+def main(argv=None): # pragma: no cover
+    parser = argparse.ArgumentParser(description="Calculator line-protocol server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=CalculatorConfig.SERVER_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__": # pragma: no cover
+    main()
@@ -0,0 +1,94 @@
+# app/trace_viewer.py
+
+import argparse
+import json
+import os
+from app.calculator_config import CalculatorConfig
+
+
+def load_traces(path):
+    traces = []
+    with open(path, encoding=CalculatorConfig.DEFAULT_ENCODING) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                traces.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash mid-write
+    return traces
+
+
+def slowest(traces, count):
+    return sorted(traces, key=lambda trace: trace["duration_us"], reverse=True)[:count]
+
+
+def format_trace(trace):
+    lines = [f"#{trace['id']} {trace['input'] or trace['name']}  {trace['duration_us']:.1f} us  ({trace['time']})"]
+    depths = []
+    for span in trace["spans"]:
+        depth = 0 if span["parent"] is None else depths[span["parent"]] + 1
+        depths.append(depth)
+        error = f"  !{span['error']}" if "error" in span else ""
+        lines.append(
+            f"  {'  ' * depth}{span['name']:<{30 - 2 * depth}} "
+            f"+{span['start_us']:>9.1f} us {span['duration_us']:>10.1f} us{error}"
+        )
+    return lines
+
+
+def flame_summary(traces, width=40):
+    """Aggregate time by span stack ("add;memento"), like a collapsed flame graph.
+
+    Each row shows total time, self time (minus child spans) and a bar scaled to the
+    largest total. Trace roots get the time not covered by any span as self time.
+    """
+    totals, selfs = {}, {}
+    for trace in traces:
+        root = trace["name"]
+        paths = []
+        child_time = {}
+        for span in trace["spans"]:
+            parent = span["parent"]
+            prefix = root if parent is None else paths[parent]
+            path = f"{prefix};{span['name']}"
+            paths.append(path)
+            totals[path] = totals.get(path, 0.0) + span["duration_us"]
+            child_time[parent] = child_time.get(parent, 0.0) + span["duration_us"]
+        for index, path in enumerate(paths):
+            own = trace["spans"][index]["duration_us"] - child_time.get(index, 0.0)
+            selfs[path] = selfs.get(path, 0.0) + own
+        totals[root] = totals.get(root, 0.0) + trace["duration_us"]
+        selfs[root] = selfs.get(root, 0.0) + trace["duration_us"] - child_time.get(None, 0.0)
+    if not totals:
+        return ["No traces recorded."]
+    largest = max(totals.values())
+    lines = [f"{'stack':<50} {'total us':>12} {'self us':>12}"]
+    for path in sorted(totals):
+        bar = "#" * max(1, round(width * totals[path] / largest)) if totals[path] > 0 else ""
+        lines.append(f"{path:<50} {totals[path]:>12.1f} {selfs[path]:>12.1f} {bar}")
+    return lines
+
+
+def main(argv=None): # pragma: no cover
+    parser = argparse.ArgumentParser(description="Show the slowest sampled calculator traces")
+    parser.add_argument(
+        "path", nargs="?", default=os.path.join(CalculatorConfig.LOG_DIR, "calculator_traces.jsonl"),
+        help="trace file (default: LOG_DIR/calculator_traces.jsonl)"
+    )
+    parser.add_argument("--top", type=int, default=10, help="number of slowest traces to show")
+    parser.add_argument("--name", help="only traces for this command, e.g. power")
+    args = parser.parse_args(argv)
+    traces = load_traces(args.path)
+    if args.name:
+        traces = [trace for trace in traces if trace["name"] == args.name]
+    print(f"{len(traces)} traces in {args.path}\n")
+    print(f"Slowest {min(args.top, len(traces))}:")
+    for trace in slowest(traces, args.top):
+        print("\n".join(format_trace(trace)))
+    print("\nFlame summary:")
+    print("\n".join(flame_summary(traces)))
+
+if __name__ == "__main__": # pragma: no cover
+    main()
@@ -0,0 +1,147 @@
+# app/tracing.py
+
+import datetime
+import itertools
+import os
+import time
+from app.calculator_config import CalculatorConfig
+from app.logger import BufferedLogWriter
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NullTrace:
+    """Stand-in for commands that weren't sampled; every span is a shared no-op."""
+
+    _span = _NullSpan()
+
+    def span(self, name):
+        return self._span
+
+
+NULL_TRACE = _NullTrace()
+
+
+class _Span:
+    __slots__ = ("trace", "record")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.record = [name, None, 0, 0, None]  # name, parent index, start ns, end ns, error type
+
+    def __enter__(self):
+        stack = self.trace.stack
+        record = self.record
+        if stack:
+            record[1] = stack[-1]
+        stack.append(len(self.trace.spans))
+        self.trace.spans.append(record)
+        record[2] = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record[3] = time.perf_counter_ns()
+        if exc_type is not None:
+            self.record[4] = exc_type.__name__
+        self.trace.stack.pop()
+        return False
+
+
+class Trace:
+    """One sampled command: nested spans timed with the monotonic ``perf_counter_ns`` clock."""
+
+    def __init__(self, trace_id, name, text):
+        self.id = trace_id
+        self.name = name
+        self.text = text
+        self.spans = []
+        self.stack = []
+        self.wall_time = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+
+    def span(self, name):
+        return _Span(self, name)
+
+
+class TraceWriter(BufferedLogWriter):
+    """Background writer that appends finished traces to a JSONL file."""
+
+    def _format(self, entry):
+        trace_id, name, text, wall_time, start_ns, end_ns, spans = entry
+        record = {
+            "id": trace_id,
+            "name": name,
+            "input": text,
+            "time": datetime.datetime.fromtimestamp(wall_time).isoformat(),
+            "duration_us": (end_ns - start_ns) / 1000,
+            "spans": [
+                {
+                    "name": span_name,
+                    "parent": parent,
+                    "start_us": (span_start - start_ns) / 1000,
+                    "duration_us": (span_end - span_start) / 1000,
+                    **({"error": error} if error else {}),
+                }
+                for span_name, parent, span_start, span_end, error in spans
+            ],
+        }
+        import json  # only needed once a trace is written
+        return json.dumps(record) + "\n"
+
+
+class Tracer:
+    """Samples a fraction of commands and records their spans asynchronously.
+
+    ``start`` returns a ``Trace`` for sampled commands and ``NULL_TRACE`` otherwise, so
+    callers time their steps with ``trace.span(name)`` without checking which they got.
+    """
+
+    def __init__(self, path, sample_rate, writer=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.writer = writer or TraceWriter(
+            path,
+            CalculatorConfig.LOG_QUEUE_SIZE,
+            CalculatorConfig.LOG_BATCH_SIZE,
+            CalculatorConfig.LOG_FLUSH_INTERVAL,
+        )
+        import random  # only needed when tracing is enabled
+        self._ids = itertools.count(1)
+        self._random = random.random
+
+    def start(self, name, text=""):
+        if self.sample_rate < 1.0 and self._random() >= self.sample_rate:
+            return NULL_TRACE
+        return Trace(next(self._ids), name, text)
+
+    def finish(self, trace):
+        if trace is NULL_TRACE:
+            return
+        trace.end_ns = time.perf_counter_ns()
+        self.writer.submit(
+            (trace.id, trace.name, trace.text, trace.wall_time, trace.start_ns, trace.end_ns, trace.spans)
+        )
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+def create_tracer():
+    """Build the tracer described by the configuration, or None when tracing is off."""
+    if CalculatorConfig.TRACE_SAMPLE_RATE <= 0:
+        return None
+    os.makedirs(CalculatorConfig.LOG_DIR, exist_ok=True)
+    return Tracer(
+        os.path.join(CalculatorConfig.LOG_DIR, "calculator_traces.jsonl"),
+        CalculatorConfig.TRACE_SAMPLE_RATE,
+    )
@@ -0,0 +1,164 @@
+# app/variables.py
+
+from app.calculation import Calculation
+from app.exceptions import OperationError, ValidationError
+from app.operations import OperationFactory
+
+
+class Cell:
+    """One named value: a constant, an alias of another cell, or a ``Calculation`` over two operands.
+
+    Operands are numbers or other cells. ``dependents`` are the cells that read this one.
+    A dirty cell's value is out of date; every cell downstream of a dirty cell is dirty too,
+    so marking can stop at cells that already are.
+    """
+
+    __slots__ = ("name", "operation", "inputs", "dependents", "value", "error", "dirty")
+
+    def __init__(self, name):
+        self.name = name
+        self.operation = None
+        self.inputs = ()
+        self.dependents = set()
+        self.value = None
+        self.error = None
+        self.dirty = True
+
+    def __repr__(self):
+        return f"Cell({self.name!r}, value={self.value!r}, dirty={self.dirty})"
+
+    def operand_values(self):
+        return [operand.value if isinstance(operand, Cell) else operand for operand in self.inputs]
+
+
+class VariableGraph:
+    """Named cells forming a dependency DAG, recomputed lazily and incrementally.
+
+    Redefining a cell marks it and everything downstream dirty, stopping at cells that are
+    already dirty. Reading a cell recomputes only its dirty upstream cells, in topological
+    order, so the work after a change is proportional to what the change affects.
+    ``recomputed`` counts the calculations run so far.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.recomputed = 0
+
+    def __contains__(self, name):
+        return name.lower() in self.cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def names(self):
+        return sorted(self.cells)
+
+    def cell(self, name):
+        cell = self.cells.get(name.lower())
+        if cell is None:
+            raise ValidationError(f"Unknown variable '{name}'")
+        return cell
+
+    def define(self, name, operation, operands):
+        """Define (or redefine) ``name`` and return its cell.
+
+        ``operation`` is an operation name applied to two operands, or None for a single
+        operand (a number, or a cell to alias). Operands are numbers or ``Cell`` objects.
+        Raises ValidationError for definitions that would create a cycle.
+        """
+        name = name.lower()
+        if operation is None:
+            if len(operands) != 1:
+                raise ValidationError("A variable without an operation takes exactly one value")
+        else:
+            operation = operation.lower()
+            if getattr(OperationFactory.get_operation(operation), "arity", 2) != 2 or len(operands) != 2:
+                raise ValidationError("Variables can only be defined with two-operand operations")
+        cell = self.cells.get(name)
+        if cell is not None and self._reaches(operands, cell):
+            raise ValidationError(f"Circular reference: '{name}' would depend on itself")
+        if cell is None:
+            cell = self.cells[name] = Cell(name)
+        for operand in cell.inputs:
+            if isinstance(operand, Cell):
+                operand.dependents.discard(cell)
+        cell.operation = operation
+        cell.inputs = tuple(operands)
+        for operand in cell.inputs:
+            if isinstance(operand, Cell):
+                operand.dependents.add(cell)
+        self._mark_dirty(cell)
+        return cell
+
+    def _reaches(self, operands, target):
+        # Whether ``target`` is upstream of (or among) the operands
+        stack = [operand for operand in operands if isinstance(operand, Cell)]
+        seen = set()
+        while stack:
+            cell = stack.pop()
+            if cell is target:
+                return True
+            if cell in seen:
+                continue
+            seen.add(cell)
+            stack.extend(operand for operand in cell.inputs if isinstance(operand, Cell))
+        return False
+
+    def _mark_dirty(self, cell):
+        cell.dirty = True
+        stack = list(cell.dependents)
+        while stack:
+            cell = stack.pop()
+            if not cell.dirty:
+                cell.dirty = True
+                stack.extend(cell.dependents)
+
+    def value(self, name):
+        """The current value of ``name``, recomputing dirty cells it depends on first.
+
+        Raises OperationError if the cell, or one it depends on, failed to compute.
+        """
+        cell = self.cell(name)
+        if cell.dirty:
+            for dirty in self._dirty_upstream(cell):
+                self._compute(dirty)
+        if cell.error is not None:
+            raise OperationError(cell.error)
+        return cell.value
+
+    def _dirty_upstream(self, cell):
+        # Dirty cells that ``cell`` depends on, and ``cell`` itself, in topological order.
+        # Clean cells are never entered: everything upstream of a clean cell is clean.
+        order = []
+        visited = {cell}
+        stack = [(cell, iter(cell.inputs))]
+        while stack:
+            current, operands = stack[-1]
+            for operand in operands:
+                if isinstance(operand, Cell) and operand.dirty and operand not in visited:
+                    visited.add(operand)
+                    stack.append((operand, iter(operand.inputs)))
+                    break
+            else:
+                stack.pop()
+                order.append(current)
+        return order
+
+    def _compute(self, cell):
+        cell.dirty = False
+        cell.error = None
+        for operand in cell.inputs:
+            if isinstance(operand, Cell) and operand.error is not None:
+                cell.value = None
+                cell.error = operand.error  # already names the cell that failed
+                return
+        values = cell.operand_values()
+        if cell.operation is None:
+            cell.value = values[0]
+            return
+        self.recomputed += 1
+        try:
+            cell.value = Calculation(cell.operation, *values).execute()
+        except Exception as e:
+            cell.value = None
+            cell.error = f"'{cell.name}': {e}"
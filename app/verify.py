@@ -0,0 +1,270 @@
+# app/verify.py
+
+import cmath
+import math
+import os
+import time
+from collections import namedtuple
+from app.calculator_config import CalculatorConfig
+from app.exceptions import OperationError
+from app.history_stream import COLUMNS, MAX_REPORTED_ERRORS, parse_row, read_chunks
+from app.input_validators import VALID, parse_column
+from app.operations import OperationFactory
+
+REPORT_COLUMNS = ["file", "line", "operation", "a", "b", "stored", "recomputed"]
+
+# One stored entry whose result no longer matches; ``recomputed`` is a number or an error message
+Mismatch = namedtuple("Mismatch", REPORT_COLUMNS)
+
+
+class VerifyReport:
+    """Rows checked, matched and mismatched per operation, plus rows that couldn't be checked."""
+
+    def __init__(self):
+        self.checked = 0
+        self.mismatched = 0
+        self.malformed = 0
+        self.unverifiable = 0  # entries of operations whose history rows don't hold every operand
+        self.operations = {}  # operation -> [checked, mismatched]
+        self.mismatches = []  # the first MAX_REPORTED_ERRORS only
+        self.errors = []  # (file, line, message) for the first MAX_REPORTED_ERRORS malformed rows
+        self.seconds = 0.0
+
+    def add_malformed(self, path, line, message):
+        self.malformed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((path, line, message))
+
+    def count(self, operation, checked, mismatched):
+        counts = self.operations.get(operation)
+        if counts is None:
+            counts = self.operations[operation] = [0, 0]
+        counts[0] += checked
+        counts[1] += mismatched
+        self.checked += checked
+        self.mismatched += mismatched
+
+    def summary_lines(self, shown=10):
+        rate = self.checked / self.seconds if self.seconds > 0 else 0.0
+        lines = [
+            f"Checked {self.checked} entries in {self.seconds:.2f} s ({rate:.0f} entries/s): "
+            f"{self.mismatched} mismatched, {self.malformed} malformed, {self.unverifiable} unverifiable",
+            f"{'operation':<14} {'checked':>10} {'mismatched':>10}",
+        ]
+        for operation, (checked, mismatched) in sorted(self.operations.items()):
+            lines.append(f"{operation:<14} {checked:>10} {mismatched:>10}")
+        for mismatch in self.mismatches[:shown]:
+            lines.append(
+                f"{mismatch.file}:{mismatch.line}: {mismatch.operation}({mismatch.a}, {mismatch.b}) "
+                f"stored {mismatch.stored}, now {mismatch.recomputed}"
+            )
+        if self.mismatched > shown:
+            lines.append(f"... and {self.mismatched - shown} more mismatches")
+        for path, line, message in self.errors[:shown]:
+            lines.append(f"{path}:{line}: malformed row: {message}")
+        return lines
+
+
+def _close(recomputed, stored, rel_tol, abs_tol):
+    # math.isclose over arrays; equal infinities match too
+    import numpy as np
+    with np.errstate(invalid="ignore"):
+        scale = np.maximum(np.abs(recomputed), np.abs(stored))
+        return (recomputed == stored) | (np.abs(recomputed - stored) <= np.maximum(rel_tol * scale, abs_tol))
+
+
+def _matches(recomputed, stored, rel_tol, abs_tol):
+    if isinstance(recomputed, complex) or isinstance(stored, complex):
+        return cmath.isclose(recomputed, stored, rel_tol=rel_tol, abs_tol=abs_tol)
+    try:
+        return math.isclose(recomputed, stored, rel_tol=rel_tol, abs_tol=abs_tol)
+    except OverflowError:
+        return recomputed == stored  # ints too large for a float
+
+
+def _recompute(operation, a, b):
+    convert = getattr(operation, "operand_type", float)
+    try:
+        if isinstance(a, complex) or isinstance(b, complex):
+            return operation.execute(a, b)
+        return operation.execute(convert(a), convert(b))
+    except Exception as e:
+        return e
+
+
+class HistoryVerifier:
+    """Recomputes stored history entries and compares them with their stored results.
+
+    Files are streamed in chunks of ``chunk_size`` rows. In each chunk the operands and
+    results are parsed column-wise, rows are grouped by operation and each group is
+    recomputed with ``OperationFactory.execute_batch``. Rows the kernel can't reproduce
+    exactly (errors, non-finite values, complex results), and operations without a kernel,
+    are recomputed with the scalar operation. A result matches when it is within
+    ``rel_tol`` (relative) or ``abs_tol`` (absolute) of the stored one.
+    """
+
+    def __init__(self, rel_tol=1e-9, abs_tol=0.0, chunk_size=None, writer=None):
+        self.rel_tol = rel_tol
+        self.abs_tol = abs_tol
+        self.chunk_size = chunk_size or CalculatorConfig.HISTORY_CHUNK_SIZE
+        self.writer = writer  # optional csv.writer receiving every mismatch
+        self.report = VerifyReport()
+
+    def verify(self, paths):
+        """Verify every file in ``paths`` in order and return the ``VerifyReport``."""
+        start = time.perf_counter()
+        try:
+            for path in paths:
+                for chunk in read_chunks(path, self.chunk_size):
+                    self._verify_chunk(path, chunk)
+        finally:
+            self.report.seconds += time.perf_counter() - start
+        return self.report
+
+    def _mismatch(self, path, line, operation, a, b, stored, recomputed):
+        if isinstance(recomputed, Exception):
+            recomputed = f"{type(recomputed).__name__}: {recomputed}"
+        mismatch = Mismatch(path, line, operation, a, b, stored, recomputed)
+        if len(self.report.mismatches) < MAX_REPORTED_ERRORS:
+            self.report.mismatches.append(mismatch)
+        if self.writer is not None:
+            self.writer.writerow(mismatch)
+
+    def _verify_chunk(self, path, chunk):
+        import numpy as np
+        width = len(COLUMNS)
+        lines, rows = zip(*chunk)
+        if set(map(len, rows)) != {width}:
+            for line, row in chunk:
+                if row and len(row) != width:  # blank lines are skipped silently
+                    self.report.add_malformed(path, line, f"expected {width} fields, got {len(row)}")
+            chunk = [(line, row) for line, row in chunk if len(row) == width]
+            if not chunk:
+                return
+            lines, rows = zip(*chunk)
+        # Transpose the rows into columns
+        operations, a_texts, b_texts, stored_texts = zip(*rows)
+        a, a_errors = parse_column(a_texts)
+        b, b_errors = parse_column(b_texts)
+        stored, stored_errors = parse_column(stored_texts)
+        parsed = (a_errors == VALID) & (b_errors == VALID) & (stored_errors == VALID)
+        # Group by operation name, treating spellings like " Add" and "add" as one
+        spellings, codes = np.unique(np.array(operations), return_inverse=True)
+        groups = {}
+        for code, spelling in enumerate(spellings.tolist()):
+            groups.setdefault(spelling.strip().lower(), []).append(code)
+        for name, group_codes in groups.items():
+            in_group = codes == group_codes[0] if len(group_codes) == 1 else np.isin(codes, group_codes)
+            rows = np.flatnonzero(in_group & parsed)
+            if len(rows):
+                self._verify_group(path, name, rows, lines, a, b, stored, a_texts, b_texts, stored_texts)
+        # Complex results and malformed values take the row-by-row parser
+        for row in np.flatnonzero(~parsed).tolist():
+            try:
+                entry = parse_row([operations[row], a_texts[row], b_texts[row], stored_texts[row]])
+            except ValueError as e:
+                self.report.add_malformed(path, lines[row], str(e))
+                continue
+            self._verify_scalar(path, entry["operation"].lower(), [lines[row]], [entry["a"]], [entry["b"]],
+                                [entry["result"]], [a_texts[row]], [b_texts[row]], [stored_texts[row]])
+
+    def _verify_group(self, path, name, rows, lines, a, b, stored, a_texts, b_texts, stored_texts):
+        import numpy as np
+        try:
+            operation = OperationFactory.get_operation(name)
+        except OperationError as e:
+            # The operation no longer exists: every entry of it is a mismatch
+            for row in rows.tolist():
+                self._mismatch(path, lines[row], name, a_texts[row], b_texts[row], stored_texts[row], e)
+            self.report.count(name, len(rows), len(rows))
+            return
+        if getattr(operation, "arity", 2) != 2:
+            self.report.unverifiable += len(rows)  # e.g. powmod: the modulus isn't stored
+            return
+        if not hasattr(operation, "execute_batch"):
+            self._verify_scalar(path, name, *self._take(rows, lines, a, b, stored, a_texts, b_texts, stored_texts))
+            return
+        group_a, group_b, group_stored = a[rows], b[rows], stored[rows]
+        results, errors = OperationFactory.execute_batch(name, group_a, group_b)
+        scalar = errors | ~np.isfinite(results)
+        close = _close(results, group_stored, self.rel_tol, self.abs_tol)
+        wrong = np.flatnonzero(~scalar & ~close)
+        for index in wrong.tolist():
+            row = int(rows[index])
+            self._mismatch(path, lines[row], name, a_texts[row], b_texts[row], stored_texts[row],
+                           results[index].item())
+        self.report.count(name, int((~scalar).sum()), len(wrong))
+        if scalar.any():
+            self._verify_scalar(path, name, *self._take(rows[scalar], lines, a, b, stored, a_texts, b_texts,
+                                                        stored_texts))
+
+    @staticmethod
+    def _take(rows, lines, a, b, stored, a_texts, b_texts, stored_texts):
+        rows = rows.tolist()
+        return (
+            [lines[row] for row in rows], a[rows].tolist(), b[rows].tolist(), stored[rows].tolist(),
+            [a_texts[row] for row in rows], [b_texts[row] for row in rows], [stored_texts[row] for row in rows],
+        )
+
+    def _verify_scalar(self, path, name, lines, a_values, b_values, stored_values, a_texts, b_texts, stored_texts):
+        try:
+            operation = OperationFactory.get_operation(name)
+        except OperationError as e:
+            operation = e
+        if not isinstance(operation, Exception) and getattr(operation, "arity", 2) != 2:
+            self.report.unverifiable += len(lines)
+            return
+        mismatched = 0
+        for line, a, b, stored, a_text, b_text, stored_text in zip(
+            lines, a_values, b_values, stored_values, a_texts, b_texts, stored_texts
+        ):
+            recomputed = operation if isinstance(operation, Exception) else _recompute(operation, a, b)
+            if isinstance(recomputed, Exception) or not _matches(recomputed, stored, self.rel_tol, self.abs_tol):
+                mismatched += 1
+                self._mismatch(path, line, name, a_text, b_text, stored_text, recomputed)
+        self.report.count(name, len(lines), mismatched)
+
+
+def default_paths():
+    """The CSV history file and its journal, where they exist."""
+    from app.history_backends import CSVHistoryBackend
+    backend = CSVHistoryBackend(CalculatorConfig.HISTORY_DIR)
+    return [path for path in (backend.path, backend.journal_file) if os.path.exists(path)]
+
+
+def main(argv=None): # pragma: no cover
+    import argparse
+    import csv
+    import sys
+    parser = argparse.ArgumentParser(
+        description="Recompute stored history results and report entries that no longer match"
+    )
+    parser.add_argument("paths", nargs="*", help="history CSV files (default: the history file and its journal)")
+    parser.add_argument("--rel-tol", type=float, default=1e-9, help="relative tolerance (default 1e-9)")
+    parser.add_argument("--abs-tol", type=float, default=0.0, help="absolute tolerance (default 0)")
+    parser.add_argument("--chunk-size", type=int, help="rows per chunk (default: CALCULATOR_HISTORY_CHUNK_SIZE)")
+    parser.add_argument("--report", metavar="PATH", help="write every mismatch to this CSV file")
+    args = parser.parse_args(argv)
+    if args.rel_tol < 0 or args.abs_tol < 0:
+        parser.error("tolerances must be non-negative")
+    if args.chunk_size is not None and args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    paths = args.paths or default_paths()
+    if not paths:
+        parser.error(f"no history file found in {CalculatorConfig.HISTORY_DIR}")
+    report_file = None
+    writer = None
+    if args.report:
+        report_file = open(args.report, "w", newline="", encoding=CalculatorConfig.DEFAULT_ENCODING)
+        writer = csv.writer(report_file)
+        writer.writerow(REPORT_COLUMNS)
+    try:
+        report = HistoryVerifier(args.rel_tol, args.abs_tol, args.chunk_size, writer).verify(paths)
+    finally:
+        if report_file is not None:
+            report_file.close()
+    print("\n".join(report.summary_lines()))
+    sys.exit(1 if report.mismatched or report.malformed else 0)
+
+if __name__ == "__main__": # pragma: no cover
+    main()
@@ -0,0 +1,342 @@
+# app/workload.py
+
+import atexit
+import os
+import time
+from app.calculator_config import CalculatorConfig
+from app.metrics import LatencyHistogram
+from app.operations import OperationFactory, execute_group
+
+# A workload file is a header line followed by one "<delay us>\t<command line>" line per
+# command, where the delay is the time since the previous command arrived (or since
+# recording started, for the first one). Paths ending in .gz are gzip-compressed.
+HEADER = "# calculator workload v1\n"
+
+# Output that marks a command as failed when replaying through a CalculatorREPL
+_ERROR_PREFIXES = ("Error", "Operation Error", "Unknown command")
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        import gzip
+        return gzip.open(path, mode + "t", encoding=CalculatorConfig.DEFAULT_ENCODING)
+    return open(path, mode, encoding=CalculatorConfig.DEFAULT_ENCODING)
+
+
+def write_workload(path, records):
+    """Write ``(delay_seconds, command_line)`` records to ``path``; returns how many were written."""
+    count = 0
+    with _open(path, "w") as f:
+        f.write(HEADER)
+        for count, (delay, line) in enumerate(records, start=1):
+            f.write(f"{round(delay * 1e6)}\t{line}\n")
+    return count
+
+
+def read_workload(path):
+    """Yield the ``(delay_seconds, command_line)`` records of a workload file."""
+    with _open(path, "r") as f:
+        for number, text in enumerate(f, start=1):
+            text = text.rstrip("\r\n")
+            if not text or text.startswith("#"):
+                continue
+            delay, tab, line = text.partition("\t")
+            try:
+                delay = int(delay) / 1e6
+            except ValueError:
+                delay = None
+            if not tab or delay is None or delay < 0:
+                raise ValueError(f"Malformed workload record on line {number} of {path}")
+            yield delay, line
+
+
+class WorkloadRecorder:
+    """Appends every command line a REPL receives, with its inter-arrival time, to a workload file.
+
+    Lines go through the file's write buffer; ``flush`` runs on ``exit``, at the end of a
+    script and at interpreter exit.
+    """
+
+    def __init__(self, path, clock=time.perf_counter):
+        self.path = path
+        self.count = 0
+        self._clock = clock
+        self._file = _open(path, "w")
+        self._file.write(HEADER)
+        self._last = clock()
+        atexit.register(self.close)
+
+    def record(self, line):
+        now = self._clock()
+        self._file.write(f"{round((now - self._last) * 1e6)}\t{line}\n")
+        self._last = now
+        self.count += 1
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        atexit.unregister(self.close)
+
+
+def create_recorder():
+    """Build the recorder described by the configuration, or None when recording is off."""
+    if not CalculatorConfig.RECORD_FILE:
+        return None
+    directory = os.path.dirname(CalculatorConfig.RECORD_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return WorkloadRecorder(CalculatorConfig.RECORD_FILE)
+
+
+# Operand generators for the built-in operations: keep power and root results small and
+# divisors non-zero, so only the commands chosen as errors fail
+def _operands(name, rng):
+    if name == "power":
+        return rng.randint(-20, 20), rng.randint(0, 12)
+    if name == "root":
+        return rng.randint(0, 10000), rng.randint(1, 5)
+    if name == "powmod":
+        return rng.randint(0, 10000), rng.randint(0, 10000), rng.randint(1, 10000)
+    arity = getattr(OperationFactory.get_operation(name), "arity", 2)
+    operands = [rng.randint(-1000, 1000) for _ in range(arity)]
+    if operands[-1] == 0:
+        operands[-1] = 1
+    return tuple(operands)
+
+
+def _error_command(name, rng):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return "division 1 0"
+    if kind == 1:
+        return f"{name} x {rng.randint(1, 9)}"
+    return f"unknown_{name} 1 2"
+
+
+def generate_workload(count, mix=None, error_rate=0.0, rate=100.0, seed=None):
+    """Yield ``count`` synthetic ``(delay_seconds, command_line)`` records.
+
+    ``mix`` maps operation names to relative weights (default: every built-in operation
+    equally). Arrivals are a Poisson process averaging ``rate`` commands per second, and
+    each command fails (division by zero, bad operand or unknown command) with
+    probability ``error_rate``.
+    """
+    import random
+    if mix is None:
+        mix = {name: 1 for name in OperationFactory.operations}
+    for name, weight in mix.items():
+        if not OperationFactory.has_operation(name):
+            raise ValueError(f"Unknown operation in mix: '{name}'")
+        if weight < 0:
+            raise ValueError(f"Weight for '{name}' must be non-negative")
+    if not any(mix.values()):
+        raise ValueError("Operation mix needs at least one positive weight")
+    if not 0 <= error_rate <= 1:
+        raise ValueError("Error rate must be between 0 and 1")
+    if rate <= 0:
+        raise ValueError("Rate must be greater than zero")
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    for _ in range(count):
+        name = rng.choices(names, weights)[0]
+        if error_rate and rng.random() < error_rate:
+            line = _error_command(name, rng)
+        else:
+            line = " ".join([name, *map(str, _operands(name, rng))])
+        yield rng.expovariate(rate), line
+
+
+def parse_mix(text):
+    """Parse an operation mix such as ``add=3,division=1`` into a weight dictionary."""
+    mix = {}
+    for item in text.split(","):
+        name, sep, weight = item.strip().partition("=")
+        try:
+            mix[name.lower()] = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight in '{item.strip()}'")
+    return mix
+
+
+class ReplayReport:
+    """Command count, errors and latency percentiles of one replay."""
+
+    def __init__(self, target, speed):
+        self.target = target
+        self.speed = speed
+        self.commands = 0
+        self.errors = 0
+        self.skipped = 0
+        self.seconds = 0.0
+        self.latency = LatencyHistogram()
+
+    @property
+    def throughput(self):
+        return self.commands / self.seconds if self.seconds > 0 else 0.0
+
+    def summary_lines(self):
+        speed = "max" if self.speed is None else f"{self.speed:g}x"
+        latency = self.latency
+        return [
+            f"Replayed {self.commands} commands through {self.target} at {speed} speed "
+            f"in {self.seconds:.3f} s ({self.throughput:.1f} commands/s)",
+            f"Errors: {self.errors}" + (f", skipped: {self.skipped}" if self.skipped else ""),
+            f"Latency ms: p50 {latency.percentile(0.50) * 1e3:.3f}  p95 {latency.percentile(0.95) * 1e3:.3f}  "
+            f"p99 {latency.percentile(0.99) * 1e3:.3f}  max {latency.max * 1e3:.3f}",
+        ]
+
+
+def _schedule(records, speed, clock, sleep, idle=None):
+    """Yield ``(arrival, line)`` with ``arrival`` on ``clock``, sleeping until each is due.
+
+    At max speed (``speed`` None) every command arrives as soon as the previous one is
+    taken, so latency is service time. When paced, a command that arrives while the
+    target is still busy waits, and that queueing counts toward its latency. ``idle``
+    is called before sleeping.
+    """
+    if speed is not None and speed <= 0:
+        raise ValueError("Speed must be greater than zero")
+    arrival = clock()
+    for delay, line in records:
+        if speed is None:
+            yield clock(), line
+            continue
+        arrival += delay / speed
+        if arrival > clock():
+            if idle is not None:
+                idle()
+            wait = arrival - clock()
+            if wait > 0:
+                sleep(wait)
+        yield arrival, line
+
+
+def replay_repl(records, repl, speed=1.0, clock=time.perf_counter, sleep=time.sleep):
+    """Feed workload records to ``repl.execute_command`` and report throughput and latency.
+
+    ``speed`` scales the recorded inter-arrival times (2.0 replays twice as fast); None
+    replays at max speed. Output is discarded; commands whose output starts with an
+    error message are counted as errors. Replay stops at an ``exit`` command.
+    """
+    report = ReplayReport("repl", speed)
+    messages = []
+    emit, repl.emit = repl.emit, messages.append
+    start = clock()
+    try:
+        for arrival, line in _schedule(records, speed, clock, sleep):
+            keep_going = repl.execute_command(line)
+            report.latency.observe(clock() - arrival)
+            report.commands += 1
+            if any(str(message).startswith(_ERROR_PREFIXES) for message in messages):
+                report.errors += 1
+            messages.clear()
+            if not keep_going:
+                break
+    finally:
+        report.seconds = clock() - start
+        repl.emit = emit
+    return report
+
+
+def _parse_operation(line):
+    # (operation, a, b) for two-operand operation commands, None for anything else
+    parts = line.split()
+    if len(parts) != 3 or not OperationFactory.has_operation(parts[0]):
+        return None
+    name = parts[0].lower()
+    if getattr(OperationFactory.get_operation(name), "arity", 2) != 2:
+        return None
+    return name, parts[1], parts[2]
+
+
+def replay_batch(records, speed=1.0, batch_size=1024, clock=time.perf_counter, sleep=time.sleep):
+    """Drive the vectorized batch engine with the operation commands of a workload.
+
+    Commands that have arrived are queued and run through ``execute_group`` (the server's
+    batch path: ``OperationFactory.execute_batch`` with a scalar fallback for rows the
+    kernel flags) once ``batch_size`` are waiting or the next command isn't due yet;
+    each command's latency runs from its arrival to the end of its batch. Other commands (and operations
+    that don't take two operands) are skipped, and non-numeric operands count as errors.
+    """
+    report = ReplayReport("batch", speed)
+    pending = []
+
+    def run_pending():
+        if not pending:
+            return
+        groups = {}
+        for arrival, name, a, b in pending:
+            groups.setdefault(name, []).append((arrival, a, b))
+        for name, rows in groups.items():
+            outcomes = execute_group(name, [row[1] for row in rows], [row[2] for row in rows])
+            done = clock()
+            for (arrival, _, _), outcome in zip(rows, outcomes):
+                report.latency.observe(done - arrival)
+                if isinstance(outcome, Exception):
+                    report.errors += 1
+        report.commands += len(pending)
+        pending.clear()
+
+    start = clock()
+    for arrival, line in _schedule(records, speed, clock, sleep, idle=run_pending):
+        command = _parse_operation(line)
+        if command is None:
+            report.skipped += 1
+            continue
+        try:
+            a, b = float(command[1]), float(command[2])
+        except ValueError:
+            report.commands += 1
+            report.errors += 1
+            report.latency.observe(clock() - arrival)
+            continue
+        pending.append((arrival, command[0], a, b))
+        if len(pending) >= batch_size:
+            run_pending()
+    run_pending()
+    report.seconds = clock() - start
+    return report
+
+
+def main(argv=None): # pragma: no cover
+    import argparse
+    parser = argparse.ArgumentParser(description="Record, generate and replay calculator workloads")
+    subcommands = parser.add_subparsers(dest="action", required=True)
+
+    generate = subcommands.add_parser("generate", help="write a synthetic workload file")
+    generate.add_argument("path", help="output file (.gz to compress)")
+    generate.add_argument("--count", type=int, default=10000, help="number of commands")
+    generate.add_argument("--rate", type=float, default=100.0, help="mean commands per second")
+    generate.add_argument("--mix", help="operation weights, e.g. add=3,division=1 (default: all equally)")
+    generate.add_argument("--error-rate", type=float, default=0.0, help="fraction of failing commands")
+    generate.add_argument("--seed", type=int, help="random seed, for a reproducible workload")
+
+    replay = subcommands.add_parser("replay", help="replay a workload file and report latency")
+    replay.add_argument("path", help="workload file, recorded with CALCULATOR_RECORD_FILE or generated")
+    replay.add_argument("--speed", default="1", help="time scale, e.g. 1, 10 or max")
+    replay.add_argument("--target", choices=("repl", "batch"), default="repl", help="what to drive")
+    replay.add_argument("--batch-size", type=int, default=1024, help="largest batch for --target batch")
+
+    args = parser.parse_args(argv)
+    if args.action == "generate":
+        mix = parse_mix(args.mix) if args.mix else None
+        count = write_workload(args.path, generate_workload(args.count, mix, args.error_rate, args.rate, args.seed))
+        print(f"Wrote {count} commands to {args.path}")
+        return
+    speed = None if args.speed.lower() == "max" else float(args.speed)
+    if speed is not None and speed <= 0:
+        parser.error("--speed must be greater than zero, or max")
+    records = read_workload(args.path)
+    if args.target == "batch":
+        report = replay_batch(records, speed, args.batch_size)
+    else:
+        from app.calculator import CalculatorREPL
+        report = replay_repl(records, CalculatorREPL(show_banner=False), speed)
+    print("\n".join(report.summary_lines()))
+
+if __name__ == "__main__": # pragma: no cover
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_memento.py
+#
+# Memory and undo/redo cost of the Caretaker as the REPL drives it: one snapshot per operation.
+# Run from the project root:  python -m benchmarks.bench_memento [sizes...]
+
+import sys
+import time
+import tracemalloc
+
+from app.calculator_config import CalculatorConfig
+from app.calculator_memento import Caretaker, Memento
+
+
+def snapshot_session(operations, share, history_size=None):
+    caretaker = Caretaker()
+    history = []
+    caretaker.save_history(history)
+    for i in range(operations):
+        history.append({"operation": "add", "a": float(i), "b": 1.0, "result": i + 1.0})
+        if history_size is not None and len(history) > history_size:
+            del history[0]
+        if share:
+            caretaker.save_history(history, appended=1)
+        else:
+            caretaker.save_state(Memento(history))  # full copy per snapshot
+    return caretaker, history
+
+
+def measure(operations, share=True, history_size=None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    caretaker, history = snapshot_session(operations, share, history_size)
+    build_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(100):
+        caretaker.undo()
+    for _ in range(100):
+        caretaker.redo()
+    undo_redo_us = (time.perf_counter() - start) / 200 * 1e6
+
+    return {
+        "operations": operations,
+        "mode": ("shared" if share else "full-copy") if history_size is None else f"bounded-{history_size}",
+        "memory_mb": current / 1e6,
+        "peak_mb": peak / 1e6,
+        "bytes_per_operation": current / operations,
+        "build_seconds": build_seconds,
+        "undo_redo_us": undo_redo_us,
+    }
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10_000, 100_000]
+    rows = [measure(n) for n in sizes]
+    # A bounded history like the REPL's: older undo levels spill to disk, so memory stays flat
+    rows += [measure(n, history_size=CalculatorConfig.MAX_HISTORY_SIZE) for n in sizes]
+    # The old full-copy mementos are quadratic, so only measure them at a size that finishes
+    rows.append(measure(min(sizes[0], 2_000), share=False))
+    print(f"{'operations':>10} {'mode':>10} {'memory MB':>10} {'peak MB':>9} {'B/op':>8} {'build s':>8} {'undo/redo us':>13}")
+    for row in rows:
+        print(f"{row['operations']:>10} {row['mode']:>10} {row['memory_mb']:>10.1f} {row['peak_mb']:>9.1f} "
+              f"{row['bytes_per_operation']:>8.0f} {row['build_seconds']:>8.2f} {row['undo_redo_us']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
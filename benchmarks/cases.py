@@ -0,0 +1,171 @@
+# benchmarks/cases.py
+#
+# Each case takes a history size and returns {"seconds": ..., "items": ...} for the timed part.
+# Setup (prefilling history, priming files) is excluded from the timing.
+
+import builtins
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from app.calculator_config import CalculatorConfig
+from app.calculator_memento import Caretaker
+from app.input_validators import validate_rows
+from app.operations import OperationFactory
+
+# Commands timed per dispatch / undo-redo run; the history size is what varies
+DISPATCH_COMMANDS = 1000
+UNDO_REDO_STEPS = 200
+
+
+@contextlib.contextmanager
+def isolated_config(history_size):
+    """Point history/log files at a temp dir and size the ring buffer for the case."""
+    saved = {name: getattr(CalculatorConfig, name) for name in ("HISTORY_DIR", "LOG_DIR", "MAX_HISTORY_SIZE")}
+    with tempfile.TemporaryDirectory() as tmp:
+        CalculatorConfig.HISTORY_DIR = os.path.join(tmp, "history")
+        CalculatorConfig.LOG_DIR = os.path.join(tmp, "logs")
+        CalculatorConfig.MAX_HISTORY_SIZE = max(history_size, 1)
+        try:
+            yield tmp
+        finally:
+            for name, value in saved.items():
+                setattr(CalculatorConfig, name, value)
+
+
+def prefill(history_manager, size):
+    for i in range(size):
+        history_manager.add_entry("add", float(i), 1.0, i + 1.0)
+
+
+def _binary_operations(batch=False):
+    # Two-operand operations (and with a vectorized kernel, for batch=True)
+    return [
+        name for name, op in OperationFactory.operations.items()
+        if getattr(op, "arity", 2) == 2 and (not batch or hasattr(op, "execute_batch"))
+    ]
+
+
+def bench_operations(size):
+    """Scalar execute() throughput across every operation, ``size`` calls each."""
+    a_values = [float(i % 97 + 1) for i in range(size)]
+    b_values = [float(i % 7 + 1) for i in range(size)]
+    names = _binary_operations()
+    total = 0.0
+    for name in names:
+        execute = OperationFactory.get_operation(name).execute
+        start = time.perf_counter()
+        for a, b in zip(a_values, b_values):
+            execute(a, b)
+        total += time.perf_counter() - start
+    return {"seconds": total, "items": size * len(names)}
+
+
+def bench_operations_batch(size):
+    """Vectorized execute_batch over ``size`` rows for every operation."""
+    a_values = [float(i % 97 + 1) for i in range(size)]
+    b_values = [float(i % 7 + 1) for i in range(size)]
+    names = _binary_operations(batch=True)
+    start = time.perf_counter()
+    for name in names:
+        OperationFactory.execute_batch(name, a_values, b_values)
+    return {"seconds": time.perf_counter() - start, "items": size * len(names)}
+
+
+def bench_repl_dispatch(size):
+    """CalculatorREPL.run per-command cost (history, memento, log, autosave) with ``size`` entries already in history."""
+    from app.calculator import CalculatorREPL
+    with isolated_config(size):
+        with contextlib.redirect_stdout(io.StringIO()):
+            repl = CalculatorREPL()
+        prefill(repl.history_manager, size)
+        repl.caretaker.save_history(repl.history_manager.history)
+        repl.history_manager.save_to_csv()  # steady state: autosave only appends from here
+        commands = iter([f"multiply {i} 3" for i in range(DISPATCH_COMMANDS)] + ["exit"])
+        original_input = builtins.input
+        builtins.input = lambda prompt="": next(commands)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                repl.run()
+                seconds = time.perf_counter() - start
+        finally:
+            builtins.input = original_input
+    return {"seconds": seconds, "items": DISPATCH_COMMANDS}
+
+
+def bench_save_to_csv(size):
+    from app.history import HistoryManager
+    with isolated_config(size):
+        history_manager = HistoryManager()
+        prefill(history_manager, size)
+        start = time.perf_counter()
+        history_manager.save_to_csv()
+        return {"seconds": time.perf_counter() - start, "items": size}
+
+
+def bench_load_from_csv(size):
+    from app.history import HistoryManager
+    with isolated_config(size):
+        history_manager = HistoryManager()
+        prefill(history_manager, size)
+        history_manager.save_to_csv()
+        loader = HistoryManager()
+        start = time.perf_counter()
+        loader.load_from_csv()
+        return {"seconds": time.perf_counter() - start, "items": size}
+
+
+def bench_verify_history(size):
+    """Streaming recompute-and-compare of a ``size``-row history CSV against today's operations."""
+    from app.history_stream import write_entries
+    from app.verify import HistoryVerifier
+    names = _binary_operations(batch=True)
+    entries = []
+    for i in range(size):
+        name = names[i % len(names)]
+        a, b = float(i % 97 + 1), float(i % 7 + 1)
+        entries.append({"operation": name, "a": a, "b": b, "result": OperationFactory.get_operation(name).execute(a, b)})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.csv")
+        write_entries(path, entries)
+        start = time.perf_counter()
+        HistoryVerifier().verify([path])
+        return {"seconds": time.perf_counter() - start, "items": size}
+
+
+def bench_undo_redo(size):
+    """Caretaker.undo/redo with ``size`` entries of history behind each snapshot."""
+    caretaker = Caretaker()
+    history = [{"operation": "add", "a": float(i), "b": 1.0, "result": i + 1.0} for i in range(size)]
+    caretaker.save_history(history)
+    for i in range(UNDO_REDO_STEPS):
+        history.append({"operation": "add", "a": float(i), "b": 2.0, "result": i + 2.0})
+        caretaker.save_history(history, appended=1)
+    start = time.perf_counter()
+    for _ in range(UNDO_REDO_STEPS):
+        caretaker.undo()
+    for _ in range(UNDO_REDO_STEPS):
+        caretaker.redo()
+    return {"seconds": time.perf_counter() - start, "items": 2 * UNDO_REDO_STEPS}
+
+
+def bench_validate_rows(size):
+    """Batch parse and validation of ``size`` operand rows, one in 100 malformed."""
+    rows = [[str(i * 0.37), str(i % 97)] if i % 100 else ["x", "1"] for i in range(size)]
+    start = time.perf_counter()
+    validate_rows(rows)
+    return {"seconds": time.perf_counter() - start, "items": size}
+
+CASES = {
+    "operations": bench_operations,
+    "operations_batch": bench_operations_batch,
+    "validate_rows": bench_validate_rows,
+    "repl_dispatch": bench_repl_dispatch,
+    "save_to_csv": bench_save_to_csv,
+    "load_from_csv": bench_load_from_csv,
+    "verify_history": bench_verify_history,
+    "undo_redo": bench_undo_redo,
+}
@@ -0,0 +1,105 @@
+# benchmarks/run.py
+#
+# Run the benchmark suite, write JSON results and compare them with a stored baseline.
+#
+#   python -m benchmarks.run                                 # all cases at 100, 10k and 1M
+#   python -m benchmarks.run --sizes 100 10000 --cases undo_redo repl_dispatch
+#   python -m benchmarks.run --save-baseline                 # record benchmarks/baseline.json
+#   python -m benchmarks.run --threshold 0.25                # fail if >25% slower than baseline
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.cases import CASES
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def run_suite(case_names, sizes, repeat=3):
+    """Run each case at each size, keeping the fastest of ``repeat`` runs."""
+    results = []
+    for name in case_names:
+        for size in sizes:
+            runs = [CASES[name](size) for _ in range(repeat)]
+            best = min(runs, key=lambda run: run["seconds"])
+            results.append({
+                "case": name,
+                "size": size,
+                "seconds": best["seconds"],
+                "items": best["items"],
+                "per_item_us": best["seconds"] / best["items"] * 1e6 if best["items"] else 0.0,
+            })
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return the (case, size, baseline_us, current_us, change) rows slower than ``threshold``."""
+    previous = {(row["case"], row["size"]): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = previous.get((row["case"], row["size"]))
+        if old is None or old["per_item_us"] <= 0:
+            continue
+        change = row["per_item_us"] / old["per_item_us"] - 1
+        if change > threshold:
+            regressions.append((row["case"], row["size"], old["per_item_us"], row["per_item_us"], change))
+    return regressions
+
+
+def print_table(report):
+    print(f"{'case':<18} {'size':>9} {'seconds':>10} {'per item (us)':>14}")
+    for row in report["results"]:
+        print(f"{row['case']:<18} {row['size']:>9} {row['seconds']:>10.4f} {row['per_item_us']:>14.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculator benchmark suite")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json", help="where to write JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown per item before a case counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = run_suite(args.cases, args.sizes, args.repeat)
+    print_table(report)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    for case, size, old, new, change in regressions:
+        print(f"REGRESSION {case} @ {size}: {old:.3f}us -> {new:.3f}us per item (+{change:.0%})")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import pytest
+from app.calculator_config import CalculatorConfig
+
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Keep history, journal, cache and log files written by tests out of ./history and ./logs."""
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(CalculatorConfig, "LOG_DIR", str(tmp_path / "logs"))
@@ -0,0 +1,35 @@
+import json
+from benchmarks import run
+from benchmarks.cases import CASES
+
+
+def make_report(per_item):
+    return {"results": [{"case": case, "size": 100, "seconds": 1.0, "items": 1, "per_item_us": us}
+                        for case, us in per_item.items()]}
+
+def test_compare_flags_slowdowns_over_threshold():
+    baseline = make_report({"operations": 1.0, "undo_redo": 2.0, "save_to_csv": 3.0})
+    current = make_report({"operations": 1.1, "undo_redo": 3.0, "load_from_csv": 9.0})
+    regressions = run.compare(current, baseline, threshold=0.2)
+    assert [(case, size) for case, size, *_ in regressions] == [("undo_redo", 100)]
+    assert regressions[0][4] == 0.5
+
+def test_run_suite_covers_every_case():
+    report = run.run_suite(list(CASES), sizes=[10], repeat=1)
+    assert {row["case"] for row in report["results"]} == set(CASES)
+    assert all(row["seconds"] >= 0 and row["items"] > 0 for row in report["results"])
+
+def test_main_writes_results_and_compares(tmp_path, capsys):
+    output = str(tmp_path / "results.json")
+    baseline = str(tmp_path / "baseline.json")
+    argv = ["--cases", "undo_redo", "--sizes", "10", "--repeat", "1", "--output", output, "--baseline", baseline]
+    assert run.main(argv) == 0
+    assert "No baseline" in capsys.readouterr().out
+    assert run.main(argv + ["--save-baseline"]) == 0
+    with open(baseline) as f:
+        stored = json.load(f)
+    stored["results"][0]["per_item_us"] /= 1000  # pretend the baseline was much faster
+    with open(baseline, "w") as f:
+        json.dump(stored, f)
+    assert run.main(argv) == 1
+    assert "REGRESSION undo_redo @ 10" in capsys.readouterr().out
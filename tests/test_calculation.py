@@ -34,3 +34,9 @@ def test_division_by_zero():
     with pytest.raises(OperationError) as exc_info:
         calc.execute()
     assert "Calculation failed" in str(exc_info.value)
+
+
+def test_out_of_range_inputs():
+    calc = Calculation("power", 2, 10 ** 9)
+    with pytest.raises(ValidationError, match="Operands must be between"):
+        calc.execute()
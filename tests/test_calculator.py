@@ -1,8 +1,10 @@
+import io
 import pytest
 from unittest.mock import patch, MagicMock
 from app.calculator import CalculatorREPL
 from app.exceptions import OperationError
 from app.calculator_memento import Memento, Caretaker
+from app.calculator_config import CalculatorConfig
 
 def test_help_command(capsys):
     repl = CalculatorREPL()
@@ -284,3 +286,369 @@ def test_generic_exception_handling_print(capsys, monkeypatch):
         repl.run()
     captured = capsys.readouterr()
     assert "Error: Test generic error" in captured.out
+
+def test_load_records_snapshot(capsys, monkeypatch):
+    repl = CalculatorREPL()
+    loaded = [{"operation": "add", "a": 4, "b": 4, "result": 8}]
+    def fake_load():
+        repl.history_manager.history = list(loaded)
+    monkeypatch.setattr(repl.history_manager, 'load_from_csv', fake_load)
+    with patch('builtins.input', side_effect=['add 1 2', 'load', 'undo', 'exit']):
+        repl.run()
+    captured = capsys.readouterr()
+    assert "Undo -> add(1.0, 2.0) = 3.0" in captured.out
+
+def test_run_script_matches_interactive_commands():
+    repl = CalculatorREPL(show_banner=False)
+    out = io.StringIO()
+    script = io.StringIO("add 2 3\n\nmultiply 4 5\nhistory\nundo\nfoo\ndivision 1 0\nexit\nadd 9 9\n")
+    count = repl.run_script(script, out=out)
+    lines = out.getvalue().splitlines()
+    assert count == 8
+    assert lines[0] == "Result: 5.0"
+    assert lines[1] == "Result: 20.0"
+    assert "2. multiply(4.0, 5.0) = 20.0" in lines
+    assert "Undo -> add(2.0, 3.0) = 5.0" in lines
+    assert "Unknown command: foo. Type 'help' for a list of commands." in lines
+    assert "Error: Division by zero is not allowed." in lines
+    assert lines[-1] == "Goodbye!"
+    assert repl.emit is print
+
+def test_run_script_defers_observers_per_chunk(monkeypatch):
+    repl = CalculatorREPL(show_banner=False)
+    batches = []
+    monkeypatch.setattr(repl.logger, 'update_batch', lambda events: batches.append(list(events)))
+    monkeypatch.setattr(repl.auto_saver, 'update_batch', lambda events: None)
+    out = io.StringIO()
+    repl.run_script(io.StringIO("add 1 1\nadd 2 2\nadd 3 3\n"), out=out, chunk_size=2)
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert batches[0][0] == ("add", 1.0, 1.0, 2.0)
+
+def test_run_script_falls_back_to_update(monkeypatch):
+    repl = CalculatorREPL(show_banner=False)
+    calls = []
+    class PlainObserver:
+        def update(self, *args):
+            calls.append(args)
+    repl.observers = [PlainObserver()]
+    repl.run_script(io.StringIO("add 1 1\nsubtract 5 2\n"), out=io.StringIO())
+    assert calls == [("add", 1.0, 1.0, 2.0), ("subtract", 5.0, 2.0, 3.0)]
+
+def test_run_script_reports_observer_errors():
+    repl = CalculatorREPL(show_banner=False)
+    class FailingObserver:
+        def update_batch(self, events):
+            raise Exception("disk full")
+    repl.observers = [FailingObserver()]
+    out = io.StringIO()
+    repl.run_script(io.StringIO("add 1 1\n"), out=out)
+    assert "Error: disk full" in out.getvalue()
+
+def test_run_script_autosaves_once_per_chunk(tmp_path, monkeypatch):
+    repl = CalculatorREPL(show_banner=False)
+    calls = []
+    monkeypatch.setattr(repl.history_manager, 'append_to_journal', lambda: calls.append(1))
+    repl.run_script(io.StringIO("add 1 1\nadd 2 2\nadd 3 3\n"), out=io.StringIO())
+    assert calls == [1]
+
+def test_run_script_journals_chunks_larger_than_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(CalculatorConfig, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 10)
+    repl = CalculatorREPL(show_banner=False)
+    script = "".join(f"add {i} 1\n" for i in range(200))
+    repl.run_script(io.StringIO(script), out=io.StringIO(), chunk_size=10000)
+    assert len(repl.history_manager.history) == 10
+    assert repl.history_manager.saved_count() == 200
+    saved = repl.history_manager.get_saved_range(0, 200)
+    assert [entry["a"] for entry in saved] == list(range(200))
+
+def test_history_paging(capsys, tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_BACKEND", "binary")
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    repl = CalculatorREPL()
+    repl.history_manager.backend.save(
+        [{"operation": "add", "a": i, "b": 1, "result": i + 1} for i in range(1, 2001)]
+    )
+    with patch('builtins.input', side_effect=['history 1000 1002', 'history 1999', 'history 5000',
+                                              'history x', 'history 5 2', 'history 1 2 3', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "1000. add(1000, 1) = 1001" in out
+    assert "1002. add(1002, 1) = 1003" in out
+    assert "1003. add" not in out
+    assert "2000. add(2000, 1) = 2001" in out
+    assert "No saved history entries from 5000 (saved entries: 2000)." in out
+    assert "History positions must be whole numbers." in out
+    assert "History positions must satisfy 1 <= START <= STOP." in out
+    assert "Usage: history [START [STOP]]" in out
+
+@pytest.mark.parametrize("name", ["csv", "sqlite", "binary"])
+def test_history_paging_after_undo_and_save(name, capsys, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_BACKEND", name)
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 10)
+    repl = CalculatorREPL(show_banner=False)
+    script = "".join(f"add {i} 1\n" for i in range(1, 1201))
+    repl.run_script(io.StringIO(script), out=io.StringIO(), chunk_size=10000)
+    capsys.readouterr()
+    for command in ("undo", "add 5000 1", "history 1000 1001", "save", "history 1 2", "history 1000 1001"):
+        repl.execute_command(command)
+    out = capsys.readouterr().out
+    assert out.count("1000. add(1000.0, 1.0) = 1001.0") == 2
+    assert "1. add(1.0, 1.0) = 2.0" in out
+    assert repl.history_manager.saved_count() == 1200
+    assert repl.history_manager.get_saved_range(1199, 1200)[0]["a"] == 5000
+
+def test_cache_command_disabled(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['cache', 'exit']):
+        repl.run()
+    assert "Cache is disabled." in capsys.readouterr().out
+
+def test_cache_command_reports_stats(capsys, tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(CalculatorConfig, "CACHE_ENABLED", True)
+    monkeypatch.setattr(CalculatorConfig, "CACHE_PERSIST", True)
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['power 2 8', 'power 2 8', 'cache', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Cache (lru): 1/1024 entries" in out
+    assert "Hits: 1, Misses: 1, Evictions: 0, Hit rate: 50.0%" in out
+    assert (tmp_path / "calculator_cache.json").exists()
+
+    # A new session starts warm
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['power 2 8', 'cache clear', 'cache', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Cache cleared." in out
+    assert repl.cache.hits == 0
+    assert len(repl.cache) == 0
+
+def test_cache_is_per_session(monkeypatch):
+    from app.operations import OperationFactory
+    monkeypatch.setattr(CalculatorConfig, "CACHE_ENABLED", True)
+    first, second = CalculatorREPL(show_banner=False), CalculatorREPL(show_banner=False)
+    first.execute_command("power 2 8")
+    first.execute_command("power 2 8")
+    second.execute_command("power 2 8")
+    assert OperationFactory.cache is None
+    assert (first.cache.hits, first.cache.misses) == (1, 1)
+    assert (second.cache.hits, second.cache.misses) == (0, 1)
+
+def test_eval_records_single_entry(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['eval (3 + 4) ^ 2 % 5', 'eval -2 ^ 2', 'history', 'undo', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Result: 4.0" in out
+    assert "Result: -4.0" in out
+    assert "1. modulus(49.0, 5.0) = 4.0" in out
+    assert "2." not in out
+    assert "History is now empty after undo." not in out
+
+def test_eval_errors(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['eval', 'eval 1 +', 'eval 1 / 0', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Please provide an expression." in out
+    assert "Error: Invalid expression: unexpected end of input" in out
+    assert "Division by zero is not allowed." in out
+    assert len(repl.history_manager.history) == 0
+
+def test_stats_command_reports_metrics(capsys, tmp_path):
+    repl = CalculatorREPL()
+    export_path = tmp_path / "metrics.prom"
+    with patch('builtins.input', side_effect=[
+        'add 2 3', 'division 1 0', 'bogus', 'stats', f'stats export {export_path}', 'stats reset', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "add" not in repl.metrics.commands  # reset before exit
+    assert "error division ZeroDivisionError: 1" in out
+    assert "observer:LoggingObserver" in out
+    assert "Metrics reset." in out
+    text = export_path.read_text()
+    assert 'calculator_commands_total{command="add"} 1' in text
+    assert 'calculator_commands_total{command="unknown"} 1' in text
+
+def test_stats_disabled(capsys, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "METRICS_ENABLED", False)
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['add 2 3', 'stats', 'exit']):
+        repl.run()
+    assert repl.metrics is None
+    assert "Metrics are disabled." in capsys.readouterr().out
+
+def test_percent_command_matches_factory(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['percent 50 200', 'precent 50 200', 'help', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Result: 25.0" in out
+    assert "Unknown command: precent" in out
+    assert "percent" in out and "precent," not in out
+    assert "undo" in out and "stats [reset | export [PATH]]" in out
+
+def test_find_command(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        'add 1 2', 'power 2 10', 'add 5 5', 'find add result=5..', 'find power', 'undo', 'undo', 'find power',
+        'find result=..3 limit=1', 'find add bogus=1', 'find a=x', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "3. add(5.0, 5.0) = 10.0" in out
+    assert "2. power(2.0, 10.0) = 1024.0" in out
+    assert "No matching history entries." in out
+    assert "1. add(1.0, 2.0) = 3.0" in out
+    assert "Error: Unknown filter 'bogus'" in out
+    assert "Error: Invalid value in 'a=x'" in out
+
+def test_analyze_command(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        'analyze', 'add 1 2', 'add 3 4', 'division 1 0', 'multiply x 2', 'analyze', 'analyze add',
+        'analyze power', 'analyze add power', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "History is empty." in out
+    assert out.count("operation       count") == 2
+    assert "add                 2           10            5            3            7            8       0     0.00" in out
+    assert "division            0            0            -            -            -            0       1   100.00" in out
+    assert "multiply            0            0            -            -            -            0       1   100.00" in out
+    assert "all                 2           10            5            3            7            8       2    50.00" in out
+    assert "No history entries for 'power'." in out
+    assert "Error: Usage: analyze [OPERATION]" in out
+
+def test_import_and_export_commands(capsys, tmp_path):
+    source = tmp_path / "external.csv"
+    source.write_text("operation,a,b,result\nadd,1,2,3\nadd,one,2,3\npower,2,3,8\n")
+    exported = tmp_path / "exported.csv"
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        f'import {source}', f'import {source} merge', 'import', f'export {exported}', 'history', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert f"Imported 2 entries from {source}." in out
+    assert "line 3: operands must be numbers" in out
+    assert f"Imported 0 entries from {source}." in out
+    assert "Skipped 2 duplicate entries." in out
+    assert "Error: Usage: import PATH [merge]" in out
+    assert f"Exported 2 entries to {exported}." in out
+    assert exported.read_text().splitlines() == ["operation,a,b,result", "add,1,2,3", "power,2,3,8"]
+
+def test_powmod_command(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['powmod 4 13 497', 'powmod 4 13', 'powmod 4 1.5 7', 'history', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Result: 445" in out
+    assert "Error: Please provide exactly three numeric operands. Example: powmod 4 13 497" in out
+    assert "Error: Operands must be whole numbers." in out
+    assert "1. powmod(4, 13) = 445" in out
+
+def test_operands_limited_to_max_input_value(capsys, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "MAX_INPUT_VALUE", 1000.0)
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['power 2 1001', 'power 2 10', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Error: Operands must be between -1000 and 1000." in out
+    assert "Result: 1024.0" in out
+
+def test_let_and_variable_references(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        'let x = add 5 2', 'let y = power x 3', 'let x = 2', 'y', 'add y x', 'multiply ans 2', 'ans',
+        'let z = add ans 1', 'vars', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "x = 7.0" in out
+    assert "y = 343.0" in out
+    assert "y = 8.0" in out
+    assert "Result: 10.0" in out
+    assert "Result: 20.0" in out
+    assert "ans = 20.0" in out
+    assert "z = 21.0" in out
+    assert out.endswith("x = 2.0\ny = 8.0\nz = 21.0\nGoodbye!\n")
+    assert [entry["operation"] for entry in repl.history_manager.history] == [
+        "add", "power", "add", "multiply", "add"
+    ]
+
+def test_let_errors(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        'vars', 'let', 'let x add 1 2', 'let add = 1', 'let ans = 1', 'let 2x = 1', 'let x = foo 1 2',
+        'let x = add nope 1', 'let x = add ans 1', 'let x = 1', 'let x = add x 1', 'let w = division x 0',
+        'let v = multiply w 2', 'v', 'vars', 'add nope 1', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "No variables defined." in out
+    assert out.count("Error: Usage: let NAME") == 2
+    assert "Error: 'add' can't be used as a variable name." in out
+    assert "Error: 'ans' can't be used as a variable name." in out
+    assert "Error: '2x' can't be used as a variable name." in out
+    assert "Error: Unknown operation: foo" in out
+    assert "Error: Unknown variable 'nope'" in out
+    assert "Error: No previous result for 'ans'" in out
+    assert "Error: Circular reference: 'x' would depend on itself" in out
+    assert out.count("Operation Error: 'w': Calculation failed") == 5
+    assert "v = Operation Error: 'w': Calculation failed" in out
+    assert "Error: Operands must be numbers." in out
+
+def test_eval_and_let_check_operand_range(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=[
+        'eval 1e300 * 1e300', 'eval 1000 * 1001 * 2', 'eval (1 / 0) + 1', 'let x = 1e300', 'let x = add 1e300 1',
+        'analyze', 'exit'
+    ]):
+        repl.run()
+    out = capsys.readouterr().out
+    limit = f"{CalculatorConfig.MAX_INPUT_VALUE:g}"
+    assert out.count(f"Error: Operands must be between -{limit} and {limit}.") == 4
+    assert "Error: Division by zero is not allowed." in out
+    assert "Result: inf" not in out
+    assert len(repl.history_manager.history) == 0
+    assert repl.history_manager._errors == {"multiply": 1, "division": 1}
+
+def test_execution_value_errors_are_operation_errors(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['powmod 2 -1 4', 'powmod 2 x 4', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "Operation Error: base is not invertible for the given modulus" in out
+    assert out.count("Error: Operands must be whole numbers.") == 1
+    assert repl.history_manager._errors == {"powmod": 2}
+
+@pytest.mark.filterwarnings("error")
+def test_analyze_huge_results_without_warnings(capsys):
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['power 1000000 51', 'power -1000000 51', 'analyze', 'exit']):
+        repl.run()
+    out = capsys.readouterr().out
+    assert "power               2" in out
+    assert "Warning" not in out
+
+def test_undo_and_save_keep_history_older_than_memory(capsys, tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 5)
+    repl = CalculatorREPL(show_banner=False)
+    for i in range(12):
+        repl.execute_command(f"add {i} 1")
+    repl.execute_command("undo")
+    repl.execute_command("add 100 1")
+    saved = repl.history_manager.get_saved_range(0, 20)
+    assert [entry["a"] for entry in saved] == [float(i) for i in range(11)] + [100.0]
+
+    fresh = CalculatorREPL(show_banner=False)
+    fresh.execute_command("load")
+    fresh.execute_command("save")
+    fresh.execute_command("undo")  # back to the loaded state
+    fresh.execute_command("save")
+    assert fresh.history_manager.saved_count() == 12
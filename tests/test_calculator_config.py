@@ -2,6 +2,14 @@ import pytest
 from app import calculator_config
 from app.exceptions import ConfigError
 
+@pytest.fixture(autouse=True)
+def restore_config():
+    # load_config() mutates the shared CalculatorConfig class; undo that after each test
+    saved = {name: value for name, value in vars(calculator_config.CalculatorConfig).items() if name.isupper()}
+    yield
+    for name, value in saved.items():
+        setattr(calculator_config.CalculatorConfig, name, value)
+
 def test_load_config(monkeypatch):
     # Set some environment variables
     monkeypatch.setenv("CALCULATOR_PRECISION", "3")
@@ -27,3 +35,66 @@ def test_invalid_max_input_value(monkeypatch):
     monkeypatch.setenv("CALCULATOR_MAX_INPUT_VALUE", "0")
     with pytest.raises(ConfigError, match="MAX_INPUT_VALUE must be greater than zero"):
         calculator_config.load_config()
+
+@pytest.mark.parametrize("name, value, message", [
+    ("CALCULATOR_LOG_QUEUE_SIZE", "0", "LOG_QUEUE_SIZE must be at least 1"),
+    ("CALCULATOR_LOG_BATCH_SIZE", "0", "LOG_BATCH_SIZE must be at least 1"),
+    ("CALCULATOR_LOG_FLUSH_INTERVAL", "0", "LOG_FLUSH_INTERVAL must be greater than zero"),
+    ("CALCULATOR_SCRIPT_CHUNK_SIZE", "0", "SCRIPT_CHUNK_SIZE must be at least 1"),
+    ("CALCULATOR_HISTORY_BACKEND", "xml", "HISTORY_BACKEND must be one of"),
+    ("CALCULATOR_CACHE_SIZE", "0", "CACHE_SIZE must be at least 1"),
+    ("CALCULATOR_CACHE_POLICY", "random", "CACHE_POLICY must be one of"),
+    ("CALCULATOR_EXPRESSION_CACHE_SIZE", "0", "EXPRESSION_CACHE_SIZE must be at least 1"),
+    ("CALCULATOR_PARALLEL_WORKERS", "-1", "PARALLEL_WORKERS must be non-negative"),
+    ("CALCULATOR_PARALLEL_CHUNK_SIZE", "0", "PARALLEL_CHUNK_SIZE must be at least 1"),
+    ("CALCULATOR_SERVER_MAX_BATCH_SIZE", "0", "SERVER_MAX_BATCH_SIZE must be at least 1"),
+    ("CALCULATOR_SERVER_BATCH_WINDOW", "-1", "SERVER_BATCH_WINDOW must be non-negative"),
+    ("CALCULATOR_TRACE_SAMPLE_RATE", "1.5", "TRACE_SAMPLE_RATE must be between 0 and 1"),
+    ("CALCULATOR_HISTORY_CHUNK_SIZE", "0", "HISTORY_CHUNK_SIZE must be at least 1"),
+    ("CALCULATOR_WORKER_TIMEOUT", "0", "WORKER_TIMEOUT must be greater than zero"),
+    ("CALCULATOR_WORKER_MEMORY_MB", "0", "WORKER_MEMORY_MB must be at least 1"),
+    ("CALCULATOR_UNDO_MEMORY_DEPTH", "0", "UNDO_MEMORY_DEPTH must be at least 1"),
+    ("CALCULATOR_UNDO_DISK_DEPTH", "-1", "UNDO_DISK_DEPTH must be non-negative"),
+])
+def test_invalid_log_settings(monkeypatch, name, value, message):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ConfigError, match=message):
+        calculator_config.load_config()
+
+def test_load_log_settings(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_LOG_BUFFERED", "true")
+    monkeypatch.setenv("CALCULATOR_LOG_QUEUE_SIZE", "100")
+    config = calculator_config.load_config()
+    assert config.LOG_BUFFERED is True
+    assert config.LOG_QUEUE_SIZE == 100
+
+def test_read_simple_dotenv(tmp_path):
+    path = tmp_path / ".env"
+    path.write_text("# comment\n\nCALCULATOR_PRECISION=4\nexport CALCULATOR_LOG_BUFFERED=true\n")
+    assert calculator_config._read_simple_dotenv(path) == {
+        "CALCULATOR_PRECISION": "4", "CALCULATOR_LOG_BUFFERED": "true"}
+
+@pytest.mark.parametrize("line", ['NAME="quoted"', "NAME=a b", "NAME=${OTHER}", "NAME=x # note", "not a pair"])
+def test_read_simple_dotenv_defers_to_python_dotenv(tmp_path, line):
+    path = tmp_path / ".env"
+    path.write_text(line + "\n")
+    assert calculator_config._read_simple_dotenv(path) is None
+
+def test_load_env_file_keeps_existing_variables(tmp_path, monkeypatch):
+    path = tmp_path / ".env"
+    path.write_text("CALCULATOR_PRECISION=4\nCALCULATOR_MAX_HISTORY_SIZE=7\n")
+    monkeypatch.setattr(calculator_config, "_find_dotenv", lambda: str(path))
+    monkeypatch.setenv("CALCULATOR_PRECISION", "2")
+    monkeypatch.delenv("CALCULATOR_MAX_HISTORY_SIZE", raising=False)
+    calculator_config.load_env_file()
+    assert calculator_config.os.environ["CALCULATOR_PRECISION"] == "2"
+    assert calculator_config.os.environ["CALCULATOR_MAX_HISTORY_SIZE"] == "7"
+
+def test_load_env_file_uses_python_dotenv_for_quoted_values(tmp_path, monkeypatch):
+    pytest.importorskip("dotenv")
+    path = tmp_path / ".env"
+    path.write_text('CALCULATOR_TEST_NAME="two words"\n')
+    monkeypatch.setattr(calculator_config, "_find_dotenv", lambda: str(path))
+    monkeypatch.delenv("CALCULATOR_TEST_NAME", raising=False)
+    calculator_config.load_env_file()
+    assert calculator_config.os.environ["CALCULATOR_TEST_NAME"] == "two words"
@@ -0,0 +1,70 @@
+import time
+import pytest
+from app import cost_guard
+from app.cost_guard import execute_guarded, power_cost, powmod_cost, root_cost, run_in_worker
+from app.exceptions import OperationError
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+
+def _allocate(megabytes):
+    return len(bytearray(megabytes * 1024 * 1024))
+
+def _fail():
+    raise ValueError("bad operand")
+
+def test_power_cost_estimates():
+    assert power_cost(10, 3).digits == pytest.approx(3)
+    assert not power_cost(10, 3).floating
+    assert power_cost(10.0, 400.0).digits == pytest.approx(400)
+    assert power_cost(10.0, 400.0).floating
+    assert power_cost(7, 10 ** 6).work > cost_guard.INLINE_WORK_LIMIT
+    assert power_cost(1, 10 ** 100) == cost_guard.CHEAP
+    assert power_cost(2, -10 ** 400).digits == 1.0
+    assert power_cost(0.5, -2000.0).digits == pytest.approx(2000 * 0.30103, rel=1e-3)
+
+def test_root_and_powmod_cost_estimates():
+    assert root_cost(10.0, 0.001).digits == pytest.approx(1000)
+    assert root_cost(27.0, 3.0).digits == 1.0
+    assert root_cost(27.0, 0.0) == cost_guard.CHEAP
+    assert powmod_cost(3, 10 ** 6, 10 ** 9 + 7).work < cost_guard.INLINE_WORK_LIMIT
+
+def test_float_overflow_is_predicted():
+    with pytest.raises(OverflowError, match="power would be about 10\\^400"):
+        execute_guarded("power", power_cost(10.0, 400.0), pow, 10.0, 400.0)
+
+def test_oversized_integer_result_is_refused():
+    with pytest.raises(OperationError, match="Result too large"):
+        execute_guarded("power", power_cost(2, 10 ** 12), pow, 2, 10 ** 12)
+
+def test_cheap_calculation_runs_inline(monkeypatch):
+    monkeypatch.setattr(cost_guard, "run_in_worker", lambda *args: pytest.fail("ran in a worker"))
+    assert execute_guarded("power", power_cost(2, 10), pow, 2, 10) == 1024
+
+def test_expensive_calculation_runs_in_worker(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cost_guard, "INLINE_WORK_LIMIT", 1.0)
+    monkeypatch.setattr(cost_guard, "run_in_worker", lambda function, operands: calls.append(operands) or 8)
+    assert execute_guarded("power", power_cost(2, 300), pow, 2, 300) == 8
+    assert calls == [(2, 300)]
+
+def test_worker_returns_result():
+    assert run_in_worker(pow, (3, 200, 1000)) == pow(3, 200, 1000)
+    assert run_in_worker(pow, (7, 5000)) == 7 ** 5000
+
+def test_worker_reraises_errors():
+    with pytest.raises(ValueError, match="bad operand"):
+        run_in_worker(_fail, ())
+
+def test_worker_timeout_stops_calculation():
+    start = time.perf_counter()
+    with pytest.raises(OperationError, match="took longer than 0.2s"):
+        run_in_worker(_sleep, (30,), timeout=0.2)
+    assert time.perf_counter() - start < 5
+
+@pytest.mark.skipif(cost_guard.resource is None, reason="needs resource limits")
+def test_worker_memory_cap():
+    assert run_in_worker(_allocate, (16,), memory_mb=256) == 16 * 1024 * 1024
+    with pytest.raises(OperationError, match="more than 64 MB"):
+        run_in_worker(_allocate, (1024,), memory_mb=64)
@@ -0,0 +1,69 @@
+import pytest
+from app.expression import ExpressionCompiler, Parser, CompiledExpression, Number, BinaryOp
+from app.exceptions import OperationError, ValidationError
+
+
+@pytest.fixture
+def compiler():
+    return ExpressionCompiler(capacity=4)
+
+@pytest.mark.parametrize("source, expected", [
+    ("(3 + 4) ^ 2 % 5", ("modulus", 49.0, 5.0, 4.0)),
+    ("1 + 2 * 3", ("add", 1.0, 6.0, 7.0)),
+    ("2 ^ 3 ^ 2", ("power", 2.0, 9.0, 512.0)),
+    ("2 ** -1", ("power", 2.0, -1.0, 0.5)),
+    ("10 // 3", ("int_divide", 10.0, 3.0, 3.0)),
+    ("9 / 2 - 1", ("subtract", 4.5, 1.0, 3.5)),
+    ("root(27, 3) + 1", ("add", 3.0, 1.0, 4.0)),
+    ("ABS_DIFF(2, 9)", ("abs_diff", 2.0, 9.0, 7.0)),
+    ("percent(1, 4)", ("percent", 1.0, 4.0, 25.0)),
+    ("1.5e2 - .5", ("subtract", 150.0, 0.5, 149.5)),
+    ("+2 * -(1 + 1)", ("multiply", 2.0, -2.0, -4.0)),
+])
+def test_evaluate(compiler, source, expected):
+    assert compiler.evaluate(source) == expected
+
+def test_unary_minus_binds_looser_than_power(compiler):
+    assert compiler.evaluate("-2 ^ 2") == (None, None, None, -4.0)
+
+def test_plain_number(compiler):
+    assert compiler.evaluate(" 42 ") == (None, None, None, 42.0)
+
+def test_constant_folding_below_root():
+    compiled = CompiledExpression("(1 + 2) * (3 + 4)", Parser("(1 + 2) * (3 + 4)").parse())
+    assert isinstance(compiled.tree, BinaryOp)
+    assert isinstance(compiled.tree.left, Number) and compiled.tree.left.value == 3.0
+    assert isinstance(compiled.tree.right, Number) and compiled.tree.right.value == 7.0
+
+def test_compiled_expressions_are_cached(compiler):
+    first = compiler.compile("1 + 1")
+    assert compiler.compile("  1 + 1 ") is first
+    for source in ["2 + 2", "3 + 3", "4 + 4", "5 + 5"]:
+        compiler.compile(source)
+    assert len(compiler) == 4
+    assert compiler.compile("1 + 1") is not first  # evicted
+
+@pytest.mark.parametrize("source", ["", "1 +", "(1 + 2", "1 2", "1 $ 2", "root(27)", ")", "add 1 2"])
+def test_invalid_expressions(compiler, source):
+    with pytest.raises(ValidationError):
+        compiler.compile(source)
+
+def test_unknown_function(compiler):
+    with pytest.raises(OperationError):
+        compiler.compile("foo(1, 2)")
+
+def test_division_by_zero_while_folding(compiler):
+    with pytest.raises(ZeroDivisionError):
+        compiler.compile("(1 / 0) + 1")
+    assert len(compiler) == 0
+
+def test_operands_are_range_checked(compiler, monkeypatch):
+    monkeypatch.setattr("app.calculator_config.CalculatorConfig.MAX_INPUT_VALUE", 100.0)
+    with pytest.raises(ValidationError, match="between -100 and 100"):
+        compiler.compile("101 + 1")
+    with pytest.raises(ValidationError, match="between -100 and 100"):
+        compiler.compile("-(1e300) * 2")
+    with pytest.raises(ValidationError) as error:
+        compiler.evaluate("(50 * 50) + 1")  # an intermediate result
+    assert error.value.operation == "add"
+    assert compiler.evaluate("root(-8, 3) + 1")[3] == pytest.approx(complex(2, 3 ** 0.5))
@@ -8,8 +8,9 @@ from app.calculator_config import CalculatorConfig
 def history_manager():
     # Clean up before test
     hm = HistoryManager()
-    if os.path.exists(hm.history_file):
-        os.remove(hm.history_file)
+    for path in (hm.history_file, hm.journal_file):
+        if os.path.exists(path):
+            os.remove(path)
     return hm
 
 def test_add_entry(history_manager):
@@ -37,10 +38,10 @@ def test_load_no_file(history_manager):
     assert history_manager.history == []
 
 def test_save_raises(monkeypatch, history_manager):
-    # Monkeypatch pandas to raise error on to_csv
+    # Make the CSV writer raise
     def fail_to_csv(*args, **kwargs):
         raise Exception("Fake write error")
-    monkeypatch.setattr("pandas.DataFrame.to_csv", fail_to_csv)
+    monkeypatch.setattr("app.history_backends.write_entries", fail_to_csv)
     history_manager.add_entry("add", 1, 2, 3)
     with pytest.raises(HistoryError):
         history_manager.save_to_csv()
@@ -49,6 +50,184 @@ def test_load_raises(monkeypatch, history_manager):
     # Create a bad CSV to raise error on read
     with open(history_manager.history_file, "w") as f:
         f.write("bad,data\n1")
-    monkeypatch.setattr("pandas.read_csv", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("Fake read error")))
+    monkeypatch.setattr("app.history_backends.iter_entries", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("Fake read error")))
     with pytest.raises(HistoryError):
         history_manager.load_from_csv()
+
+def test_journal_appends_only_new_entries(history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.append_to_journal()  # first write is a full rewrite
+    assert os.path.exists(history_manager.history_file)
+    assert not os.path.exists(history_manager.journal_file)
+
+    history_manager.add_entry("multiply", 2, 4, 8)
+    history_manager.add_entry("subtract", 9, 4, 5)
+    history_manager.append_to_journal()
+    history_manager.append_to_journal()  # nothing new, nothing written
+    with open(history_manager.journal_file) as f:
+        assert f.read().splitlines() == ["multiply,2,4,8", "subtract,9,4,5"]
+
+def test_load_replays_journal(history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.append_to_journal()
+    history_manager.add_entry("division", 9, 2, 4.5)
+    history_manager.append_to_journal()
+
+    new_manager = HistoryManager()
+    new_manager.load_from_csv()
+    assert [entry["operation"] for entry in new_manager.history] == ["add", "division"]
+    assert new_manager.history[1]["result"] == 4.5
+
+    # Loaded state matches disk, so the next write is an append
+    new_manager.add_entry("add", 2, 2, 4)
+    new_manager.append_to_journal()
+    with open(new_manager.journal_file) as f:
+        assert len(f.read().splitlines()) == 2
+
+def test_save_compacts_journal(history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.append_to_journal()
+    history_manager.add_entry("add", 2, 2, 4)
+    history_manager.append_to_journal()
+    history_manager.save_to_csv()
+    assert not os.path.exists(history_manager.journal_file)
+
+    new_manager = HistoryManager()
+    new_manager.load_from_csv()
+    assert len(new_manager.history) == 2
+
+def test_replaced_history_is_rewritten(history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.add_entry("add", 2, 2, 4)
+    history_manager.append_to_journal()
+    history_manager.history = [{"operation": "add", "a": 1, "b": 2, "result": 3}]  # e.g. undo
+    history_manager.append_to_journal()
+    assert not os.path.exists(history_manager.journal_file)
+
+    new_manager = HistoryManager()
+    new_manager.load_from_csv()
+    assert len(new_manager.history) == 1
+
+def test_append_to_journal_raises(monkeypatch, history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.append_to_journal()
+    history_manager.add_entry("add", 2, 2, 4)
+    def fake_open(*args, **kwargs):
+        raise IOError("disk full")
+    monkeypatch.setattr("builtins.open", fake_open)
+    with pytest.raises(HistoryError):
+        history_manager.append_to_journal()
+
+def test_history_bounded_by_max_history_size(monkeypatch, history_manager):
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 3)
+    hm = HistoryManager()
+    for i in range(5):
+        hm.add_entry("add", i, 1, i + 1)
+    assert [entry["a"] for entry in hm.get_all()] == [2, 3, 4]
+
+    hm.history = [{"operation": "add", "a": i, "b": 0, "result": i} for i in range(10)]
+    assert len(hm.history) == 3
+
+def test_journal_rewrites_when_unwritten_entries_evicted(monkeypatch, history_manager):
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 2)
+    hm = HistoryManager()
+    hm.add_entry("add", 1, 1, 2)
+    hm.append_to_journal()
+    for i in range(3):
+        hm.add_entry("add", i, i, 2 * i)
+    hm.append_to_journal()
+    assert not os.path.exists(hm.journal_file)
+    # The rewrite keeps the entry saved before; only the one evicted unsaved (a=0) is lost
+    assert [entry["a"] for entry in hm.get_saved_range(0, 10)] == [1, 1, 2]
+
+    new_manager = HistoryManager()
+    new_manager.load_from_csv()
+    assert [entry["a"] for entry in new_manager.history] == [1, 2]
+    assert new_manager.offset == 1
+
+def test_full_rewrites_keep_entries_older_than_memory(monkeypatch, history_manager):
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 5)
+    hm = HistoryManager()
+    for i in range(12):
+        hm.add_entry("add", i, 1, i + 1)
+        hm.append_to_journal()
+    assert hm.offset == 7
+    # Undo restores the state before the last entry: five entries after six older ones
+    hm.restore([{"operation": "add", "a": i, "b": 1, "result": i + 1} for i in range(6, 11)], offset=6)
+    hm.add_entry("add", 100, 1, 101)
+    hm.append_to_journal()
+    assert [entry["a"] for entry in hm.get_saved_range(0, 20)] == list(range(11)) + [100]
+
+    new_manager = HistoryManager()
+    new_manager.load_from_csv()
+    assert new_manager.offset == 7
+    new_manager.save_to_csv()
+    assert new_manager.saved_count() == 12
+
+def test_find_uses_indexes(history_manager):
+    for i in range(10):
+        history_manager.add_entry("add" if i % 2 else "multiply", i, 2, i + 2 if i % 2 else i * 2)
+    assert [pos for pos, _ in history_manager.find(operation="ADD")] == [2, 4, 6, 8, 10]
+    # The index now exists and add_entry keeps it current
+    history_manager.add_entry("add", 100, 1, 101)
+    matches = history_manager.find(operation="add", result=(100, None))
+    assert matches == [(11, {"operation": "add", "a": 100, "b": 1, "result": 101})]
+    assert [pos for pos, _ in history_manager.find(a=(3, 6), positions=(5, 6))] == [5, 6]
+    assert len(history_manager.find(limit=3)) == 3
+
+def test_find_after_history_replaced_and_load(history_manager):
+    history_manager.add_entry("add", 1, 2, 3)
+    history_manager.add_entry("power", 2, 3, 8)
+    assert len(history_manager.find(operation="power")) == 1
+    # Undo/redo assign a whole new history
+    history_manager.history = [{"operation": "add", "a": 1, "b": 2, "result": 3}]
+    assert history_manager.find(operation="power") == []
+    history_manager.save_to_csv()
+    history_manager.add_entry("power", 3, 2, 9)
+    history_manager.load_from_csv()
+    assert history_manager.find(operation="power") == []
+    assert [pos for pos, _ in history_manager.find(result=(3, 3))] == [1]
+
+def test_analyze(history_manager):
+    assert history_manager.analyze() == []
+    for a, b in ((1, 2), (3, 4), (10, 5)):
+        history_manager.add_entry("add", a, b, a + b)
+    history_manager.add_entry("root", -4.0, 2.0, complex(0, 2))
+    history_manager.record_error("division")
+    rows = {row["operation"]: row for row in history_manager.analyze()}
+    assert rows["add"] == {"operation": "add", "count": 3, "sum": 25.0, "mean": pytest.approx(25 / 3),
+                           "min": 3.0, "max": 15.0, "variance": pytest.approx(37.0 + 1 / 3),
+                           "errors": 0, "error_rate": 0.0}
+    assert (rows["root"]["count"], rows["root"]["mean"], rows["root"]["min"]) == (1, None, None)
+    assert (rows["division"]["count"], rows["division"]["error_rate"]) == (0, 1.0)
+    assert (rows["all"]["count"], rows["all"]["sum"], rows["all"]["errors"]) == (4, 25.0, 1)
+    assert rows["all"]["error_rate"] == pytest.approx(1 / 5)
+    assert [row["operation"] for row in history_manager.analyze("ADD")] == ["add"]
+    assert history_manager.analyze("subtract") == []
+
+def test_analyze_follows_additions_evictions_and_replacement(monkeypatch, history_manager):
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 3)
+    hm = HistoryManager()
+    hm.add_entry("add", 0, 1, 1)
+    assert hm.analyze("add")[0]["count"] == 1
+    # The aggregates now exist and add_entry keeps them current, evictions included
+    for i in range(1, 5):
+        hm.add_entry("add", i, 1, i + 1)
+    row = hm.analyze("add")[0]
+    assert (row["count"], row["sum"], row["min"], row["max"]) == (3, 12.0, 3.0, 5.0)
+    # Undo/redo assign a whole new history
+    hm.history = [{"operation": "multiply", "a": 2, "b": 3, "result": 6}]
+    assert hm.analyze("add") == []
+    assert hm.analyze("multiply")[0]["sum"] == 6.0
+    hm.save_to_csv()
+    hm.add_entry("multiply", 2, 2, 4)
+    hm.load_from_csv()
+    assert hm.analyze("multiply")[0]["count"] == 1
+
+def test_imported_entries_are_not_session_attempts(tmp_path, history_manager):
+    source = tmp_path / "other.csv"
+    source.write_text("operation,a,b,result\nadd,1,2,3\nadd,2,2,4\n")
+    history_manager.record_error("add")
+    history_manager.import_history(str(source))
+    row = history_manager.analyze("add")[0]
+    assert (row["count"], row["sum"], row["error_rate"]) == (2, 7.0, 1.0)
@@ -0,0 +1,163 @@
+import os
+import pytest
+from app.history_backends import (
+    BinaryHistoryBackend, CSVHistoryBackend, HistoryBackend, SQLiteHistoryBackend, create_backend
+)
+from app.history import HistoryManager
+from app.calculator_config import CalculatorConfig
+from app.exceptions import HistoryError
+
+ENTRIES = [
+    {"operation": "add", "a": 1, "b": 2, "result": 3},
+    {"operation": "division", "a": 7.0, "b": 2.0, "result": 3.5},
+    {"operation": "int_divide", "a": -7.5, "b": 2.0, "result": -4.0},
+]
+
+@pytest.fixture(params=["csv", "sqlite", "binary"])
+def backend(request, tmp_path):
+    return create_backend(request.param, str(tmp_path))
+
+def test_save_and_read(backend):
+    assert not backend.exists()
+    backend.save(ENTRIES)
+    assert backend.exists()
+    assert backend.count() == 3
+    assert backend.read_all() == ENTRIES
+    assert backend.read_range(1, 3) == ENTRIES[1:]
+    assert backend.read_tail(2) == ENTRIES[1:]
+    assert backend.read_tail(10) == ENTRIES
+
+def test_append_after_save(backend):
+    backend.save(ENTRIES[:1])
+    backend.append(ENTRIES[1:])
+    assert backend.read_all() == ENTRIES
+    backend.save(ENTRIES[2:])
+    assert backend.read_all() == ENTRIES[2:]
+
+def test_save_keeps_leading_entries(backend):
+    backend.save(ENTRIES)
+    backend.append(ENTRIES[:1])
+    backend.save(ENTRIES[1:2], keep=1)
+    assert backend.read_all() == ENTRIES[:2]
+    backend.save(ENTRIES[2:], keep=10)
+    assert backend.read_all() == ENTRIES
+
+def test_append_creates_file(backend):
+    backend.append(ENTRIES)
+    assert backend.read_all() == ENTRIES
+
+def test_complex_values_round_trip(backend):
+    entries = [
+        {"operation": "root", "a": -8.0, "b": 3.0, "result": complex(1.0000000000000002, 1.7320508075688772)},
+        {"operation": "add", "a": complex(1, 2), "b": 1, "result": complex(2, 2)},
+        {"operation": "multiply", "a": 2, "b": complex(0, -0.5), "result": complex(-0.0, -1.0)},
+    ]
+    backend.save(entries[:1])
+    backend.append(entries[1:])
+    restored = backend.read_all()
+    assert restored == entries
+    assert [type(entry["a"]) for entry in restored] == [float, complex, int]
+
+def test_history_backend_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        HistoryBackend(str(tmp_path))
+
+def test_read_range_outside_file(backend):
+    backend.save(ENTRIES)
+    assert backend.read_range(5, 10) == []
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(HistoryError):
+        create_backend("xml", str(tmp_path))
+
+def test_binary_keeps_int_and_float_types(tmp_path):
+    backend = BinaryHistoryBackend(str(tmp_path))
+    backend.save(ENTRIES)
+    first, second, _ = backend.read_all()
+    assert type(first["a"]) is int
+    assert type(second["a"]) is float
+
+@pytest.mark.parametrize("name", ["sqlite", "binary"])
+def test_unstorable_values_are_rejected(name, tmp_path):
+    backend = create_backend(name, str(tmp_path))
+    with pytest.raises(HistoryError, match="Cannot store str value"):
+        backend.save([{"operation": "add", "a": "one", "b": 1, "result": 2}])
+
+def test_binary_rejects_other_format_versions(tmp_path):
+    backend = BinaryHistoryBackend(str(tmp_path))
+    with open(backend.path, "wb") as f:
+        f.write(b"CALCHIST" + (1).to_bytes(4, "little") + (48).to_bytes(4, "little") + bytes(48 * 3))
+    with pytest.raises(HistoryError, match="Unsupported binary history format version 1"):
+        backend.read_range(0, 1)
+
+def test_binary_rejects_long_operation_name(tmp_path):
+    backend = BinaryHistoryBackend(str(tmp_path))
+    with pytest.raises(HistoryError):
+        backend.save([{"operation": "x" * 30, "a": 1, "b": 1, "result": 1}])
+
+def test_binary_rejects_foreign_file(tmp_path):
+    backend = BinaryHistoryBackend(str(tmp_path))
+    with open(backend.path, "wb") as f:
+        f.write(b"NOTAHIST" + bytes(100))
+    with pytest.raises(HistoryError):
+        backend.read_range(0, 1)
+
+def test_binary_ignores_torn_record(tmp_path):
+    backend = BinaryHistoryBackend(str(tmp_path))
+    backend.save(ENTRIES)
+    with open(backend.path, "ab") as f:
+        f.write(b"\x00" * 10)
+    assert backend.count() == 3
+
+def test_sqlite_stores_complex_as_text(tmp_path):
+    backend = SQLiteHistoryBackend(str(tmp_path))
+    backend.append([{"operation": "root", "a": -8.0, "b": 3.0, "result": complex(1, 2)}])
+    import sqlite3
+    with sqlite3.connect(backend.path) as conn:
+        assert conn.execute("SELECT result FROM history").fetchone() == ("(1+2j)",)
+    assert backend.read_all()[0]["result"] == complex(1, 2)
+
+def test_csv_backend_journal(tmp_path):
+    backend = CSVHistoryBackend(str(tmp_path))
+    backend.append(ENTRIES[:1])
+    assert os.path.exists(backend.journal_file)
+    assert not os.path.exists(backend.path)
+    assert backend.exists()
+    backend.save(ENTRIES)
+    assert not os.path.exists(backend.journal_file)
+
+@pytest.mark.parametrize("name", ["sqlite", "binary"])
+def test_history_manager_uses_configured_backend(name, tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_BACKEND", name)
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 3)
+    hm = HistoryManager()
+    for i in range(5):
+        hm.add_entry("add", i, i, 2 * i)
+        hm.append_to_journal()
+    assert hm.saved_count() == 5
+    assert [entry["a"] for entry in hm.get_saved_range(1, 3)] == [1, 2]
+
+    loaded = HistoryManager()
+    loaded.load_from_csv()
+    assert [entry["a"] for entry in loaded.history] == [2, 3, 4]
+
+def test_history_manager_saved_range_without_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    hm = HistoryManager()
+    assert hm.saved_count() == 0
+    assert hm.get_saved_range(0, 10) == []
+
+def test_history_manager_read_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_BACKEND", "binary")
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    hm = HistoryManager()
+    with open(hm.history_file, "wb") as f:
+        f.write(b"NOTAHIST" + bytes(100))
+    with pytest.raises(HistoryError):
+        hm.get_saved_range(0, 1)
+    def fail_count():
+        raise OSError("gone")
+    monkeypatch.setattr(hm.backend, "count", fail_count)
+    with pytest.raises(HistoryError):
+        hm.saved_count()
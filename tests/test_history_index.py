@@ -0,0 +1,101 @@
+import random
+from app.history_index import HistoryIndex, SortedKeys
+from app.history_store import HistoryStore
+
+
+def brute_force(store, operation=None, a=None, b=None, result=None, positions=None):
+    def within(value, bounds):
+        if bounds is None:
+            return True
+        if isinstance(value, complex):
+            return False
+        low, high = bounds
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    start, stop = positions or (None, None)
+    matches = []
+    for offset, entry in enumerate(store):
+        if start is not None and offset < start or stop is not None and offset >= stop:
+            continue
+        if operation is not None and entry["operation"] != operation:
+            continue
+        if within(entry["a"], a) and within(entry["b"], b) and within(entry["result"], result):
+            matches.append(store.first_seq + offset)
+    return matches
+
+def test_sorted_keys_range_and_merge():
+    keys = SortedKeys([5.0, 1.0], [0, 1])
+    assert keys.keys.tolist() == [1.0, 5.0]
+    keys.add(3.0, 2)
+    keys.add(3.0, 3)
+    # Pending keys are found before they are merged
+    assert sorted(keys.range(3.0, 3.0).tolist()) == [2, 3]
+    assert keys.range(None, 2.0).tolist() == [1]
+    assert keys.range(4.0, None).tolist() == [0]
+    for i in range(2000):
+        keys.add(float(i % 7), 10 + i)
+    assert len(keys) == 2004
+    assert keys.range(6.0, 6.0).size == sum(1 for i in range(2000) if i % 7 == 6)
+    keys.drop_before(10)
+    assert len(keys) == 2000
+    assert keys.keys.tolist() == sorted(keys.keys.tolist())
+
+def test_query_filters():
+    store = HistoryStore(100)
+    store.append("add", 1, 2, 3)
+    store.append("power", 2, 10, 1024)
+    store.append("root", -8.0, 2.0, complex(0, 2.83))
+    store.append("add", 5, 5, 10)
+    index = HistoryIndex(store)
+    assert index.query(operation="add") == [0, 3]
+    assert index.query(result=(3, 10)) == [0, 3]
+    assert index.query(operation="add", a=(2, None)) == [3]
+    assert index.query(a=(None, 0)) == [2]
+    assert index.query(result=(None, None)) == [0, 1, 3]  # complex results aren't orderable
+    assert index.query(positions=(1, 3)) == [1, 2]
+    assert index.query(operation="missing") == []
+
+def test_incremental_add_and_eviction():
+    store = HistoryStore(10)
+    index = HistoryIndex(store)
+    for i in range(35):
+        seq = store.next_seq
+        store.append("add" if i % 2 else "subtract", i, 1, i + 1)
+        index.add(seq, "add" if i % 2 else "subtract", i, 1, i + 1)
+    assert index.query(operation="add") == [25, 27, 29, 31, 33]
+    assert index.query(a=(0, 26)) == [25, 26]
+    # Stale entries are compacted once they outnumber the live ones
+    assert len(index.sorted["a"]) <= 2 * len(store) + 10
+
+def test_sync_catches_up_with_direct_appends():
+    store = HistoryStore(50)
+    index = HistoryIndex(store)
+    for i in range(200):
+        store.append("multiply", i, 2, i * 2)
+    assert index.query(result=(390, None)) == [195, 196, 197, 198, 199]
+    assert index.next_seq == store.next_seq
+
+def test_queries_match_brute_force():
+    rng = random.Random(7)
+    store = HistoryStore(300)
+    index = HistoryIndex(store)
+    operations = ["add", "subtract", "power", "root"]
+    for round_number in range(5):
+        for _ in range(250):
+            a, b = rng.randint(-50, 50), rng.uniform(-10, 10)
+            seq = store.next_seq
+            operation = rng.choice(operations)
+            result = complex(a, b) if rng.random() < 0.05 else a * b
+            store.append(operation, a, b, result)
+            index.add(seq, operation, a, b, result)
+        for _ in range(30):
+            filters = {}
+            if rng.random() < 0.5:
+                filters["operation"] = rng.choice(operations)
+            for field in ("a", "b", "result"):
+                if rng.random() < 0.4:
+                    low, high = sorted(rng.uniform(-60, 60) for _ in range(2))
+                    filters[field] = (rng.choice([low, None]), rng.choice([high, None]))
+            if rng.random() < 0.3:
+                filters["positions"] = (rng.randint(0, 150), rng.randint(150, 300))
+            assert index.query(**filters) == brute_force(store, **filters)
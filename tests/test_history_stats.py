@@ -0,0 +1,115 @@
+import math
+import random
+import statistics
+import pytest
+from app.history_stats import HistoryStats, RunningStats
+from app.history_store import HistoryStore
+
+
+def expected(store):
+    """Per-operation (count, mean, variance, min, max) computed directly from the entries."""
+    groups = {}
+    for entry in store:
+        groups.setdefault(entry["operation"], []).append(entry["result"])
+    summary = {}
+    for operation, results in groups.items():
+        values = [float(value) for value in results if not isinstance(value, complex) and math.isfinite(value)]
+        summary[operation] = (
+            len(results),
+            statistics.fmean(values) if values else 0.0,
+            statistics.variance(values) if len(values) > 1 else 0.0,
+            min(values, default=math.inf),
+            max(values, default=-math.inf),
+        )
+    return summary
+
+def actual(stats):
+    return {
+        operation: (running.count, running.mean, running.variance, running.min, running.max)
+        for operation, running in stats.summary().items()
+    }
+
+def assert_matches(stats, store):
+    want, got = expected(store), actual(stats)
+    assert set(got) == set(want)
+    for operation in want:
+        assert got[operation] == pytest.approx(want[operation], rel=1e-9, abs=1e-9)
+
+def test_running_stats_add_and_remove():
+    running = RunningStats()
+    values = [4.0, -2.5, 10.0, 7.25, 0.0]
+    for value in values:
+        running.add(value)
+    assert running.n == 5
+    assert running.mean == pytest.approx(statistics.fmean(values))
+    assert running.variance == pytest.approx(statistics.variance(values))
+    assert (running.min, running.max) == (-2.5, 10.0)
+    running.remove(7.25)
+    assert running.mean == pytest.approx(statistics.fmean([4.0, -2.5, 10.0, 0.0]))
+    assert running.variance == pytest.approx(statistics.variance([4.0, -2.5, 10.0, 0.0]))
+    assert not running.stale
+    running.remove(10.0)
+    assert running.stale
+
+def test_running_stats_non_numeric_values_are_only_counted():
+    running = RunningStats()
+    running.add(None)
+    running.add(3.0)
+    assert (running.count, running.n, running.sum) == (2, 1, 3.0)
+    running.remove(None)
+    running.remove(3.0)
+    assert (running.count, running.n, running.mean) == (0, 0, 0.0)
+
+def test_running_stats_merge():
+    left, right, both = RunningStats(), RunningStats(), RunningStats()
+    for value in (1.0, 2.0, 9.0):
+        left.add(value)
+        both.add(value)
+    for value in (-4.0, 3.5):
+        right.add(value)
+        both.add(value)
+    left.merge(right)
+    assert (left.count, left.n, left.min, left.max) == (both.count, both.n, both.min, both.max)
+    assert left.mean == pytest.approx(both.mean)
+    assert left.variance == pytest.approx(both.variance)
+
+def test_build_matches_entries():
+    rng = random.Random(3)
+    store = HistoryStore(500)
+    for i in range(800):
+        store.append(rng.choice(["add", "power", "root"]), i, 2, rng.uniform(-1e3, 1e3))
+    store.append("root", -4.0, 2.0, complex(0, 2))  # kept verbatim in the side table
+    store.append("powmod", 3, 200, 3 ** 200)  # too large for the float column
+    assert_matches(HistoryStats(store), store)
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(7)
+    store = HistoryStore(50)
+    stats = HistoryStats(store)
+    for i in range(400):
+        operation = rng.choice(["add", "division", "multiply"])
+        result = rng.choice([rng.uniform(-100, 100), i, complex(1, 1)])
+        if len(store) == store.capacity:
+            evicted = store[0]
+            stats.remove(evicted["operation"], evicted["result"])
+        store.append(operation, 1, 2, result)
+        stats.add(operation, result)
+        if i % 37 == 0:
+            assert_matches(stats, store)
+    assert_matches(stats, store)
+
+def test_stale_extremes_trigger_rebuild():
+    store = HistoryStore(3)
+    stats = HistoryStats(store)
+    for value in (1.0, 2.0, 3.0, 4.0):
+        if len(store) == store.capacity:
+            evicted = store[0]
+            stats.remove(evicted["operation"], evicted["result"])
+        store.append("add", 0, 0, value)
+        stats.add("add", value)
+    running = stats.summary()["add"]
+    assert (running.min, running.max, running.count) == (2.0, 4.0, 3)
+    assert not running.stale
+
+def test_empty_store():
+    assert HistoryStats(HistoryStore(10)).summary() == {}
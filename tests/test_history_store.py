@@ -0,0 +1,80 @@
+import pytest
+from app.history_store import HistoryStore
+
+
+def test_append_and_index():
+    store = HistoryStore(10)
+    store.append("add", 1, 2, 3)
+    store.append("division", 7.0, 2.0, 3.5)
+    assert len(store) == 2
+    assert store[0] == {"operation": "add", "a": 1, "b": 2, "result": 3}
+    assert store[-1] == {"operation": "division", "a": 7.0, "b": 2.0, "result": 3.5}
+    assert type(store[0]["a"]) is int
+    assert type(store[1]["a"]) is float
+
+def test_ring_buffer_evicts_oldest():
+    store = HistoryStore(3)
+    evicted = [store.append("add", i, i, 2 * i) for i in range(5)]
+    assert evicted == [0, 0, 0, 1, 1]
+    assert len(store) == 3
+    assert [entry["a"] for entry in store] == [2, 3, 4]
+    assert store.first_seq == 2
+    assert store.next_seq == 5
+    assert [entry["a"] for entry in store.since(3)] == [3, 4]
+    assert [entry["a"] for entry in store.since(0)] == [2, 3, 4]
+
+def test_slice_and_equality():
+    store = HistoryStore(5, [{"operation": "add", "a": 1, "b": 1, "result": 2}])
+    assert store == [{"operation": "add", "a": 1, "b": 1, "result": 2}]
+    assert store != []
+    assert store[0:1] == [{"operation": "add", "a": 1, "b": 1, "result": 2}]
+    assert HistoryStore(5) == []
+
+def test_construct_keeps_newest_entries():
+    entries = [{"operation": "add", "a": i, "b": 0, "result": i} for i in range(10)]
+    store = HistoryStore(4, entries)
+    assert [entry["a"] for entry in store] == [6, 7, 8, 9]
+
+def test_unrepresentable_values_kept_verbatim():
+    store = HistoryStore(2)
+    store.append("root", -8.0, 3.0, complex(1, 1.7))
+    store.append("power", 10, 40, 10 ** 40)
+    assert store[0]["result"] == complex(1, 1.7)
+    assert store[1]["result"] == 10 ** 40
+    store.append("add", 1, 1, 2)
+    assert store[0]["result"] == 10 ** 40
+    assert len(store._extras) == 1
+
+def test_copy_is_independent():
+    store = HistoryStore(5, [{"operation": "add", "a": 1, "b": 1, "result": 2}])
+    copied = store.copy()
+    copied.append("add", 2, 2, 4)
+    assert len(store) == 1
+    assert len(copied) == 2
+
+def test_index_out_of_range():
+    with pytest.raises(IndexError):
+        HistoryStore(2)[0]
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        HistoryStore(0)
+
+def test_many_operation_names_fall_back_to_side_table():
+    store = HistoryStore(300)
+    for i in range(300):
+        store.append(f"op{i}", 1, 1, 1)
+    assert store[299]["operation"] == "op299"
+    assert len(store._op_names) == 256
+
+def test_columns_in_history_order():
+    store = HistoryStore(3)
+    for i in range(5):
+        store.append("add" if i % 2 else "root", i, 1, i + 1)
+    store.append("root", -8.0, 2.0, complex(0, 2.8))
+    codes, names, (a, b, result), extras = store.columns()
+    assert [names[code] for code in codes[:2]] == ["add", "root"]
+    assert a.tolist()[:2] == [3.0, 4.0]
+    assert result.tolist()[:2] == [4.0, 5.0]
+    assert extras == {5: {"operation": "root", "a": -8.0, "b": 2.0, "result": complex(0, 2.8)}}
+    store.append("add", 1, 1, 2)  # the column copies don't pin the store's buffers
@@ -0,0 +1,128 @@
+import os
+import tracemalloc
+import pytest
+from app.calculator_config import CalculatorConfig
+from app.exceptions import HistoryError
+from app.history import HistoryManager
+from app.history_stream import (
+    ImportReport, MAX_REPORTED_ERRORS, iter_entries, parse_row, read_chunks, write_entries
+)
+
+
+def test_parse_row_types():
+    assert parse_row(["add", "1", "2", "3"]) == {"operation": "add", "a": 1, "b": 2, "result": 3}
+    entry = parse_row(["root", "-8.0", "2", "(1.2+1.7j)"])
+    assert type(entry["a"]) is float and type(entry["b"]) is int
+    assert entry["result"] == complex(1.2, 1.7)
+
+@pytest.mark.parametrize("row, message", [
+    (["add", "1", "2"], "expected 4 fields, got 3"),
+    (["", "1", "2", "3"], "missing operation"),
+    (["add", "x", "2", "3"], "operands must be numbers"),
+    (["add", "1", "2", "oops"], "result must be a number"),
+])
+def test_parse_row_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        parse_row(row)
+
+def test_read_chunks_with_and_without_header(tmp_path):
+    with_header = tmp_path / "with.csv"
+    with_header.write_text("operation,a,b,result\nadd,1,2,3\nadd,2,2,4\nadd,3,2,5\n")
+    chunks = list(read_chunks(str(with_header), 2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0][0] == (2, ["add", "1", "2", "3"])
+    without_header = tmp_path / "without.csv"
+    without_header.write_text("add,1,2,3\n")
+    assert list(read_chunks(str(without_header), 2)) == [[(1, ["add", "1", "2", "3"])]]
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    assert list(read_chunks(str(empty), 2)) == []
+
+def test_bad_rows_reported_with_line_numbers(tmp_path):
+    path = tmp_path / "mixed.csv"
+    path.write_text('operation,a,b,result\nadd,1,2,3\n\nadd,x,2,3\n"mult\niply",2,3,6\nadd,1\nsubtract,5,1,4\n')
+    report = ImportReport(str(path))
+    entries = list(iter_entries(str(path), chunk_size=2, report=report))
+    assert [entry["operation"] for entry in entries] == ["add", "mult\niply", "subtract"]
+    assert report.skipped == 2
+    assert report.errors[0][0] == 4
+    assert report.errors[1] == (7, "expected 4 fields, got 2")  # the quoted field spans lines 5-6
+
+def test_report_keeps_bounded_errors():
+    report = ImportReport()
+    for line in range(MAX_REPORTED_ERRORS + 50):
+        report.add_error(line, "bad")
+    assert report.skipped == MAX_REPORTED_ERRORS + 50
+    assert len(report.errors) == MAX_REPORTED_ERRORS
+
+def test_write_entries_round_trip(tmp_path):
+    path = str(tmp_path / "out.csv")
+    entries = [{"operation": "add", "a": i, "b": 0.5, "result": i + 0.5} for i in range(25)]
+    assert write_entries(path, iter(entries), chunk_size=7) == 25
+    assert list(iter_entries(path, chunk_size=4)) == entries
+    assert not os.path.exists(path + ".tmp")
+    write_entries(path, entries[:2], chunk_size=7, header=False, append=True)
+    assert len(list(iter_entries(path))) == 27
+
+
+@pytest.fixture
+def isolated_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path / "history"))
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_BACKEND", "csv")
+    monkeypatch.setattr(CalculatorConfig, "MAX_HISTORY_SIZE", 100)
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_CHUNK_SIZE", 100)
+    return HistoryManager()
+
+def write_large_file(path, rows):
+    # Written without tracing; ~26 bytes per row
+    with open(path, "w") as f:
+        f.write("operation,a,b,result\n")
+        for i in range(rows):
+            f.write(f"multiply,{i},1.5,{i * 1.5}\n")
+            if i % 8000 == 0:
+                f.write("multiply,oops,1,1\n")
+
+def test_import_and_load_memory_bounded_by_chunk_size(isolated_history, tmp_path):
+    source = str(tmp_path / "large.csv")
+    rows = 20_000
+    write_large_file(source, rows)
+    # Parsed into entry dicts the file would take ~20x its size; the budget is below even the raw file
+    budget = 350_000
+    assert os.path.getsize(source) > budget
+
+    tracemalloc.start()
+    try:
+        report = isolated_history.import_history(source)
+        _, import_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        load_report = HistoryManager().load_from_csv()
+        _, load_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert report.imported == rows
+    assert report.skipped == 3
+    assert report.errors[0][0] == 3
+    assert import_peak < budget
+    assert load_report.imported == 100
+    assert load_peak < budget
+    assert isolated_history.history[-1]["a"] == rows - 1
+
+def test_import_merge_and_export(isolated_history, tmp_path):
+    isolated_history.add_entry("add", 1, 2, 3)
+    isolated_history.add_entry("power", 2, 3, 8)
+    exported = str(tmp_path / "export.csv")
+    assert isolated_history.export_history(exported) == 2
+    with open(exported, "a") as f:
+        f.write("subtract,9,4,5\n")
+    report = isolated_history.import_history(exported, merge=True)
+    assert (report.imported, report.duplicates) == (1, 2)
+    assert [entry["operation"] for entry in isolated_history.history] == ["add", "power", "subtract"]
+    report = isolated_history.import_history(exported)
+    assert report.imported == 3
+    # Everything imported was persisted as it streamed in
+    assert HistoryManager().backend.count() == 6
+
+def test_import_missing_file(isolated_history, tmp_path):
+    with pytest.raises(HistoryError, match="not found"):
+        isolated_history.import_history(str(tmp_path / "missing.csv"))
@@ -1,5 +1,8 @@
 import pytest
-from app.input_validators import validate_operands
+import numpy as np
+from app.input_validators import (
+    parse_column, validate_operands, validate_range, validate_batch, validate_rows, VALID, OUT_OF_RANGE, NON_FINITE, NON_NUMERIC, WRONG_ARITY
+)
 from app.exceptions import ValidationError
 
 def test_validate_operands_success():
@@ -12,3 +15,57 @@ def test_validate_operands_non_numeric():
 def test_validate_operands_incorrect_count():
     with pytest.raises(ValidationError):
         validate_operands(["3"])
+
+def test_validate_operands_out_of_range(monkeypatch):
+    monkeypatch.setattr("app.calculator_config.CalculatorConfig.MAX_INPUT_VALUE", 100.0)
+    assert validate_operands(["-100", "100"]) == (-100.0, 100.0)
+    with pytest.raises(ValidationError, match="between -100 and 100"):
+        validate_operands(["101", "5"])
+    with pytest.raises(ValidationError):
+        validate_operands(["nan", "5"])
+
+def test_validate_rows_flags_each_error(monkeypatch):
+    monkeypatch.setattr("app.calculator_config.CalculatorConfig.MAX_INPUT_VALUE", 100.0)
+    rows = [["1", "2.5"], ["x", "2"], ["101", "1"], ["inf", "1"], ["1"], ["1", "2", "3"], [], ["-3", "1e2"]]
+    (a, b), errors = validate_rows(rows)
+    assert errors.tolist() == [
+        VALID, NON_NUMERIC, OUT_OF_RANGE, NON_FINITE, WRONG_ARITY, WRONG_ARITY, WRONG_ARITY, VALID
+    ]
+    assert a.dtype == np.float64
+    assert a[[0, 7]].tolist() == [1.0, -3.0]
+    assert b[[0, 7]].tolist() == [2.5, 100.0]
+    assert np.isnan(a[1:7]).all() and np.isnan(b[1:7]).all()
+
+def test_validate_rows_highest_code_wins():
+    (a,), errors = validate_rows([["nan"], ["1e999"], ["abc"]], arity=1)
+    assert errors.tolist() == [NON_FINITE, NON_FINITE, NON_NUMERIC]
+    _, errors = validate_rows([["abc", "nan"], ["nan", "1e9"]])
+    assert errors.tolist() == [NON_NUMERIC, NON_FINITE]
+
+def test_validate_batch_columns():
+    # Bad values in several parse blocks, and a missing operand
+    a_column = [str(i) for i in range(10000)]
+    b_column = ["1"] * 10000
+    a_column[10], a_column[9000] = "ten", ""
+    b_column[5000] = None
+    (a, b), errors = validate_batch([a_column, b_column])
+    assert np.flatnonzero(errors).tolist() == [10, 5000, 9000]
+    assert errors[[10, 5000, 9000]].tolist() == [NON_NUMERIC, WRONG_ARITY, NON_NUMERIC]
+    assert a[11] == 11.0 and b[11] == 1.0
+
+def test_validate_batch_rejects_ragged_columns():
+    with pytest.raises(ValidationError):
+        validate_batch([["1", "2"], ["1"]])
+    (a, b), errors = validate_batch([[], []])
+    assert len(a) == len(errors) == 0
+
+def test_parse_column_skips_range_checks():
+    values, errors = parse_column(["1e300", "(1+2j)", "-inf", None])
+    assert values[0] == 1e300 and values[2] == -np.inf
+    assert errors.tolist() == [VALID, NON_NUMERIC, VALID, WRONG_ARITY]
+
+def test_validate_range_checks_both_parts_of_complex_values(monkeypatch):
+    monkeypatch.setattr("app.calculator_config.CalculatorConfig.MAX_INPUT_VALUE", 100.0)
+    assert validate_range((complex(1, 2), 3.0)) == (complex(1, 2), 3.0)
+    with pytest.raises(ValidationError):
+        validate_range((complex(1, 200),))
@@ -1,7 +1,10 @@
+import os
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 from app.logger import LoggingObserver, AutoSaveObserver
 from app.exceptions import LoggingError
+from app.calculator_config import CalculatorConfig
 
 def test_logging_observer_update():
     logger = LoggingObserver()
@@ -23,7 +26,7 @@ def test_auto_save_observer_update():
     class DummyHistoryManager:
         def __init__(self):
             self.saved = False
-        def save_to_csv(self):
+        def append_to_journal(self):
             self.saved = True
 
     history_manager = DummyHistoryManager()
@@ -33,7 +36,7 @@ def test_auto_save_observer_update():
 
 def test_auto_save_observer_update_raises():
     class FailingHistoryManager:
-        def save_to_csv(self):
+        def append_to_journal(self):
             raise Exception("disk full")
 
     history_manager = FailingHistoryManager()
@@ -42,3 +45,114 @@ def test_auto_save_observer_update_raises():
     with pytest.raises(LoggingError) as excinfo:
         auto_saver.update()
     assert "Auto-save failed" in str(excinfo.value)
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "LOG_DIR", str(tmp_path))
+    return tmp_path
+
+def read_log(log_dir):
+    with open(log_dir / "calculator.log") as f:
+        return f.read().splitlines()
+
+def test_buffered_logging_flush(log_dir):
+    logger = LoggingObserver(buffered=True)
+    for i in range(3):
+        logger.update('add', i, 1, i + 1)
+    logger.flush()
+    lines = read_log(log_dir)
+    assert len(lines) == 3
+    assert lines[2].endswith("ADD | 2, 1 => 3")
+    logger.close()
+
+def test_buffered_logging_batches_by_size(log_dir, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "LOG_BATCH_SIZE", 2)
+    monkeypatch.setattr(CalculatorConfig, "LOG_FLUSH_INTERVAL", 60.0)
+    logger = LoggingObserver(buffered=True)
+    logger.update('add', 1, 1, 2)
+    logger.update('add', 2, 2, 4)
+    deadline = time.monotonic() + 5
+    while not os.path.exists(log_dir / "calculator.log") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(read_log(log_dir)) == 2
+    logger.close()
+
+def test_buffered_logging_flushes_on_interval(log_dir, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "LOG_FLUSH_INTERVAL", 0.05)
+    logger = LoggingObserver(buffered=True)
+    logger.update('subtract', 5, 3, 2)
+    # The writer creates the file before writing to it, so wait for the line itself
+    path = log_dir / "calculator.log"
+    deadline = time.monotonic() + 5
+    while not (os.path.exists(path) and path.read_text()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(read_log(log_dir)) == 1
+    logger.close()
+
+def test_buffered_logging_close_writes_pending(log_dir):
+    logger = LoggingObserver(buffered=True)
+    logger.update('multiply', 2, 3, 6)
+    logger.close()
+    logger.close()  # idempotent
+    assert len(read_log(log_dir)) == 1
+    with pytest.raises(LoggingError):
+        logger.update('multiply', 2, 3, 6)
+
+def test_buffered_logging_write_error_surfaces(log_dir, monkeypatch):
+    logger = LoggingObserver(buffered=True)
+    def fake_open(*args, **kwargs):
+        raise IOError("disk full")
+    monkeypatch.setattr("builtins.open", fake_open)
+    logger.update('add', 1, 2, 3)
+    with pytest.raises(LoggingError) as excinfo:
+        logger.flush()
+    assert "disk full" in str(excinfo.value)
+    logger.close()
+
+def test_unbuffered_flush_and_close_are_noops(log_dir):
+    logger = LoggingObserver(buffered=False)
+    logger.flush()
+    logger.close()
+    assert logger.writer is None
+
+def test_repl_exit_flushes_buffered_log(log_dir, monkeypatch):
+    from app.calculator import CalculatorREPL
+    monkeypatch.setattr(CalculatorConfig, "LOG_BUFFERED", True)
+    monkeypatch.setattr(CalculatorConfig, "LOG_FLUSH_INTERVAL", 60.0)
+    repl = CalculatorREPL()
+    with patch('builtins.input', side_effect=['add 2 3', 'exit']):
+        repl.run()
+    assert read_log(log_dir)[0].endswith("ADD | 2.0, 3.0 => 5.0")
+    repl.logger.close()
+
+def test_update_batch_writes_all_events(log_dir):
+    logger = LoggingObserver(buffered=False)
+    logger.update_batch([('add', 1, 2, 3), ('subtract', 5, 3, 2)])
+    lines = read_log(log_dir)
+    assert lines[0].endswith("ADD | 1, 2 => 3")
+    assert lines[1].endswith("SUBTRACT | 5, 3 => 2")
+
+def test_update_batch_buffered(log_dir):
+    logger = LoggingObserver(buffered=True)
+    logger.update_batch([('add', 1, 2, 3), ('add', 2, 2, 4)])
+    logger.close()
+    assert len(read_log(log_dir)) == 2
+
+def test_update_batch_raises(log_dir, monkeypatch):
+    logger = LoggingObserver(buffered=False)
+    def fake_open(*args, **kwargs):
+        raise IOError("disk full")
+    monkeypatch.setattr("builtins.open", fake_open)
+    with pytest.raises(LoggingError):
+        logger.update_batch([('add', 1, 2, 3)])
+
+def test_auto_save_observer_update_batch():
+    class DummyHistoryManager:
+        def __init__(self):
+            self.calls = 0
+        def append_to_journal(self):
+            self.calls += 1
+
+    history_manager = DummyHistoryManager()
+    AutoSaveObserver(history_manager).update_batch([('add', 1, 2, 3), ('add', 2, 2, 4)])
+    assert history_manager.calls == 1
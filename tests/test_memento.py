@@ -1,6 +1,6 @@
 # tests/test_calculator_memento.py
 import pytest
-from app.calculator_memento import Memento, Caretaker
+from app.calculator_memento import Memento, Caretaker, SpillFile
 
 def make_history(entries):
     """Helper to create history-like list of dicts."""
@@ -91,3 +91,150 @@ def test_get_current_state_returns_latest():
     caretaker = Caretaker()
     caretaker.save_state(Memento(history))
     assert caretaker.get_current_state() == history
+
+def test_extend_shares_storage():
+    base = Memento([{"operation": "add", "a": 1, "b": 2, "result": 3}])
+    entry = {"operation": "subtract", "a": 5, "b": 3, "result": 2}
+    extended = base.extend([entry])
+
+    assert len(base) == 1
+    assert len(extended) == 2
+    assert extended._log is base._log
+    assert base.get_state() == [{"operation": "add", "a": 1, "b": 2, "result": 3}]
+    assert extended.get_state()[1] == entry
+    assert extended.get_state()[1] is not entry
+
+def test_extend_forks_after_branch():
+    base = Memento([{"operation": "add", "a": 1, "b": 2, "result": 3}])
+    first = base.extend([{"operation": "multiply", "a": 2, "b": 2, "result": 4}])
+    # Extending the older snapshot again must not clobber the first branch
+    second = base.extend([{"operation": "division", "a": 8, "b": 2, "result": 4}])
+
+    assert first.get_state()[1]["operation"] == "multiply"
+    assert second.get_state()[1]["operation"] == "division"
+    assert second._log is not base._log
+
+def test_save_history_shares_when_appended():
+    caretaker = Caretaker()
+    history = []
+    caretaker.save_history(history)
+    for i in range(3):
+        history.append({"operation": "add", "a": i, "b": i, "result": 2 * i})
+        caretaker.save_history(history, appended=1)
+
+    logs = {id(memento._log) for memento in caretaker.undo_stack[1:]}
+    assert len(logs) == 1
+    assert caretaker.get_current_state() == history
+    assert caretaker.undo() == history[:2]
+    assert caretaker.undo() == history[:1]
+    assert caretaker.redo() == history[:2]
+
+def test_save_history_copies_when_not_appended():
+    caretaker = Caretaker()
+    caretaker.save_history([{"operation": "add", "a": 1, "b": 2, "result": 3}])
+    replaced = [{"operation": "add", "a": i, "b": i, "result": 2 * i} for i in range(3)]
+    # Lengths don't line up with a one-entry append, so this is a full snapshot
+    caretaker.save_history(replaced, appended=1)
+    assert caretaker.undo_stack[1]._log is not caretaker.undo_stack[0]._log
+    assert caretaker.get_current_state() == replaced
+
+def test_save_history_shares_when_oldest_evicted():
+    caretaker = Caretaker()
+    history = [{"operation": "add", "a": 1, "b": 1, "result": 2}, {"operation": "add", "a": 2, "b": 2, "result": 4}]
+    caretaker.save_history(history)
+    # A bounded history dropped its oldest entry while appending a new one
+    history = history[1:] + [{"operation": "add", "a": 3, "b": 3, "result": 6}]
+    caretaker.save_history(history, appended=1)
+
+    assert caretaker.undo_stack[1]._log is caretaker.undo_stack[0]._log
+    assert caretaker.get_current_state() == history
+    assert caretaker.undo()[0]["result"] == 2
+
+def entry(i):
+    return {"operation": "add", "a": i, "b": i, "result": 2 * i}
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.calculator_config.CalculatorConfig.HISTORY_DIR", str(tmp_path))
+    return tmp_path
+
+def run_session(caretaker, operations, history_size):
+    history, states = [], [[]]
+    caretaker.save_history(history)
+    for i in range(operations):
+        history.append(entry(i))
+        if len(history) > history_size:
+            del history[0]
+        caretaker.save_history(history, appended=1)
+        states.append(list(history))
+    return states
+
+def test_spilled_mementos_undo_and_redo(spill_dir):
+    caretaker = Caretaker(memory_depth=3, disk_depth=100)
+    states = run_session(caretaker, 40, history_size=5)
+    assert len(caretaker.undo_stack) == 41
+    assert len(caretaker.undo_stack._memory) == 3
+    assert caretaker.spill.size() > 0
+    assert caretaker.undo_stack[0].get_state() == []
+    assert caretaker.undo_stack[10].get_state() == states[10]
+
+    for expected in reversed(states[:-1]):
+        assert caretaker.undo() == expected
+    assert caretaker.undo() is None
+    for expected in states[1:]:
+        assert caretaker.redo() == expected
+    assert caretaker.redo() is None
+
+def test_offsets_survive_spilling(spill_dir):
+    caretaker = Caretaker(memory_depth=3, disk_depth=100)
+    history = []
+    for i in range(40):
+        history.append(entry(i))
+        if len(history) > 5:
+            del history[0]
+        caretaker.save_history(history, appended=1, offset=max(i - 4, 0))
+    offsets = []
+    while caretaker.undo() is not None:
+        offsets.append(caretaker.get_current_offset())
+    assert offsets == [max(i - 4, 0) for i in reversed(range(39))]
+    caretaker.redo()
+    assert caretaker.get_current_offset() == 0 and caretaker.undo_stack[-1].offset == 0
+    assert Caretaker().get_current_offset() == 0
+
+def test_disk_depth_bounds_undo(spill_dir):
+    caretaker = Caretaker(memory_depth=2, disk_depth=5)
+    states = run_session(caretaker, 30, history_size=4)
+    assert len(caretaker.undo_stack) == 7
+    for expected in reversed(states[-7:-1]):
+        assert caretaker.undo() == expected
+    assert caretaker.undo() is None
+
+def test_new_state_after_undo_frees_spilled_redo(spill_dir):
+    caretaker = Caretaker(memory_depth=2, disk_depth=50)
+    states = run_session(caretaker, 20, history_size=3)
+    for _ in range(10):
+        caretaker.undo()
+    assert caretaker.redo_stack.spilled() > 0
+    caretaker.save_history(states[10] + [entry(99)], appended=1)
+    assert caretaker.redo() is None
+    assert len(caretaker.spill) == caretaker.undo_stack.spilled()
+
+def test_spill_file_compacts_and_reads_back(tmp_path):
+    spill = SpillFile(str(tmp_path))
+    records = [spill.write([entry(i)] * 50) for i in range(40)]
+    for record in records[:30]:
+        spill.free(record)
+    spill._compact()
+    assert [spill.read(record)[0]["a"] for record in records[30:]] == list(range(30, 40))
+    for record in records[30:]:
+        spill.free(record)
+    assert spill.size() == 0
+    spill.close()
+
+def test_logs_trimmed_to_resident_mementos(spill_dir):
+    caretaker = Caretaker(memory_depth=4, disk_depth=0)
+    run_session(caretaker, 1000, history_size=10)
+    # Without trimming the shared log would hold all 1000 entries
+    assert len(caretaker.undo_stack[-1]._log) < 100
+    assert len(caretaker.undo_stack) == 4
+    assert caretaker.spill.size() == 0
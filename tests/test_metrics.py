@@ -0,0 +1,57 @@
+import pytest
+from app.metrics import LatencyHistogram, Metrics
+
+
+def test_histogram_percentiles_track_distribution():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.observe(0.001)
+    for _ in range(10):
+        histogram.observe(0.1)
+    assert histogram.count == 100
+    assert histogram.sum == pytest.approx(1.09)
+    # Bucket bounds are sqrt(2) apart, so estimates stay within that factor
+    assert 0.001 / 1.5 <= histogram.percentile(0.50) <= 0.001 * 1.5
+    assert 0.1 / 1.5 <= histogram.percentile(0.99) <= 0.1
+    assert histogram.percentile(1.0) == pytest.approx(0.1)
+
+def test_histogram_empty_and_overflow():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) == 0.0
+    histogram.observe(10_000.0)
+    assert histogram.counts[-1] == 1
+    assert histogram.percentile(0.99) <= 10_000.0
+
+def test_metrics_counts_and_errors():
+    metrics = Metrics()
+    metrics.observe_command("add", 0.001)
+    metrics.observe_command("add", 0.002)
+    metrics.count_error("division", ZeroDivisionError())
+    metrics.count_error("division", ZeroDivisionError())
+    metrics.observe_observer("LoggingObserver", 0.0005)
+    assert metrics.commands["add"].count == 2
+    assert metrics.errors[("division", "ZeroDivisionError")] == 2
+    lines = metrics.summary_lines()
+    assert lines[1].split()[:3] == ["add", "2", "0"]
+    assert any(line.startswith("observer:LoggingObserver") for line in lines)
+    assert "error division ZeroDivisionError: 2" in lines
+    metrics.reset()
+    assert metrics.summary_lines() == ["No metrics recorded yet."]
+
+def test_prometheus_export(tmp_path):
+    metrics = Metrics()
+    metrics.observe_command("add", 0.001)
+    metrics.observe_command('we"ird', 0.001)
+    metrics.count_error("power", OverflowError())
+    metrics.observe_observer("AutoSaveObserver", 0.002)
+    text = metrics.to_prometheus()
+    assert "# TYPE calculator_commands_total counter" in text
+    assert 'calculator_commands_total{command="add"} 1' in text
+    assert 'calculator_commands_total{command="we\\"ird"} 1' in text
+    assert 'calculator_command_errors_total{command="power",error="OverflowError"} 1' in text
+    assert 'calculator_command_duration_seconds_bucket{command="add",le="+Inf"} 1' in text
+    assert 'calculator_command_duration_seconds_count{command="add"} 1' in text
+    assert 'calculator_observer_duration_seconds_count{observer="AutoSaveObserver"} 1' in text
+    path = tmp_path / "out" / "metrics.prom"
+    metrics.export(str(path))
+    assert path.read_text() == text
@@ -0,0 +1,123 @@
+import math
+import pytest
+from app.operation_cache import OperationCache, CachedOperation
+from app.operations import OperationFactory, Power, Add, Division
+from app.exceptions import CalculatorError
+
+
+class CountingPower:
+    calls = 0
+
+    @classmethod
+    def execute(cls, a, b):
+        cls.calls += 1
+        return Power.execute(a, b)
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    CountingPower.calls = 0
+
+def test_hit_and_miss_counters():
+    cache = OperationCache(10)
+    assert cache.execute("power", CountingPower, 2.0, 10.0) == 1024.0
+    assert cache.execute("power", CountingPower, 2.0, 10.0) == 1024.0
+    assert CountingPower.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 0)
+    assert stats["hit_rate"] == 0.5
+
+def test_int_and_float_operands_are_distinct():
+    cache = OperationCache(10)
+    assert type(cache.execute("add", Add, 1, 2)) is int
+    assert type(cache.execute("add", Add, 1.0, 2.0)) is float
+    assert cache.misses == 2
+
+def test_negative_zero_is_distinct():
+    cache = OperationCache(10)
+    assert cache.execute("division", Division, 1.0, 0.5) == 2.0
+    assert math.copysign(1.0, cache.execute("power", CountingPower, 0.0, 3.0)) == 1.0
+    assert math.copysign(1.0, cache.execute("power", CountingPower, -0.0, 3.0)) == -1.0
+    assert CountingPower.calls == 2
+
+def test_nan_operands_hit():
+    cache = OperationCache(10)
+    assert math.isnan(cache.execute("power", CountingPower, float("nan"), 2.0))
+    assert math.isnan(cache.execute("power", CountingPower, float("nan"), 2.0))
+    assert CountingPower.calls == 1
+
+def test_errors_are_not_cached():
+    cache = OperationCache(10)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            cache.execute("division", Division, 1.0, 0.0)
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+def test_lru_eviction():
+    cache = OperationCache(2)
+    cache.execute("power", CountingPower, 2.0, 1.0)
+    cache.execute("power", CountingPower, 2.0, 2.0)
+    cache.execute("power", CountingPower, 2.0, 1.0)  # refresh
+    cache.execute("power", CountingPower, 2.0, 3.0)  # evicts 2 ** 2
+    assert cache.evictions == 1
+    cache.execute("power", CountingPower, 2.0, 1.0)
+    assert CountingPower.calls == 3
+
+def test_fifo_eviction():
+    cache = OperationCache(2, policy="fifo")
+    cache.execute("power", CountingPower, 2.0, 1.0)
+    cache.execute("power", CountingPower, 2.0, 2.0)
+    cache.execute("power", CountingPower, 2.0, 1.0)  # hit, but doesn't refresh
+    cache.execute("power", CountingPower, 2.0, 3.0)  # evicts 2 ** 1
+    cache.execute("power", CountingPower, 2.0, 1.0)
+    assert CountingPower.calls == 4
+
+def test_invalid_settings():
+    with pytest.raises(CalculatorError):
+        OperationCache(0)
+    with pytest.raises(CalculatorError):
+        OperationCache(10, policy="random")
+
+def test_clear_resets_stats():
+    cache = OperationCache(10)
+    cache.execute("power", CountingPower, 2.0, 2.0)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 0
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = OperationCache(10)
+    cache.execute("power", CountingPower, 2.0, 0.5)
+    cache.execute("add", Add, 1, 2)
+    cache.execute("power", CountingPower, -0.0, 3.0)
+    cache.execute("root", OperationFactory.operations["root"], -8.0, 3.0)  # complex result
+    cache.save(path)
+
+    warm = OperationCache(10)
+    warm.load(path)
+    assert len(warm) == 4
+    assert warm.execute("power", CountingPower, 2.0, 0.5) == 2.0 ** 0.5
+    assert type(warm.execute("add", Add, 1, 2)) is int
+    assert math.copysign(1.0, warm.execute("power", CountingPower, -0.0, 3.0)) == -1.0
+    assert isinstance(warm.execute("root", None, -8.0, 3.0), complex)
+    assert warm.hits == 4
+
+def test_load_missing_or_corrupt_file(tmp_path):
+    cache = OperationCache(10)
+    cache.load(str(tmp_path / "missing.json"))
+    (tmp_path / "bad.json").write_text("{not json")
+    cache.load(str(tmp_path / "bad.json"))
+    assert len(cache) == 0
+
+def test_factory_returns_cached_operation(monkeypatch):
+    cache = OperationCache(10)
+    monkeypatch.setattr(OperationFactory, "cache", cache)
+    op = OperationFactory.get_operation("Power")
+    assert isinstance(op, CachedOperation)
+    assert op.execute(3.0, 2.0) == 9.0
+    assert OperationFactory.get_operation("power").execute(3.0, 2.0) == 9.0
+    assert cache.hits == 1
+    results, errors = OperationFactory.execute_batch("power", [3.0], [2.0])
+    assert results[0] == 9.0
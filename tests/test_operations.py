@@ -1,5 +1,7 @@
+import sys
 import pytest
-from app.operations import OperationFactory
+import numpy as np
+from app.operations import OperationFactory, execute_group
 from app.exceptions import OperationError
 
 @pytest.mark.parametrize("a, b, expected", [
@@ -78,3 +80,120 @@ def test_int_divide_by_zero():
 def test_percent(a, b, expected):
     op = OperationFactory.get_operation("percent")
     assert op.execute(a, b) == expected
+
+def test_powmod():
+    op = OperationFactory.get_operation("powmod")
+    assert op.arity == 3
+    assert op.execute(4, 13, 497) == 445
+    assert op.execute(3, 10 ** 6, 10 ** 9 + 7) == pow(3, 10 ** 6, 10 ** 9 + 7)
+    with pytest.raises(ZeroDivisionError):
+        op.execute(2, 3, 0)
+
+def test_power_overflow_predicted():
+    op = OperationFactory.get_operation("power")
+    with pytest.raises(OverflowError, match="Result too large"):
+        op.execute(10.0, 400.0)
+    with pytest.raises(OverflowError, match="Result too large"):
+        OperationFactory.get_operation("root").execute(10.0, 0.001)
+
+@pytest.mark.parametrize("name", [
+    name for name, op in OperationFactory.operations.items() if hasattr(op, "execute_batch")
+])
+def test_execute_batch_matches_scalar(name):
+    a_values = [5.0, -7.5, 2.0, 0.0, 9.0]
+    b_values = [3.0, 2.0, -4.0, 1.5, 0.5]
+    results, errors = OperationFactory.execute_batch(name, a_values, b_values)
+    op = OperationFactory.get_operation(name)
+    for a, b, result, error in zip(a_values, b_values, results, errors):
+        expected = op.execute(a, b)
+        if isinstance(expected, complex):
+            assert error and np.isnan(result)
+        else:
+            assert not error and result == pytest.approx(expected)
+
+@pytest.mark.parametrize("name", ["division", "modulus", "root", "int_divide", "percent"])
+def test_execute_batch_zero_divisor_masked(name):
+    results, errors = OperationFactory.execute_batch(name, [4.0, 4.0, 9.0], [2.0, 0.0, 0.0])
+    assert errors.tolist() == [False, True, True]
+    assert not np.isnan(results[0])
+    assert np.isnan(results[1:]).all()
+
+def test_execute_batch_power_zero_base_negative_exponent():
+    results, errors = OperationFactory.execute_batch("power", [0.0, 2.0], [-1.0, -1.0])
+    assert errors.tolist() == [True, False]
+    assert results[1] == 0.5
+
+def test_execute_batch_flags_rows_the_scalar_path_rejects():
+    results, errors = OperationFactory.execute_batch("power", [10.0, -8.0, 2.0], [400.0, 0.5, 3.0])
+    assert errors.tolist() == [True, True, False]
+    assert np.isnan(results[:2]).all() and results[2] == 8.0
+    with pytest.raises(OverflowError):
+        OperationFactory.get_operation("power").execute(10.0, 400.0)
+    assert isinstance(OperationFactory.get_operation("power").execute(-8.0, 0.5), complex)
+    results, errors = OperationFactory.execute_batch("root", [-8.0, 10.0, 27.0], [2.0, 0.001, 3.0])
+    assert errors.tolist() == [True, True, False]
+    assert results[2] == pytest.approx(3.0)
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("name", [
+    name for name, op in OperationFactory.operations.items() if hasattr(op, "execute_batch")
+])
+def test_execute_batch_overflow_without_warnings(name):
+    results, errors = OperationFactory.execute_batch(name, [1e308, -1e308, float("inf")], [-1e308, 1e-10, 2.0])
+    assert results.shape == errors.shape == (3,)
+
+def test_execute_group_returns_result_or_error_per_row():
+    outcomes = execute_group("division", [4.0, 1.0, 9.0], [2.0, 0.0, 3.0])
+    assert outcomes[0] == 2.0 and outcomes[2] == 3.0
+    assert isinstance(outcomes[1], ZeroDivisionError)
+
+def test_execute_batch_shape_mismatch():
+    with pytest.raises(OperationError):
+        OperationFactory.execute_batch("add", [1, 2], [1])
+
+def test_execute_batch_invalid_operation():
+    with pytest.raises(OperationError):
+        OperationFactory.execute_batch("invalid", [1], [1])
+
+@pytest.fixture
+def plugin_operations(tmp_path, monkeypatch):
+    # A third-party module exposing one operation through the entry point group
+    (tmp_path / "calc_plugin_hypot.py").write_text(
+        "import math\n"
+        "class Hypot:\n"
+        "    @staticmethod\n"
+        "    def execute(a, b):\n"
+        "        return math.hypot(a, b)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from importlib.metadata import EntryPoint
+    group = OperationFactory.plugin_group
+    entry_points = [
+        EntryPoint("hypot", "calc_plugin_hypot:Hypot", group),
+        EntryPoint("broken", "calc_plugin_missing:Op", group),
+        EntryPoint("add", "calc_plugin_hypot:Hypot", group),  # built-ins win
+    ]
+    monkeypatch.setattr("app.operations.entry_points", lambda group: entry_points)
+    monkeypatch.setattr(OperationFactory, "operations", dict(OperationFactory.operations))
+    monkeypatch.setattr(OperationFactory, "plugins", None)
+    yield
+    sys.modules.pop("calc_plugin_hypot", None)
+
+def test_plugin_operations_load_lazily(plugin_operations):
+    assert OperationFactory.has_operation("HYPOT")
+    assert "hypot" in OperationFactory.names()
+    assert OperationFactory.names().count("add") == 1
+    assert "calc_plugin_hypot" not in sys.modules
+    assert OperationFactory.get_operation("hypot").execute(3, 4) == 5.0
+    assert "calc_plugin_hypot" in sys.modules
+    assert "hypot" in OperationFactory.operations
+    assert OperationFactory.names().count("hypot") == 1
+    assert OperationFactory.get_operation("add").execute(1, 2) == 3
+
+def test_plugin_without_batch_kernel(plugin_operations):
+    with pytest.raises(OperationError, match="no vectorized kernel"):
+        OperationFactory.execute_batch("hypot", [3.0], [4.0])
+
+def test_broken_plugin_reports_operation_error(plugin_operations):
+    with pytest.raises(OperationError, match="Failed to load operation plugin 'broken'"):
+        OperationFactory.get_operation("broken")
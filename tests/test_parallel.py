@@ -0,0 +1,39 @@
+import pytest
+from app.parallel import ParallelExecutor, WorkResult, run_chunk
+from app.exceptions import CalculatorError, OperationError, ValidationError
+
+
+def test_run_chunk_captures_errors():
+    results = run_chunk([("add", 1, 2), ("division", 1, 0), ("foobar", 1, 1), ("add", "x", 1), ("multiply", 3, 4)])
+    assert results[0] == WorkResult(3, None)
+    assert isinstance(results[1].error, OperationError)
+    assert isinstance(results[2].error, OperationError)
+    assert isinstance(results[3].error, ValidationError)
+    assert results[4] == WorkResult(12, None)
+
+def test_small_batch_runs_inline():
+    executor = ParallelExecutor(max_workers=4, chunk_size=100)
+    assert executor.run([("add", i, i) for i in range(10)]) == [WorkResult(2 * i, None) for i in range(10)]
+    assert executor._pool is None
+
+def test_large_batch_uses_pool_and_keeps_order():
+    items = [("add", i, 1) if i % 7 else ("division", i, 0) for i in range(1000)]
+    with ParallelExecutor(max_workers=2, chunk_size=64) as executor:
+        results = executor.run(items)
+        assert executor._pool is not None
+        # The pool is reused across batches
+        pool = executor._pool
+        executor.run(items)
+        assert executor._pool is pool
+    assert executor._pool is None
+    assert len(results) == 1000
+    for i, result in enumerate(results):
+        if i % 7:
+            assert result == WorkResult(i + 1, None)
+        else:
+            assert result.result is None
+            assert isinstance(result.error, OperationError)
+
+def test_invalid_settings():
+    with pytest.raises(CalculatorError):
+        ParallelExecutor(max_workers=2, chunk_size=-1)
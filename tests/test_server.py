@@ -0,0 +1,149 @@
+import asyncio
+import socket
+import threading
+import pytest
+from app.calculator_config import CalculatorConfig
+from app.server import CalculatorServer, MicroBatcher
+
+
+async def request(reader, writer, line):
+    writer.write((line + "\n").encode())
+    await writer.drain()
+    lines = []
+    while True:
+        text = (await reader.readline()).decode().rstrip("\n")
+        if not text:
+            return lines
+        lines.append(text)
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=30))
+
+def test_commands_match_repl_output():
+    async def scenario():
+        server = await CalculatorServer(batch_window=0.001).start()
+        host, port = server.address[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            assert await request(reader, writer, "add 2 3") == ["Result: 5.0"]
+            assert await request(reader, writer, "division 5 0") == ["Error: Division by zero is not allowed."]
+            assert await request(reader, writer, "root -8 3") == [f"Result: {(-8.0) ** (1 / 3)}"]
+            assert await request(reader, writer, "power 10 400") == ["Error: Result too large: power would be about 10^400"]
+            assert await request(reader, writer, "add x 1") == ["Error: Operands must be numbers."]
+            assert await request(reader, writer, "eval (3 + 4) ^ 2 % 5") == ["Result: 4.0"]
+            assert await request(reader, writer, "history") == [
+                "1. add(2.0, 3.0) = 5.0",
+                f"2. root(-8.0, 3.0) = {(-8.0) ** (1 / 3)}",
+                "3. modulus(49.0, 5.0) = 4.0",
+            ]
+            assert await request(reader, writer, "undo") == [f"Undo -> root(-8.0, 3.0) = {(-8.0) ** (1 / 3)}"]
+            assert "Available Commands:" in await request(reader, writer, "help")
+            assert await request(reader, writer, "exit") == ["Goodbye!"]
+            assert await reader.readline() == b""
+        finally:
+            writer.close()
+            await server.close()
+    run(scenario())
+
+def test_invalid_operands_are_rejected_before_batching(monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "MAX_INPUT_VALUE", 1000)
+    async def scenario():
+        server = await CalculatorServer(batch_window=0.001).start()
+        host, port = server.address[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for line in ("multiply 1e300 1e300", "add nan 1", "add inf 1"):
+                assert await request(reader, writer, line) == ["Error: Operands must be between -1000 and 1000."]
+            assert await request(reader, writer, "add x 1") == ["Error: Operands must be numbers."]
+            assert await request(reader, writer, "add 2 3") == ["Result: 5.0"]
+        finally:
+            writer.close()
+            await server.close()
+        return server
+    server = run(scenario())
+    assert server.batcher.requests == 1
+
+def test_concurrent_clients_are_batched_with_separate_state():
+    async def client(host, port, index):
+        reader, writer = await asyncio.open_connection(host, port)
+        responses = []
+        for i in range(20):
+            responses.append(await request(reader, writer, f"multiply {index} {i}"))
+        history = await request(reader, writer, "history")
+        writer.close()
+        return responses, history
+
+    async def scenario():
+        server = await CalculatorServer(max_batch_size=64, batch_window=0.005).start()
+        host, port = server.address[:2]
+        try:
+            outcomes = await asyncio.gather(*(client(host, port, index) for index in range(10)))
+        finally:
+            await server.close()
+        return server, outcomes
+
+    server, outcomes = run(scenario())
+    for index, (responses, history) in enumerate(outcomes):
+        assert responses == [[f"Result: {float(index * i)}"] for i in range(20)]
+        assert len(history) == 20
+        assert history[0] == f"1. multiply({float(index)}, 0.0) = 0.0"
+    assert server.batcher.requests == 200
+    assert server.batcher.batches < 200
+
+def test_batcher_flushes_at_max_batch_size():
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=3, window=60)
+        futures = [batcher.submit("add", float(i), 1.0) for i in range(3)]
+        return batcher, await asyncio.gather(*futures)
+    batcher, results = run(scenario())
+    assert results == [1.0, 2.0, 3.0]
+    assert batcher.batches == 1
+
+def test_batcher_falls_back_to_scalar_operations(monkeypatch):
+    from app.operations import OperationFactory
+    def no_batch(*args):
+        raise AttributeError("no vectorized kernel")
+    monkeypatch.setattr(OperationFactory, "execute_batch", no_batch)
+    async def scenario():
+        batcher = MicroBatcher(max_batch_size=10, window=0)
+        ok = batcher.submit("add", 1.0, 2.0)
+        failed = batcher.submit("division", 1.0, 0.0)
+        assert await ok == 3.0
+        with pytest.raises(ZeroDivisionError):
+            await failed
+    run(scenario())
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+def test_unix_socket(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "calc.sock")
+        server = await CalculatorServer(path=path, batch_window=0).start()
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            return await request(reader, writer, "subtract 9 4")
+        finally:
+            writer.close()
+            await server.close()
+    assert run(scenario()) == ["Result: 5.0"]
+
+def test_closed_connections_stop_their_log_writers(monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "LOG_BUFFERED", True)
+
+    def writers():
+        return [thread for thread in threading.enumerate() if thread.name == "calculator-log-writer"]
+
+    async def scenario():
+        before = len(writers())
+        server = await CalculatorServer(batch_window=0).start()
+        host, port = server.address[:2]
+        try:
+            for _ in range(20):
+                reader, writer = await asyncio.open_connection(host, port)
+                assert await request(reader, writer, "add 1 2") == ["Result: 3.0"]
+                writer.close()
+            while server.sessions:
+                await asyncio.sleep(0.01)
+        finally:
+            await server.close()
+        return len(writers()) - before
+    assert run(scenario()) == 0
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The import is measured against a stdlib-only baseline (``unittest``) imported right after it in
+# the same process, so the budget scales with the machine. It normally costs about 1.5x the
+# baseline; an eager numpy import alone adds about 5x
+IMPORT_BASELINE = "unittest"
+IMPORT_BUDGET_RATIO = 4
+
+HEAVY_MODULES = ["numpy", "pandas", "multiprocessing", "sqlite3", "importlib.metadata", "argparse"]
+
+
+def _clean_env(**overrides):
+    # pytest-cov starts coverage in child processes through these variables, and coverage
+    # itself imports modules (multiprocessing, sqlite3, ...) the calculator keeps lazy
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith(("COV_CORE_", "COVERAGE_"))}
+    env.update(overrides)
+    return env
+
+
+def _run(code, *flags, env=None):
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT,
+                          env=env if env is not None else _clean_env(),
+                          capture_output=True, text=True, check=True)
+
+
+def _import_ratio():
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    modules = ["app.calculator", IMPORT_BASELINE]
+    stderr = _run("; ".join(f"import {name}" for name in modules), "-X", "importtime").stderr
+    times = {}
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] in modules:
+            times[fields[2]] = int(fields[1])
+    if len(times) != len(modules):
+        pytest.fail(f"{modules} missing from -X importtime output")
+    return times["app.calculator"] / times[IMPORT_BASELINE]
+
+
+def test_import_time_within_budget():
+    # Best of three so a busy machine does not fail the build
+    best = min(_import_ratio() for _ in range(3))
+    assert best < IMPORT_BUDGET_RATIO, f"import app.calculator took {best:.1f}x import {IMPORT_BASELINE}"
+
+
+def test_heavy_modules_load_lazily(tmp_path):
+    env = _clean_env(CALCULATOR_HISTORY_DIR=str(tmp_path / "history"),
+                     CALCULATOR_LOG_DIR=str(tmp_path / "logs"))
+    code = (
+        "import sys\n"
+        "from app.calculator import CalculatorREPL\n"
+        "repl = CalculatorREPL(show_banner=False)\n"
+        "repl.execute_command('add 2 3')\n"
+        f"print('loaded:', [name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    assert _run(code, env=env).stdout.splitlines()[-1] == "loaded: []"
@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import patch
+from app.calculator import CalculatorREPL
+from app.calculator_config import CalculatorConfig
+from app.tracing import Tracer, NULL_TRACE, create_tracer
+from app.trace_viewer import load_traces, slowest, format_trace, flame_summary
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"), 1.0)
+    yield tracer
+    tracer.close()
+
+def test_spans_nest_and_record_errors(tracer):
+    trace = tracer.start("add", "add 1 2")
+    with trace.span("outer"):
+        with trace.span("inner"):
+            pass
+    with pytest.raises(ZeroDivisionError):
+        with trace.span("failing"):
+            1 / 0
+    tracer.finish(trace)
+    tracer.flush()
+    (record,) = load_traces(tracer.path)
+    assert record["name"] == "add"
+    assert record["input"] == "add 1 2"
+    names = [(span["name"], span["parent"]) for span in record["spans"]]
+    assert names == [("outer", None), ("inner", 0), ("failing", None)]
+    outer, inner, failing = record["spans"]
+    assert outer["start_us"] <= inner["start_us"]
+    assert inner["duration_us"] <= outer["duration_us"] <= record["duration_us"]
+    assert failing["error"] == "ZeroDivisionError"
+
+def test_sampling(tmp_path):
+    tracer = Tracer(str(tmp_path / "traces.jsonl"), 0.5)
+    try:
+        tracer._random = iter([0.9, 0.1]).__next__
+        assert tracer.start("add") is NULL_TRACE
+        assert tracer.start("add") is not NULL_TRACE
+        with NULL_TRACE.span("ignored"):
+            pass
+        tracer.finish(NULL_TRACE)
+    finally:
+        tracer.close()
+
+def test_create_tracer_follows_config(monkeypatch, tmp_path):
+    monkeypatch.setattr(CalculatorConfig, "TRACE_SAMPLE_RATE", 0.0)
+    assert create_tracer() is None
+    monkeypatch.setattr(CalculatorConfig, "TRACE_SAMPLE_RATE", 0.25)
+    monkeypatch.setattr(CalculatorConfig, "LOG_DIR", str(tmp_path))
+    tracer = create_tracer()
+    try:
+        assert tracer.sample_rate == 0.25
+        assert tracer.path == str(tmp_path / "calculator_traces.jsonl")
+    finally:
+        tracer.close()
+
+def test_repl_traces_pipeline(tracer):
+    repl = CalculatorREPL(show_banner=False, tracer=tracer)
+    with patch('builtins.input', side_effect=['add 2 3', 'undo', 'exit']):
+        repl.run()
+    traces = {trace["name"]: trace for trace in load_traces(tracer.path)}
+    assert [span["name"] for span in traces["add"]["spans"]] == [
+        "parse", "get_operation", "execute", "add_entry", "memento",
+        "observer:LoggingObserver", "observer:AutoSaveObserver",
+    ]
+    assert [span["name"] for span in traces["undo"]["spans"]] == ["memento"]
+    tracer.flush()  # exit flushes before its own trace finishes
+    assert "exit" in {trace["name"] for trace in load_traces(tracer.path)}
+
+def test_script_batch_notifications_are_traced(tracer):
+    import io
+    repl = CalculatorREPL(show_banner=False, tracer=tracer)
+    repl.run_script(io.StringIO("add 1 2\nmultiply 2 3\n"), out=io.StringIO())
+    traces = load_traces(tracer.path)
+    batch = [trace for trace in traces if trace["name"] == "notify_batch"]
+    assert len(batch) == 1
+    assert batch[0]["input"] == "2 events"
+    assert [span["name"] for span in batch[0]["spans"]] == [
+        "observer:LoggingObserver", "observer:AutoSaveObserver",
+    ]
+
+def test_viewer_summaries():
+    traces = [
+        {"id": 1, "name": "add", "input": "add 1 2", "time": "t", "duration_us": 10.0, "spans": [
+            {"name": "execute", "parent": None, "start_us": 1.0, "duration_us": 4.0},
+            {"name": "inner", "parent": 0, "start_us": 2.0, "duration_us": 1.0, "error": "ValueError"},
+        ]},
+        {"id": 2, "name": "add", "input": "add 3 4", "time": "t", "duration_us": 30.0, "spans": [
+            {"name": "execute", "parent": None, "start_us": 1.0, "duration_us": 6.0},
+        ]},
+    ]
+    assert [trace["id"] for trace in slowest(traces, 1)] == [2]
+    lines = format_trace(traces[0])
+    assert lines[0].startswith("#1 add 1 2")
+    assert lines[2].strip().startswith("inner")
+    assert lines[2].endswith("!ValueError")
+    rows = {line.split()[0]: line.split()[1:3] for line in flame_summary(traces)[1:]}
+    assert rows["add"] == ["40.0", "30.0"]
+    assert rows["add;execute"] == ["10.0", "9.0"]
+    assert rows["add;execute;inner"] == ["1.0", "1.0"]
+    assert flame_summary([]) == ["No traces recorded."]
@@ -0,0 +1,126 @@
+import pytest
+from app.exceptions import OperationError, ValidationError
+from app.variables import VariableGraph
+
+
+def test_define_and_read_a_chain():
+    graph = VariableGraph()
+    x = graph.define("x", "add", [5.0, 2.0])
+    graph.define("y", "power", [x, 3.0])
+    assert graph.value("y") == 343.0
+    assert graph.value("x") == 7.0
+    assert graph.names() == ["x", "y"]
+    assert "X" in graph and len(graph) == 2
+
+
+def test_values_are_computed_lazily_on_read():
+    graph = VariableGraph()
+    x = graph.define("x", "add", [5.0, 2.0])
+    graph.define("y", "multiply", [x, 2.0])
+    assert graph.recomputed == 0
+    assert graph.value("y") == 14.0
+    assert graph.recomputed == 2
+    assert graph.value("y") == 14.0
+    assert graph.recomputed == 2
+
+
+def test_redefining_recomputes_only_dirty_downstream_cells():
+    graph = VariableGraph()
+    x = graph.define("x", "add", [1.0, 1.0])
+    other = graph.define("other", "add", [1.0, 1.0])
+    y = graph.define("y", "multiply", [x, 10.0])
+    graph.define("z", "add", [y, other])
+    graph.define("unrelated", "multiply", [other, 3.0])
+    for name in graph.names():
+        graph.value(name)
+    before = graph.recomputed
+    graph.define("x", "add", [2.0, 2.0])
+    assert not graph.cell("other").dirty and not graph.cell("unrelated").dirty
+    assert graph.value("z") == 42.0
+    assert graph.recomputed - before == 3  # x, y and z
+    assert graph.value("unrelated") == 6.0
+    assert graph.recomputed - before == 3
+
+
+def test_diamond_is_computed_once_in_topological_order():
+    graph = VariableGraph()
+    x = graph.define("x", "add", [1.0, 2.0])
+    left = graph.define("left", "multiply", [x, 2.0])
+    right = graph.define("right", "subtract", [x, 1.0])
+    graph.define("bottom", "add", [left, right])
+    assert graph.value("bottom") == 8.0
+    assert graph.recomputed == 4
+    graph.define("x", "add", [0.0, 1.0])
+    assert graph.value("bottom") == 2.0
+    assert graph.recomputed == 8
+
+
+def test_work_is_proportional_to_the_change():
+    graph = VariableGraph()
+    root = graph.define("root", "add", [0.0, 1.0])
+    previous = root
+    for i in range(10000):
+        previous = graph.define(f"chain{i}", "add", [previous, 1.0])
+    wide = [graph.define(f"leaf{i}", "multiply", [root, float(i)]) for i in range(1000)]
+    assert graph.value("chain9999") == 10001.0  # deep chains don't hit the recursion limit
+    before = graph.recomputed
+    graph.define("chain9990", "add", [graph.cell("chain9989"), 2.0])
+    assert graph.value("chain9999") == 10002.0
+    assert graph.recomputed - before == 10
+    assert all(leaf.dirty for leaf in wide)
+    assert graph.value("leaf7") == 7.0
+    assert graph.recomputed - before == 11
+
+
+def test_alias_follows_its_source():
+    graph = VariableGraph()
+    x = graph.define("x", None, [3.0])
+    graph.define("y", None, [x])
+    assert graph.value("y") == 3.0
+    graph.define("x", None, [4.0])
+    assert graph.value("y") == 4.0
+
+
+def test_redefining_drops_old_edges():
+    graph = VariableGraph()
+    x = graph.define("x", None, [1.0])
+    graph.define("y", "add", [x, 1.0])
+    graph.define("y", "add", [5.0, 1.0])
+    assert not x.dependents
+    graph.value("y")
+    graph.define("x", None, [2.0])
+    assert not graph.cell("y").dirty
+
+
+def test_cycles_are_rejected():
+    graph = VariableGraph()
+    x = graph.define("x", None, [1.0])
+    y = graph.define("y", "add", [x, 1.0])
+    with pytest.raises(ValidationError, match="Circular reference"):
+        graph.define("x", "add", [y, 1.0])
+    with pytest.raises(ValidationError, match="Circular reference"):
+        graph.define("x", None, [x])
+    assert graph.value("y") == 2.0
+
+
+def test_errors_propagate_downstream_and_clear_on_fix():
+    graph = VariableGraph()
+    x = graph.define("x", "division", [1.0, 0.0])
+    graph.define("y", "add", [x, 1.0])
+    with pytest.raises(OperationError, match="'x'"):
+        graph.value("y")
+    graph.define("x", "division", [1.0, 2.0])
+    assert graph.value("y") == 1.5
+
+
+def test_invalid_definitions():
+    graph = VariableGraph()
+    with pytest.raises(ValidationError, match="Unknown variable"):
+        graph.cell("missing")
+    with pytest.raises(ValidationError, match="two-operand"):
+        graph.define("x", "powmod", [1.0, 2.0])
+    with pytest.raises(ValidationError, match="exactly one value"):
+        graph.define("x", None, [1.0, 2.0])
+    with pytest.raises(OperationError):
+        graph.define("x", "nope", [1.0, 2.0])
+    assert len(graph) == 0
@@ -0,0 +1,116 @@
+import csv
+import io
+from app.calculator_config import CalculatorConfig
+from app.history_backends import CSVHistoryBackend
+from app.history_stream import write_entries
+from app.operations import OperationFactory
+from app.verify import REPORT_COLUMNS, HistoryVerifier, default_paths
+
+OPERATIONS = ["add", "subtract", "multiply", "division", "modulus", "power", "root", "int_divide",
+              "abs_diff", "percent"]
+
+
+def history(count):
+    """Entries with the results today's operations compute, including complex roots."""
+    entries = []
+    for i in range(count):
+        name = OPERATIONS[i % len(OPERATIONS)]
+        a = float(i % 23 - 11) if name != "int_divide" else float(i)
+        b = float(i % 5 + 1)
+        entries.append({"operation": name, "a": a, "b": b,
+                        "result": OperationFactory.get_operation(name).execute(a, b)})
+    return entries
+
+def write_csv(path, text):
+    path.write_text("operation,a,b,result\n" + text)
+    return str(path)
+
+def test_matching_history(tmp_path):
+    path = str(tmp_path / "history.csv")
+    write_entries(path, history(500))
+    report = HistoryVerifier(chunk_size=64).verify([path])
+    assert (report.checked, report.mismatched, report.malformed, report.unverifiable) == (500, 0, 0, 0)
+    assert report.operations["root"] == [50, 0]
+    assert any(isinstance(entry["result"], complex) for entry in history(500))
+
+def test_mismatches_are_reported(tmp_path):
+    path = write_csv(tmp_path / "history.csv",
+                     "add,1,2,3\nadd,1,2,4\nroot,-4,2,(1+2j)\nmultiply,2,3,6\nnosuchop,1,2,3\n")
+    report = HistoryVerifier().verify([path])
+    assert (report.checked, report.mismatched) == (5, 3)
+    found = {(mismatch.line, mismatch.operation, mismatch.stored) for mismatch in report.mismatches}
+    assert found == {(3, "add", "4"), (4, "root", "(1+2j)"), (6, "nosuchop", "3")}
+    unknown = next(mismatch for mismatch in report.mismatches if mismatch.operation == "nosuchop")
+    assert unknown.recomputed == "OperationError: Unsupported operation: 'nosuchop'"
+    assert report.operations["add"] == [2, 1]
+
+def test_tolerance(tmp_path):
+    path = write_csv(tmp_path / "history.csv", "division,1,3,0.33333\nadd,0.1,0.2,0.3\n")
+    assert HistoryVerifier().verify([path]).mismatched == 1
+    assert HistoryVerifier(rel_tol=1e-4).verify([path]).mismatched == 0
+    assert HistoryVerifier(rel_tol=0.0, abs_tol=1e-4).verify([path]).mismatched == 0
+    assert HistoryVerifier(rel_tol=0.0).verify([path]).mismatched == 2
+
+def test_malformed_and_unverifiable_rows(tmp_path):
+    path = write_csv(tmp_path / "history.csv", "add,1,2,3\nadd,1\n\nadd,x,2,3\nadd,1,2,abc\npowmod,4,13,445\n")
+    report = HistoryVerifier().verify([path])
+    assert (report.checked, report.malformed, report.unverifiable) == (1, 3, 1)
+    assert [line for _, line, _ in report.errors] == [3, 5, 6]
+    assert "expected 4 fields, got 2" in report.errors[0][2]
+
+def test_complex_operands_are_recomputed(tmp_path):
+    path = write_csv(tmp_path / "history.csv", "add,(1+2j),1,(2+2j)\nadd,(1+2j),1,(3+2j)\n")
+    report = HistoryVerifier().verify([path])
+    assert (report.checked, report.mismatched, report.malformed) == (2, 1, 0)
+
+def test_operation_names_are_normalized(tmp_path):
+    path = write_csv(tmp_path / "history.csv", "Add,1,2,3\n ADD ,2,2,4\nadd,3,2,5\n")
+    report = HistoryVerifier().verify([path])
+    assert report.operations == {"add": [3, 0]}
+
+def test_operations_without_a_kernel_use_execute(tmp_path, monkeypatch):
+    class Hypot:
+        @staticmethod
+        def execute(a, b):
+            return (a * a + b * b) ** 0.5
+    monkeypatch.setitem(OperationFactory.operations, "hypot", Hypot)
+    path = write_csv(tmp_path / "history.csv", "hypot,3,4,5.0\nhypot,6,8,11\n")
+    report = HistoryVerifier().verify([path])
+    assert (report.checked, report.mismatched) == (2, 1)
+
+def test_non_finite_kernel_rows_are_recomputed(tmp_path):
+    # The kernel's NaN for an odd root of a negative number defers to the scalar operation
+    result = OperationFactory.get_operation("root").execute(-8.0, 3.0)
+    path = write_csv(tmp_path / "history.csv", f"root,-8,3,{result}\n")
+    assert HistoryVerifier().verify([path]).mismatched == 0
+
+def test_chunk_size_does_not_change_the_report(tmp_path):
+    path = str(tmp_path / "history.csv")
+    entries = history(300)
+    entries[123]["result"] = 1e9
+    write_entries(path, entries)
+    reports = [HistoryVerifier(chunk_size=size).verify([path]) for size in (1, 7, 1000)]
+    assert {(r.checked, r.mismatched) for r in reports} == {(300, 1)}
+    assert {r.mismatches[0].line for r in reports} == {125}
+
+def test_writer_receives_every_mismatch(tmp_path):
+    path = write_csv(tmp_path / "history.csv", "".join(f"add,{i},1,0\n" for i in range(5)))
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(REPORT_COLUMNS)
+    HistoryVerifier(writer=writer).verify([path])
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == REPORT_COLUMNS
+    assert rows[1] == [path, "2", "add", "0", "1", "0", "1.0"]
+    assert len(rows) == 6
+
+def test_default_paths_include_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "HISTORY_DIR", str(tmp_path))
+    assert default_paths() == []
+    backend = CSVHistoryBackend(str(tmp_path))
+    backend.save(history(3))
+    backend.append([{"operation": "add", "a": 1, "b": 2, "result": 4}])
+    assert default_paths() == [backend.path, backend.journal_file]
+    report = HistoryVerifier().verify(default_paths())
+    assert (report.checked, report.mismatched) == (4, 1)
+    assert report.mismatches[0].line == 1  # the journal has no header row
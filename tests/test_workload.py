@@ -0,0 +1,177 @@
+import gzip
+import pytest
+from app.calculator import CalculatorREPL
+from app.calculator_config import CalculatorConfig
+from app.workload import (
+    HEADER, WorkloadRecorder, create_recorder, generate_workload, parse_mix, read_workload, replay_batch, replay_repl,
+    write_workload,
+)
+
+
+class FakeClock:
+    """A clock that only moves when the replayer sleeps."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_write_and_read_workload(tmp_path):
+    path = tmp_path / "session.workload"
+    records = [(0.0, "add 1 2"), (0.25, "division 4\t2"), (1.5, "exit")]
+    assert write_workload(path, records) == 3
+    assert path.read_text().startswith(HEADER)
+    assert list(read_workload(path)) == records
+
+def test_workload_gzip(tmp_path):
+    path = tmp_path / "session.workload.gz"
+    write_workload(path, [(0.001, "add 1 2")])
+    assert gzip.open(path, "rt").read() == HEADER + "1000\tadd 1 2\n"
+    assert list(read_workload(path)) == [(0.001, "add 1 2")]
+
+@pytest.mark.parametrize("line", ["add 1 2", "x\tadd 1 2", "-5\tadd 1 2"])
+def test_read_workload_malformed(tmp_path, line):
+    path = tmp_path / "bad.workload"
+    path.write_text(HEADER + "0\tadd 1 2\n" + line + "\n")
+    with pytest.raises(ValueError, match="line 3"):
+        list(read_workload(path))
+
+def test_recorder_captures_inter_arrival_times(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "session.workload"
+    recorder = WorkloadRecorder(path, clock=clock)
+    repl = CalculatorREPL(show_banner=False, recorder=recorder)
+    repl.emit = lambda message: None
+    clock.now += 0.5
+    repl.execute_command("add 2 3\n")
+    repl.execute_command("   ")
+    clock.now += 0.002
+    repl.execute_command("bogus 1")
+    repl.execute_command("exit")
+    assert list(read_workload(path)) == [(0.5, "add 2 3"), (0.002, "bogus 1"), (0.0, "exit")]
+    recorder.close()
+
+def test_repl_without_recorder_records_nothing():
+    assert CalculatorREPL(show_banner=False).recorder is None
+
+def test_create_recorder(tmp_path, monkeypatch):
+    monkeypatch.setattr(CalculatorConfig, "RECORD_FILE", "")
+    assert create_recorder() is None
+    path = tmp_path / "records" / "session.workload"
+    monkeypatch.setattr(CalculatorConfig, "RECORD_FILE", str(path))
+    recorder = create_recorder()
+    recorder.record("add 1 2")
+    recorder.close()
+    assert [line for _, line in read_workload(path)] == ["add 1 2"]
+
+def test_generate_workload_is_reproducible():
+    first = list(generate_workload(200, seed=7))
+    assert first == list(generate_workload(200, seed=7))
+    assert len(first) == 200
+    assert all(delay >= 0 for delay, _ in first)
+
+def test_generate_workload_mix():
+    lines = [line for _, line in generate_workload(300, mix={"add": 1, "power": 3}, seed=1)]
+    names = [line.split()[0] for line in lines]
+    assert set(names) == {"add", "power"}
+    assert names.count("power") > names.count("add")
+
+def test_generate_workload_rate():
+    delays = [delay for delay, _ in generate_workload(5000, rate=1000, seed=3)]
+    assert sum(delays) / len(delays) == pytest.approx(0.001, rel=0.1)
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"mix": {"nope": 1}}, "Unknown operation in mix"),
+    ({"mix": {"add": -1}}, "must be non-negative"),
+    ({"mix": {"add": 0}}, "at least one positive weight"),
+    ({"error_rate": 1.5}, "Error rate must be between 0 and 1"),
+    ({"rate": 0}, "Rate must be greater than zero"),
+])
+def test_generate_workload_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        list(generate_workload(1, **kwargs))
+
+def test_parse_mix():
+    assert parse_mix("add=3, Division=0.5,power") == {"add": 3.0, "division": 0.5, "power": 1.0}
+    with pytest.raises(ValueError, match="Invalid weight"):
+        parse_mix("add=lots")
+
+def test_replay_repl_counts_errors():
+    records = list(generate_workload(300, error_rate=0.2, seed=5))
+    repl = CalculatorREPL(show_banner=False)
+    emit = repl.emit
+    report = replay_repl(records, repl, speed=None)
+    assert report.commands == 300
+    # Every generated error command fails and nothing else does
+    expected = sum(1 for _, line in records
+                   if line == "division 1 0" or " x " in line or line.startswith("unknown_"))
+    assert report.errors == expected > 0
+    assert report.latency.count == 300
+    assert repl.emit is emit
+
+def test_replay_repl_paces_by_speed():
+    clock = FakeClock()
+    records = [(0.0, "add 1 2"), (1.0, "add 2 3"), (0.5, "multiply 2 2")]
+    report = replay_repl(records, CalculatorREPL(show_banner=False), speed=2.0, clock=clock, sleep=clock.sleep)
+    assert clock.sleeps == [0.5, 0.25]
+    assert report.seconds == pytest.approx(0.75)
+    assert report.throughput == pytest.approx(4.0)
+
+def test_replay_repl_max_speed_does_not_sleep():
+    clock = FakeClock()
+    records = [(5.0, "add 1 2"), (5.0, "add 2 3")]
+    replay_repl(records, CalculatorREPL(show_banner=False), speed=None, clock=clock, sleep=clock.sleep)
+    assert clock.sleeps == []
+
+def test_replay_repl_stops_at_exit():
+    records = [(0.0, "add 1 2"), (0.0, "exit"), (0.0, "add 2 3")]
+    report = replay_repl(records, CalculatorREPL(show_banner=False), speed=None)
+    assert report.commands == 2
+
+def test_replay_rejects_bad_speed():
+    with pytest.raises(ValueError, match="Speed must be greater than zero"):
+        replay_batch([(0.0, "add 1 2")], speed=0)
+
+def test_replay_batch():
+    records = [(0.0, "add 1 2"), (0.0, "division 1 0"), (0.0, "add x 2"), (0.0, "history"),
+               (0.0, "powmod 2 3 5"), (0.0, "root -8 3"), (0.0, "multiply 3 4")]
+    report = replay_batch(records, speed=None)
+    assert report.commands == 5
+    assert report.errors == 2  # division by zero and the non-numeric operand
+    assert report.skipped == 2  # history isn't an operation and powmod takes three operands
+    assert report.latency.count == 5
+
+def test_replay_batch_runs_queued_commands_while_idle(monkeypatch):
+    import app.workload
+    clock = FakeClock()
+    batches = []
+    records = [(0.0, "add 1 2"), (0.0, "add 2 3"), (1.0, "add 3 4")]
+    execute_group = app.workload.execute_group
+
+    def spy(operation, a_values, b_values):
+        batches.append(list(a_values))
+        return execute_group(operation, a_values, b_values)
+
+    monkeypatch.setattr(app.workload, "execute_group", spy)
+    report = replay_batch(records, speed=1.0, clock=clock, sleep=clock.sleep)
+    assert batches == [[1.0, 2.0], [3.0]]
+    assert clock.sleeps == [1.0]
+    assert report.commands == 3 and report.errors == 0
+
+def test_replay_batch_size():
+    records = [(0.0, f"add {i} 1") for i in range(10)]
+    report = replay_batch(records, speed=None, batch_size=3)
+    assert report.commands == 10
+
+def test_report_summary():
+    report = replay_batch([(0.0, "add 1 2")], speed=None)
+    lines = report.summary_lines()
+    assert lines[0].startswith("Replayed 1 commands through batch at max speed")
+    assert "p99" in lines[2]